@@ -1,5 +1,5 @@
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+import figure_manager
 
 # ========================================================
 # SCHEMATIC DRAWING TOOLS
@@ -9,7 +9,7 @@ def draw_span_schematic(span_type):
     """
     Draws the span schematic with moment distribution visualization.
     """
-    fig, ax = plt.subplots(figsize=(10, 6)) 
+    fig, ax = figure_manager.subplots(figsize=(10, 6), key="DDM_Schematics.draw_span_schematic")
     ax.set_xlim(-4.0, 12.5)
     ax.set_ylim(-1.5, 8.0) 
     ax.axis('off')
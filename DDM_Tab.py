@@ -4,7 +4,10 @@ import numpy as np
 
 # IMPORT CUSTOM MODULES
 import DDM_Logic as logic
+import calculations as calc
 import DDM_Schematics as schem
+import figure_cache
+import perf
 
 # Optional import for plotting
 try:
@@ -13,106 +16,12 @@ try:
 except ImportError:
     HAS_PLOTS = False
 
-# ========================================================
-# 1. HELPER: PUNCHING SHEAR CALCULATOR (CORE LOGIC)
-# ========================================================
-def calculate_punching_physics(c1, c2, d, col_location):
-    """
-    Calculate Properties of Critical Section for Punching Shear
-    c1: Dimension parallel to moment axis (cm)
-    c2: Dimension perpendicular to moment axis (cm)
-    d: Effective depth (cm)
-    col_location: 'interior', 'edge', 'corner'
-    """
-    props = {}
-    
-    # 1. Critical Section Dimensions
-    if col_location == 'interior':
-        # Rectangular Ring
-        b1 = c1 + d
-        b2 = c2 + d
-        bo = 2 * (b1 + b2)
-        
-        # Centroid is at center
-        c_AB = b1 / 2.0
-        c_CD = b1 / 2.0
-        
-        # Jc Calculation (Interior)
-        # Jc = (d*b1^3)/6 + (b1*d^3)/6 + (d*b2*b1^2)/2
-        term1 = (d * b1**3) / 6.0
-        term2 = (b1 * d**3) / 6.0
-        term3 = (d * b2 * b1**2) / 2.0
-        Jc = term1 + term2 + term3
-        
-        props.update({'type': 'Interior', 'b1': b1, 'b2': b2, 'bo': bo, 'Jc': Jc, 'c_AB': c_AB})
-
-    elif col_location == 'edge':
-        # U-Shaped Section (Assumes moment acts about axis perpendicular to c1)
-        # Side legs = c1 + d/2 (L1)
-        # Front face = c2 + d   (L2)
-        
-        L1 = c1 + (d / 2.0)
-        L2 = c2 + d
-        bo = (2 * L1) + L2
-        
-        # Centroid Calculation (from inner face of column)
-        # Area moments about inner face (line connecting ends of legs)
-        # Area_legs = 2 * (L1 * d) -> Centroid at -L1/2
-        # Area_front = (L2 * d)    -> Centroid at 0
-        area_legs = 2 * L1 * d
-        area_front = L2 * d
-        total_area = area_legs + area_front
-        
-        # x_bar distance from center of column face towards the span
-        moment_area = (area_legs * (-L1 / 2.0)) + (area_front * 0)
-        x_bar = moment_area / total_area # This will be negative (inside the span)
-        
-        c_AB = abs(x_bar)        # Distance to centroid from inner face
-        c_CD = L1 - c_AB         # Distance to outer edge
-        
-        # Jc Calculation (Edge)
-        # 1. Parallel to Moment Axis (Legs)
-        # I_legs = 2 * [ (d*L1^3)/12 + (L1*d)*(dist_to_centroid)^2 ]
-        dist_leg_center = (L1/2.0) - c_AB
-        I_legs_own = (d * L1**3) / 12.0
-        I_legs_shift = (L1 * d) * (dist_leg_center**2)
-        J_legs = 2 * (I_legs_own + I_legs_shift)
-        
-        # 2. Perpendicular Face (Front)
-        # I_front = (L2*d^3)/12 + (L2*d)*(c_AB)^2
-        I_front_own = (L2 * d**3) / 12.0 # Generally small, often neglected but included here
-        I_front_shift = (L2 * d) * (c_AB**2)
-        J_front = I_front_own + I_front_shift
-        
-        Jc = J_legs + J_front
-        
-        props.update({'type': 'Edge', 'L1': L1, 'L2': L2, 'bo': bo, 'Jc': Jc, 'c_AB': c_AB, 'c_CD': c_CD})
-
-    else: # Corner
-        # L-Shaped Section
-        L1 = c1 + (d/2.0)
-        L2 = c2 + (d/2.0)
-        bo = L1 + L2
-        
-        # Simplified Jc for Corner (Approx or detailed)
-        # For DDM Corner usually critical in shear transfer, 
-        # but simpler model: Centroid calculation
-        area_1 = L1 * d
-        area_2 = L2 * d
-        total_area = area_1 + area_2
-        
-        x_bar = ((area_1 * L1/2) + (area_2 * 0)) / total_area
-        c_AB = L1 - x_bar
-        
-        # Simplified Jc (Conservative)
-        Jc = (d * L1**3)/3 + (L2 * d * x_bar**2) 
-        
-        props.update({'type': 'Corner', 'L1': L1, 'L2': L2, 'bo': bo, 'Jc': Jc, 'c_AB': c_AB})
-        
-    return props
+# Fragment = widget inside reruns only its own function (not the whole app / model)
+# Streamlit >= 1.37: st.fragment | 1.33-1.36: st.experimental_fragment | older: full rerun
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda fn: fn)
 
 # ========================================================
-# 2. DETAILED FLEXURAL CALCULATION (EXISTING)
+# 1. DETAILED FLEXURAL CALCULATION (EXISTING)
 # ========================================================
 def show_detailed_calculation(zone_name, res, inputs, coeff_pct, Mo_val):
     # Unpack Inputs
@@ -160,75 +69,26 @@ def show_detailed_calculation(zone_name, res, inputs, coeff_pct, Mo_val):
             st.error(f"❌ Unsafe (D/C = {res['DC']:.3f})")
 
 # ========================================================
-# 3. INTERACTIVE DIRECTION CHECK (MAIN RENDERER)
+# 2. INTERACTIVE DIRECTION CHECK (MAIN RENDERER)
 # ========================================================
-def render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir):
-    # Unpack Props
-    h_slab = float(mat_props['h_slab'])
-    cover = float(mat_props['cover'])
-    fc = float(mat_props['fc'])
-    fy = float(mat_props['fy'])
-    phi_bend = mat_props.get('phi', 0.90)        
-    phi_shear = mat_props.get('phi_shear', 0.85) 
-    cfg = mat_props.get('rebar_cfg', {})
-    
-    # Geometry from Inputs
-    L_span = data['L_span']
-    L_width = data.get('L_width', L_span)
-    c_para = float(data['c_para']) # Dimension parallel to span
-    c_perp = float(mat_props['cy']) if axis_id == "X" else float(mat_props['cx']) # Dimension perp
-    
-    # Adjust inputs for consistency
-    # If checking X-axis: c_para = cx, c_perp = cy
-    if axis_id == "X":
-        c1 = float(mat_props['cx']) # Parallel to moment
-        c2 = float(mat_props['cy']) # Perpendicular
-    else:
-        c1 = float(mat_props['cy'])
-        c2 = float(mat_props['cx'])
-
-    Mo = data['Mo']
-    m_vals = data['M_vals']
-    span_type_str = data.get('span_type_str', 'Interior')
-    
-    # Determine Column Location for Punching Logic
-    # (Simplified: If interior span -> Interior Col, If End Span -> Edge Col)
-    if "Interior" in span_type_str:
-        col_loc_code = "interior"
-    else:
-        col_loc_code = "edge" # Assume Edge for end span in DDM context
-
-    # 1. ANALYSIS HEADER
-    st.markdown(f"### 1️⃣ Analysis: {axis_id}-Direction ({span_type_str})")
-    with st.expander(f"📊 Load & Moment Distribution", expanded=False):
-        st.write(f"**Total Static Moment ($M_o$):** {Mo:,.0f} kg-m")
-        st.write(f"**Unbalanced Moment ($M_{{sc}}$):** {m_vals.get('M_unbal', 0):,.0f} kg-m")
-
-    # 2. DETAILED PUNCHING SHEAR (THE CORE UPGRADE)
+@perf.timed()
+def render_punching_check(axis_id, cover, analysis):
+    """Column-face punching check of one direction (Vu, Munbal, phi, capacity all from the engine)"""
     st.markdown("---")
     st.markdown(f"### 2️⃣ Punching Shear Check (Detailed)")
-    
-    # A. PREPARE DATA
-    d_avg = h_slab - cover - 1.6 # Average d (approx)
-    
-    # Calculate Properties using Helper
-    p_props = calculate_punching_physics(c1, c2, d_avg, col_loc_code)
-    
-    # Calculate Gamma_v
-    b1 = p_props.get('b1', p_props.get('L1', 0)) # Dimension parallel
-    b2 = p_props.get('b2', p_props.get('L2', 0)) # Dimension perp
-    
-    if b1 > 0 and b2 > 0:
-        gamma_f = 1.0 / (1.0 + (2.0/3.0) * (b1/b2)**0.5)
-        gamma_v = 1.0 - gamma_f
-    else:
-        gamma_v = 0.4 # Default fallback
-    
-    # Loads
-    area_panel = (L_span * L_width)
-    area_col = (c1/100) * (c2/100)
-    Vu = w_u * (area_panel - area_col) # kg
-    Munbal = m_vals.get('M_unbal', 0) * 100 # kg-cm
+
+    detail = analysis.punching_detail(0)
+    if 'bo' not in detail: # engine error result (e.g. Ac <= 0)
+        st.error(f"❌ {detail.get('note', detail.get('Note', 'Section could not be checked'))}")
+        return
+
+    # A. SECTION + Vu FROM THE SHARED ANALYSIS (same d / bo / Jc as the engine & report)
+    p_props = analysis.punching_physics(axis_id)
+    c1, c2 = p_props['c1'], p_props['c2']
+    d_avg = p_props['d']
+    gamma_v = p_props['gamma_v']
+    Vu = p_props['Vu'] # kg
+    Munbal = abs(detail['Munbal']) * 100 # kg-cm (same unbalanced moment the engine checked)
 
     # B. DISPLAY CALCULATION
     col_p1, col_p2 = st.columns([1.2, 1])
@@ -245,6 +105,9 @@ def render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir):
         elif p_props['type'] == 'Edge':
             st.latex(r"b_o = 2(c_1 + d/2) + (c_2 + d)")
             st.latex(f"b_o = 2({p_props['L1']:.1f}) + {p_props['L2']:.1f} = \\mathbf{{{p_props['bo']:.2f}}} \\; cm")
+        else:
+            st.latex(r"b_o = (c_1 + d/2) + (c_2 + d/2)")
+            st.latex(f"b_o = {p_props['L1']:.1f} + {p_props['L2']:.1f} = \\mathbf{{{p_props['bo']:.2f}}} \\; cm")
             
         st.markdown("**B) Section Properties ($J_c$)**")
         st.write("Polar Moment of Inertia of shear critical section:")
@@ -279,15 +142,14 @@ def render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir):
     # C. CHECK CAPACITY
     st.markdown("#### **Verification (ACI 318)**")
     
-    # Capacity Formula
-    phi_vc = phi_shear * 1.06 * (fc**0.5) # Basic formula
-    # (Ideally should check 3 formulas, but using the governing one for slabs usually)
+    # Capacity: governing of the 3 ACI equations (from the shared analysis)
+    phi_vc = detail['v_allow']
     
     res_col1, res_col2 = st.columns(2)
     with res_col1:
         st.write("Allowable Shear Strength ($\\phi v_c$):")
-        st.latex(r"\phi v_c = \phi \cdot 1.06 \sqrt{f_c'}")
-        st.latex(f"\\phi v_c = {phi_shear} \\cdot 1.06 \\cdot \\sqrt{{{fc}}} = \\mathbf{{{phi_vc:.2f}}} \\; ksc")
+        st.latex(r"\phi v_c = \phi \cdot \min(v_{c1}, v_{c2}, v_{c3})")
+        st.latex(f"\\phi v_c = \\mathbf{{{phi_vc:.2f}}} \\; ksc \\quad (\\phi = {detail['phi']})")
     
     with res_col2:
         ratio = v_max / phi_vc
@@ -299,6 +161,33 @@ def render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir):
             req_thick = d_avg * (v_max/phi_vc) + cover + 1.6
             st.caption(f"Suggestion: Increase slab thickness to > {req_thick:.0f} cm")
 
+@perf.timed()
+def render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir, analysis):
+    # Unpack Props
+    h_slab = float(mat_props['h_slab'])
+    cover = float(mat_props['cover'])
+    fc = float(mat_props['fc'])
+    fy = float(mat_props['fy'])
+    phi_bend = mat_props.get('phi', 0.90)        
+    cfg = mat_props.get('rebar_cfg', {})
+    
+    # Geometry from Inputs
+    L_span = data['L_span']
+    c_para = float(data['c_para']) # Dimension parallel to span
+
+    Mo = data['Mo']
+    m_vals = data['M_vals']
+    span_type_str = data.get('span_type_str', 'Interior')
+
+    # 1. ANALYSIS HEADER
+    st.markdown(f"### 1️⃣ Analysis: {axis_id}-Direction ({span_type_str})")
+    with st.expander(f"📊 Load & Moment Distribution", expanded=False):
+        st.write(f"**Total Static Moment ($M_o$):** {Mo:,.0f} kg-m")
+        st.write(f"**Unbalanced Moment ($M_{{sc}}$):** {m_vals.get('M_unbal', 0):,.0f} kg-m")
+
+    # 2. DETAILED PUNCHING SHEAR (THE CORE UPGRADE)
+    render_punching_check(axis_id, cover, analysis)
+
     # 3. REINFORCEMENT
     st.markdown("---")
     st.markdown("### 3️⃣ Reinforcement Design")
@@ -328,14 +217,7 @@ def render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir):
     df_res = pd.DataFrame(results)[["Label", "Mu", "As_req", "As_prov", "DC", "Note"]]
     st.dataframe(df_res.style.background_gradient(subset=["DC"], cmap="RdYlGn_r", vmin=0, vmax=1.2), use_container_width=True, hide_index=True)
     
-    st.markdown("#### 🔍 Select Zone for Detailed Calculation")
-    sel_zone = st.selectbox(f"Show details for ({axis_id}):", [z['Label'] for z in zones], key=f"sel_{axis_id}")
-    
-    target = next(z for z in results if z['Label'] == sel_zone)
-    raw_inputs = (target['Mu'], target['b'], h_slab, cover, fc, fy, target['db'], target['s'], phi_bend)
-    pct_val = (target['Mu'] / Mo * 100) if Mo > 0 else 0
-    
-    show_detailed_calculation(sel_zone, target, raw_inputs, pct_val, Mo)
+    render_zone_detail(results, axis_id, h_slab, cover, fc, fy, phi_bend, Mo)
 
     if HAS_PLOTS:
         st.markdown("---")
@@ -344,25 +226,43 @@ def render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir):
             "CS_Top": f"DB{d_cst}@{s_cst}", "CS_Bot": f"DB{d_csb}@{s_csb}",
             "MS_Top": f"DB{d_mst}@{s_mst}", "MS_Bot": f"DB{d_msb}@{s_msb}"
         }
-        with t1: st.pyplot(ddm_plots.plot_ddm_moment(L_span, c_para/100, m_vals))
-        with t2: st.pyplot(ddm_plots.plot_rebar_detailing(L_span, h_slab, c_para, rebar_map, axis_id))
+        with t1: figure_cache.st_figure(ddm_plots.plot_ddm_moment, L_span, c_para/100, m_vals)
+        with t2: figure_cache.st_figure(ddm_plots.plot_rebar_detailing, L_span, h_slab, c_para, rebar_map, axis_id)
+
+@fragment
+@perf.timed()
+def render_zone_detail(results, axis_id, h_slab, cover, fc, fy, phi_bend, Mo):
+    """Zone selectbox + detailed calc (own fragment -> switching zones reruns only this)"""
+    st.markdown("#### 🔍 Select Zone for Detailed Calculation")
+    sel_zone = st.selectbox(f"Show details for ({axis_id}):", [z['Label'] for z in results], key=f"sel_{axis_id}")
+    
+    target = next(z for z in results if z['Label'] == sel_zone)
+    raw_inputs = (target['Mu'], target['b'], h_slab, cover, fc, fy, target['db'], target['s'], phi_bend)
+    pct_val = (target['Mu'] / Mo * 100) if Mo > 0 else 0
+    
+    show_detailed_calculation(sel_zone, target, raw_inputs, pct_val, Mo)
 
 # ========================================================
-# 4. MAIN ENTRY POINT
+# 3. MAIN ENTRY POINT
 # ========================================================
-def render_dual(data_x, data_y, mat_props, w_u):
-    st.markdown("## 🏗️ RC Slab Design (DDM Analysis)")
-    
-    # Show Config Summary
+SPAN_CONDITIONS = ["Interior Span", "End Span - Edge Beam", "End Span - No Beam"]
+
+@fragment
+@perf.timed()
+def render_direction(mat_props, axis_id, w_u, is_main_dir, analysis):
+    """Span condition radio + whole direction check (radio reruns only this direction)"""
     with st.expander("⚙️ Span Continuity Settings", expanded=True):
-        c1, c2 = st.columns(2)
-        with c1:
-            type_x = st.radio("Span Condition (X-Axis):", ["Interior Span", "End Span - Edge Beam", "End Span - No Beam"], key="sx")
-            data_x = logic.update_moments_based_on_config(data_x, type_x)
-        with c2:
-            type_y = st.radio("Span Condition (Y-Axis):", ["Interior Span", "End Span - Edge Beam", "End Span - No Beam"], key="sy")
-            data_y = logic.update_moments_based_on_config(data_y, type_y)
+        span_type = st.radio(f"Span Condition ({axis_id}-Axis):", SPAN_CONDITIONS, key=f"s{axis_id.lower()}")
+    # Shared analysis is read-only -> moments for this span condition come as its own copy
+    data = analysis.ddm_direction(axis_id.lower(), span_type)
+    render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir, analysis)
+
+@perf.timed()
+def render_dual(mat_props, w_u, analysis=None):
+    st.markdown("## 🏗️ RC Slab Design (DDM Analysis)")
+    if analysis is None:
+        analysis = calc.AnalysisResult.from_inputs(mat_props)
 
     tab_x, tab_y = st.tabs(["➡️ X-Direction Check", "⬆️ Y-Direction Check"])
-    with tab_x: render_interactive_direction(data_x, mat_props, "X", w_u, True)
-    with tab_y: render_interactive_direction(data_y, mat_props, "Y", w_u, False)
+    with tab_x: render_direction(mat_props, "X", w_u, True, analysis)
+    with tab_y: render_direction(mat_props, "Y", w_u, False, analysis)
@@ -0,0 +1,121 @@
+import numpy as np
+from typing import Dict, Any, List, Tuple
+
+# ========================================================
+# EFM ENGINEERING LOGIC (NUMPY ONLY - NO UI IMPORTS)
+# ========================================================
+# Used by tab_efm (display) and by headless workers (flatslab package)
+
+def run_moment_distribution(FEM: float, DF_slab: float, iterations: int = 4) -> Tuple[List[Dict[str, Any]], float, float]:
+    """
+    Simulate Hardy Cross Method (Simplified for single span demo).
+    Returns: (history rows, total moment at A, total moment at B)
+    """
+    history = []
+
+    # 1. Fixed End Moments
+    M_A = FEM   # CCW (+)
+    M_B = -FEM  # CW (-)
+
+    history.append({"Step": "1. FEM", "Joint A": M_A, "Joint B": M_B, "Description": "Initial Load"})
+
+    curr_unbal_A = M_A
+    curr_unbal_B = M_B
+
+    total_A = M_A
+    total_B = M_B
+
+    for i in range(iterations):
+        # 2. Balance
+        bal_A = -1 * curr_unbal_A * DF_slab
+        bal_B = -1 * curr_unbal_B * DF_slab
+
+        history.append({
+            "Step": f"Iter {i+1}: Balance",
+            "Joint A": bal_A, "Joint B": bal_B,
+            "Description": f"Bal = -M_unbal x {DF_slab:.3f}"
+        })
+
+        total_A += bal_A
+        total_B += bal_B
+
+        # 3. Carry Over (CO)
+        co_to_A = bal_B * 0.5
+        co_to_B = bal_A * 0.5
+
+        history.append({
+            "Step": f"Iter {i+1}: Carry Over",
+            "Joint A": co_to_A, "Joint B": co_to_B,
+            "Description": "CO = M_bal x 0.5"
+        })
+
+        total_A += co_to_A
+        total_B += co_to_B
+
+        # Update Unbalanced for next loop
+        curr_unbal_A = co_to_A
+        curr_unbal_B = co_to_B
+
+    history.append({"Step": "🏁 SUM", "Joint A": total_A, "Joint B": total_B, "Description": "Total Moment"})
+    return history, total_A, total_B
+
+def calculate_capacity_check(Mu_kgm, b_width_m, h_slab, cover, fc, fy, db, spacing) -> Dict[str, Any]:
+    """
+    Calculates As_req vs As_prov and checks capacity.
+    """
+    # Units: cm, kg, ksc
+    b_cm = b_width_m * 100
+    # Effective depth d
+    d_eff = h_slab - cover - (db/20.0) # db in mm -> db/2 in cm = db/20
+
+    Mu_kgcm = Mu_kgm * 100.0
+    phi = 0.90
+
+    # 1. Required Steel
+    try:
+        Rn = Mu_kgcm / (phi * b_cm * d_eff**2)
+    except ZeroDivisionError:
+        Rn = 0
+
+    rho_req = 0.0018 # Min
+
+    # Check if section can handle moment
+    term = 1 - (2 * Rn) / (0.85 * fc)
+
+    if term >= 0:
+        rho_calc = (0.85 * fc / fy) * (1 - np.sqrt(term))
+        rho_req = max(rho_calc, 0.0018)
+    else:
+        # Section Fail (Moment too high for concrete section)
+        rho_req = 999
+        rho_calc = 999
+
+    As_req = rho_req * b_cm * d_eff
+
+    # 2. Provided Steel
+    bar_area = 3.1416 * (db/10.0)**2 / 4.0
+    if spacing > 0:
+        As_prov = (b_cm / spacing) * bar_area
+    else:
+        As_prov = 0
+
+    # 3. Capacity
+    a = (As_prov * fy) / (0.85 * fc * b_cm)
+    Mn = As_prov * fy * (d_eff - a/2.0)
+    PhiMn = 0.90 * Mn / 100.0 # Convert back to kg-m
+
+    dc_ratio = Mu_kgm / PhiMn if PhiMn > 0 else 999
+
+    # Return all intermediate values for display
+    return {
+        "d": d_eff,
+        "Rn": Rn,
+        "rho_calc": rho_calc,
+        "rho_req": rho_req,
+        "As_req": As_req,
+        "As_prov": As_prov,
+        "a_depth": a,
+        "PhiMn": PhiMn,
+        "Ratio": dc_ratio,
+        "Pass": dc_ratio <= 1.0 and rho_calc != 999
+    }
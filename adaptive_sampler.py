@@ -0,0 +1,254 @@
+# adaptive_sampler.py
+import itertools
+
+import numpy as np
+
+import calculations as calc
+import sweep
+
+# ==========================================
+# ADAPTIVE PASS/FAIL BOUNDARY (QUADTREE / OCTREE)
+# ==========================================
+# A uniform sweep spends almost every evaluation far from ratio = 1.0. Here a coarse grid
+# is split (2D: 4 children, 3D: 8 children) only where the governing ratio changes side
+# of the limit between the cell corners, down to `depth` levels -> the boundary gets the
+# resolution of a 2**depth finer grid for a fraction of its evaluations.
+# Example:
+#   res = refine_boundary({"Lx": (4, 12, 9), "h_slab": (15, 40, 6)}, base_inputs, depth=4)
+#   res["contours"][0]["segments"]      # (m, 2, 2) line segments of ratio = limit
+#   res["evaluations"], res["uniform_evaluations"]
+# Caveat: a pass (or fail) island smaller than one coarse cell whose corners all sit on
+# the other side is never seen -> the coarse grid has to resolve the shape of the region.
+
+DEFAULT_CHECKS = ("punch_ratio", "oneway_ratio", "defl_ratio") # governing = max of these
+DEFAULT_DEPTH = 4
+
+
+def batch_evaluator(base_inputs=None, factors=None, checks=DEFAULT_CHECKS):
+    """
+    Default evaluator: one FlatSlabBatch run per refinement level
+    Returns: fn(columns) -> (governing ratio, index of the governing check) per point
+    """
+    base_inputs = base_inputs or {}
+
+    def evaluate(columns):
+        n = len(next(iter(columns.values())))
+        cases = dict(columns)
+        for k in sweep.ENGINE_KEYS:
+            if k not in cases and k in base_inputs:
+                cases[k] = np.full(n, base_inputs[k])
+        res = calc.FlatSlabBatch(cases, factors=factors).run_full_analysis()
+        ratios = np.column_stack([np.asarray(res[c], dtype=float) for c in checks])
+        ratios = np.where(np.isnan(ratios), np.inf, ratios) # undefined check -> treat as fail
+        gov = ratios.argmax(axis=1)
+        return ratios[np.arange(n), gov], gov
+
+    return evaluate
+
+
+class _Lattice:
+    """Evaluated points of the finest grid, keyed by integer coordinates"""
+
+    def __init__(self, keys, lo, step, dims, evaluate):
+        self.keys, self.lo, self.step, self.dims = keys, lo, step, dims
+        self.evaluate = evaluate
+        self.index = {} # flat lattice code -> row in ratio/gov
+        self.ratio, self.gov, self.codes = [], [], []
+
+    def coords(self, ij):
+        return self.lo + ij * self.step
+
+    def ensure(self, ij):
+        """Evaluate every lattice point of ij (k, d) not seen before (one batch)"""
+        codes = np.ravel_multi_index(ij.T, self.dims)
+        new = [c for c in np.unique(codes).tolist() if c not in self.index]
+        if not new:
+            return 0
+        pts = np.column_stack(np.unravel_index(new, self.dims))
+        xyz = self.coords(pts)
+        ratio, gov = self.evaluate({k: xyz[:, i] for i, k in enumerate(self.keys)})
+        for c in new:
+            self.index[c] = len(self.index)
+        self.codes += new
+        self.ratio.append(np.asarray(ratio, dtype=float))
+        self.gov.append(np.asarray(gov))
+        return len(new)
+
+    def lookup(self, ij):
+        """Governing ratio at lattice points ij (..., d), all already evaluated"""
+        rows = np.array([self.index[c] for c in np.ravel_multi_index(ij.reshape(-1, ij.shape[-1]).T, self.dims).tolist()])
+        return np.concatenate(self.ratio)[rows].reshape(ij.shape[:-1])
+
+
+def _face_segments(p0, du, dv, f):
+    """
+    Marching squares on one square face: corners c0=p0, c1=p0+du, c2=p0+du+dv, c3=p0+dv
+    f = ratio - limit at the corners (f <= 0 passes). Returns [(point_a, point_b), ...]
+    """
+    corners = (p0, p0 + du, p0 + du + dv, p0 + dv)
+    inside = [v <= 0.0 for v in f]
+    cross = {}
+    for e, (a, b) in enumerate(((0, 1), (1, 2), (2, 3), (3, 0))):
+        if inside[a] != inside[b]:
+            t = min(max(f[a] / (f[a] - f[b]), 0.0), 1.0) if np.isfinite(f[a] - f[b]) else 0.5
+            cross[e] = corners[a] + t * (corners[b] - corners[a])
+    if len(cross) == 2:
+        a, b = cross.values()
+        return [(a, b)]
+    if len(cross) == 4:
+        # Saddle: the mean of the corners decides which diagonal is connected
+        center_in = float(np.mean(np.where(np.isfinite(f), f, 1.0))) <= 0.0
+        pairs = ((0, 1), (2, 3)) if center_in == inside[0] else ((3, 0), (1, 2))
+        return [(cross[a], cross[b]) for a, b in pairs]
+    return []
+
+
+def refine_boundary(axes, base_inputs=None, factors=None, checks=DEFAULT_CHECKS, limit=1.0,
+                    depth=DEFAULT_DEPTH, slice_key=None, evaluate=None):
+    """
+    Adaptive feasibility boundary over 2 or 3 design variables
+    axes: {key: (lo, hi, n_coarse)} in plotting order, e.g. {"Lx": (4, 12, 9), "h_slab": (15, 40, 6)}
+    checks: FlatSlabBatch ratio fields, governing ratio = max (ignored if `evaluate` is given)
+    depth: refinement levels (finest spacing = coarse spacing / 2**depth)
+    slice_key: 3D only -> contours are drawn on planes of this key (default: last axis)
+    evaluate: optional fn(columns) -> (ratio, governing index) replacing FlatSlabBatch
+    Returns: dict with points / ratio / passes, contours [{slice, segments (m, 2, 2)}],
+             evaluations vs uniform_evaluations and per-level stats
+    """
+    keys = list(axes)
+    d = len(keys)
+    if d not in (2, 3):
+        raise ValueError("refine_boundary needs 2 or 3 axes")
+    lo = np.array([float(axes[k][0]) for k in keys])
+    hi = np.array([float(axes[k][1]) for k in keys])
+    n = np.array([int(axes[k][2]) for k in keys])
+    if (n < 2).any() or (hi <= lo).any():
+        raise ValueError("every axis needs lo < hi and at least 2 coarse points")
+    depth = int(depth)
+    fine = 2 ** depth
+    dims = tuple((n - 1) * fine + 1)
+    evaluate = evaluate or batch_evaluator(base_inputs, factors, checks)
+    lat = _Lattice(keys, lo, (hi - lo) / (dims - np.ones(d)), dims, evaluate)
+
+    # Quadtree / octree: cells = integer origin on the finest lattice + common size
+    offsets = np.array(list(itertools.product((0, 1), repeat=d)))
+    cells = np.indices(n - 1).reshape(d, -1).T * fine
+    size = fine
+    levels = []
+    while True:
+        corners = cells[:, None, :] + offsets[None, :, :] * size
+        new = lat.ensure(corners.reshape(-1, d)) if len(cells) else 0
+        ratio = lat.lookup(corners) if len(cells) else np.zeros((0, len(offsets)))
+        ok = ratio <= limit
+        mixed = ok.any(axis=1) & ~ok.all(axis=1)
+        levels.append({"cell_size": size, "cells": len(cells), "mixed": int(mixed.sum()), "new_evaluations": new})
+        if size == 1 or not mixed.any():
+            leaves, leaf_ratio = cells[mixed], ratio[mixed]
+            break
+        size //= 2
+        cells = (cells[mixed][:, None, :] + offsets[None, :, :] * size).reshape(-1, d)
+
+    contours = _contours(lat, keys, leaves, leaf_ratio, size, offsets, limit, slice_key)
+
+    pts = np.column_stack(np.unravel_index(lat.codes, dims)) if lat.codes else np.zeros((0, d), int)
+    xyz = lat.coords(pts)
+    ratio = np.concatenate(lat.ratio) if lat.ratio else np.zeros(0)
+    return {
+        "axes": keys,
+        "limit": limit,
+        "checks": tuple(checks),
+        "points": {k: xyz[:, i] for i, k in enumerate(keys)},
+        "ratio": ratio,
+        "governing": np.concatenate(lat.gov) if lat.gov else np.zeros(0, int),
+        "passes": ratio <= limit,
+        "contours": contours,
+        "evaluations": len(lat.codes),
+        "uniform_evaluations": int(np.prod(dims)),
+        "levels": levels,
+    }
+
+
+def _contours(lat, keys, leaves, leaf_ratio, size, offsets, limit, slice_key):
+    """Boundary segments through the leaf cells (2D: one set, 3D: one set per lattice plane)"""
+    d = len(keys)
+    if d == 2:
+        u, v, planes = 0, 1, [None]
+    else:
+        s = keys.index(slice_key) if slice_key else d - 1
+        u, v = [i for i in range(d) if i != s]
+        planes = sorted({int(c[s]) + k * size for c in leaves for k in (0, 1)})
+
+    out = []
+    for z in planes:
+        faces = {}
+        for cell, r in zip(leaves, leaf_ratio):
+            corner_ratio = dict(zip(map(tuple, offsets.tolist()), r))
+            if z is None:
+                faces[tuple(cell)] = [corner_ratio[o] for o in ((0, 0), (1, 0), (1, 1), (0, 1))]
+                continue
+            k = z - int(cell[s])
+            if k not in (0, size):
+                continue
+            def off(a, b):
+                o = [0] * d
+                o[s], o[u], o[v] = k // size, a, b
+                return tuple(o)
+            origin = tuple(cell[i] + (k if i == s else 0) for i in range(d))
+            faces[origin] = [corner_ratio[off(a, b)] for a, b in ((0, 0), (1, 0), (1, 1), (0, 1))]
+
+        segs = []
+        du, dv = np.zeros(2), np.zeros(2)
+        du[0] = lat.step[u] * size
+        dv[1] = lat.step[v] * size
+        for origin, r in faces.items():
+            p0 = lat.coords(np.array(origin))[[u, v]]
+            segs += _face_segments(p0, du, dv, np.asarray(r, dtype=float) - limit)
+        out.append({
+            "slice": None if z is None else float(lat.lo[s] + z * lat.step[s]),
+            "segments": np.array(segs, dtype=float).reshape(-1, 2, 2),
+        })
+    if d == 3:
+        out = [c for c in out if len(c["segments"])]
+    return out
+
+
+def plot_boundary(result, show_points=True):
+    """Matplotlib Figure of the pass/fail points and boundary contours (2D or per 3D slice)"""
+    from matplotlib import colormaps
+    from matplotlib.collections import LineCollection
+    import figure_manager
+
+    keys = result["axes"]
+    fig, ax = figure_manager.subplots(figsize=(8, 6))
+    if show_points:
+        p, ok = result["points"], result["passes"]
+        ax.scatter(p[keys[0]][ok], p[keys[1]][ok], s=4, c="#16a34a", label="pass")
+        ax.scatter(p[keys[0]][~ok], p[keys[1]][~ok], s=4, c="#dc2626", label="fail")
+    contours = result["contours"]
+    colors = colormaps["viridis"](np.linspace(0, 1, max(len(contours), 1))) if len(keys) == 3 else ["k"]
+    stride = max(1, len(contours) // 8) # keep the legend short on fine 3D results
+    for i, (c, color) in enumerate(zip(contours, colors)):
+        label = f"{keys[2]} = {c['slice']:g}" if c["slice"] is not None else f"ratio = {result['limit']:g}"
+        if i % stride and i != len(contours) - 1:
+            label = None
+        ax.add_collection(LineCollection(c["segments"], colors=[color], linewidths=1.5, label=label))
+    ax.autoscale()
+    ax.set_xlabel(keys[0])
+    ax.set_ylabel(keys[1])
+    ax.set_title(f"Feasibility boundary ({result['evaluations']:,} of {result['uniform_evaluations']:,} "
+                 f"grid points evaluated)")
+    ax.legend(fontsize=8, loc="best")
+    return fig
+
+
+if __name__ == "__main__":
+    # Quick demo: span x slab thickness chart, interior column
+    import time
+    base = {"SDL": 150.0, "LL": 300.0, "col_type": "interior", "Ly": 6.0, "cx": 40.0, "cy": 40.0}
+    t0 = time.perf_counter()
+    res = refine_boundary({"Lx": (4.0, 12.0, 9), "h_slab": (12.0, 40.0, 8)}, base, depth=5)
+    print(f"{res['evaluations']:,} evaluations instead of {res['uniform_evaluations']:,} "
+          f"({res['evaluations'] / res['uniform_evaluations']:.1%}) in {time.perf_counter() - t0:.2f} s")
+    for lv in res["levels"]:
+        print(f"  cell {lv['cell_size']:>3}: {lv['cells']:>5} cells, {lv['mixed']:>4} on the boundary")
+    print(f"{len(res['contours'][0]['segments'])} boundary segments")
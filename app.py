@@ -1,3 +1,5 @@
+import sqlite3
+
 import streamlit as st
 import numpy as np
 import pandas as pd
@@ -41,6 +43,36 @@ except ImportError:
     st.error("🚨 CRITICAL ERROR: ไม่พบไฟล์ 'calculations.py' กรุณาตรวจสอบไฟล์ในโฟลเดอร์")
     st.stop()
 
+# 1.1 Result Cache (ข้ามการคำนวณซ้ำ เมื่อ Input ไม่เปลี่ยน เช่น เปลี่ยนแค่ Radio/Selectbox)
+try:
+    from result_cache import cached_analysis
+except ImportError:
+    cached_analysis = None
+
+# 1.1.1 Disk Store (SQLite ร่วมกันทุก process/replica -> restart แล้วไม่ต้องคำนวณใหม่; FLATSLAB_STORE=off ปิด)
+try:
+    import result_store
+    import result_cache
+    import figure_cache
+    disk_store = result_store.get_default_store()
+    result_cache.get_default_cache().store = disk_store
+    figure_cache.set_store(disk_store)
+except (ImportError, ValueError, OSError, sqlite3.Error): # unwritable cache dir / corrupt file -> memory only
+    disk_store = None
+
+# 1.2 Stage Timing (เปิดใน Sidebar -> ⏱️ Performance; ปิดอยู่ = แทบไม่มี overhead)
+import perf
+
+PERF_ST_CALLS = ("latex", "markdown", "write", "image", "pyplot", "dataframe", "table", "metric")
+if "perf_recorder" not in st.session_state:
+    st.session_state.perf_recorder = perf.Recorder()
+perf_on = st.session_state.get("perf_on", False) # checkbox state from the previous rerun
+perf_run = None
+perf.reap() # close runs of earlier reruns that were interrupted (st.stop / new rerun) -> no leak when off
+if perf_on:
+    perf.instrument(st, PERF_ST_CALLS, "st") # count + time st.latex etc. (once per process)
+    perf_run = st.session_state.perf_recorder.run("rerun").start()
+
 # 2. UI Modules (DDM_Tab คือไฟล์ใหม่ที่เราเพิ่งสร้าง)
 try:
     import DDM_Tab       # <--- แก้ชื่อ Import ให้ตรงกับไฟล์ใหม่
@@ -140,6 +172,30 @@ with st.sidebar.expander("3. Loads & Factors", expanded=False):
     phi_shear = c_phi1.number_input("φ Shear", value=0.85)
     phi_bend = c_phi2.number_input("φ Bending", value=0.90)
 
+# --- Quick Estimate: ความหนาเบื้องต้นจากตารางที่คำนวณไว้แล้ว (prelim_tables.npz, ไม่รัน engine) ---
+try:
+    import prelim_tables
+    prelim = prelim_tables.get_tables()
+except ImportError:
+    prelim = None
+
+with st.sidebar.expander("⚡ Quick Estimate (Preliminary h)", expanded=False):
+    if prelim is None:
+        st.caption("ไม่พบตารางของ engine รุ่นนี้ -> `python prelim_tables.py build`")
+    else:
+        est = prelim.lookup(Lx, Ly, LL, min(cx, cy), col_type, has_drop)
+        if np.isnan(est["h_slab"]):
+            st.warning(f"ต้องการมากกว่า {prelim.meta['h_range'][1]:g} cm (เกินช่วงตาราง)")
+        else:
+            st.metric("Min. slab thickness", f"{est['h_rounded']:g} cm",
+                      delta=f"{h_slab - est['h_rounded']:+.1f} cm vs current", delta_color="normal")
+            st.caption(f"≈ {est['h_slab']:.1f} cm, governed by **{est['governing']}**"
+                       + ("" if est["in_range"] else " · ⚠️ outside table range (clamped)"))
+        fixed = prelim.meta["fixed"]
+        if (fc, fy, SDL) != (fixed["fc"], fixed["fy"], fixed["SDL"]):
+            st.caption("⚠️ f'c / fy / SDL differ from the table assumptions")
+        st.caption(f"Assumes {prelim.assumptions()}")
+
 # --- Section 4: Reinforcement ---
 with st.sidebar.expander("4. Reinforcement", expanded=False):
     st.markdown("### 🛠️ Rebar Configuration")
@@ -227,8 +283,13 @@ user_inputs = {
 factors = {'DL': factor_dl, 'LL': factor_ll, 'phi': phi_shear}
 
 try:
-    model = FlatSlabDesign(user_inputs, factors=factors)
-    results = model.run_full_analysis()
+    # ONE immutable AnalysisResult -> every tab reads the same numbers from it
+    with perf.timer("engine.analysis"):
+        if cached_analysis:
+            results = cached_analysis(user_inputs, factors)
+        else:
+            model = FlatSlabDesign(user_inputs, factors=factors)
+            results = model.analyze()
     
     # Unpack Results safely
     loads_res = results.get('loads', {})
@@ -243,6 +304,8 @@ try:
 
 except Exception as e:
     st.error(f"❌ Calculation Error: {str(e)}")
+    if perf_run is not None:
+        perf_run.stop(aborted=True) # st.stop() ends the script -> record the run now
     st.stop()
 
 # =========================================================
@@ -256,11 +319,12 @@ st.caption(f"Design Code: ACI 318 / EIT | Concrete: {fc} ksc | Steel: {fy} ksc")
 st.markdown("---")
 
 # =========================================================
-# 5. DETAILED TABS
+# 5. DETAILED VIEWS (LAZY ROUTER)
 # =========================================================
-t1, t2, t3, t4 = st.tabs(["📐 Drawings & Geom", "📝 Calculation Detail", "📊 Moment (DDM)", "🏗️ Stiffness (EFM)"])
+# เดิม st.tabs รันทุก Tab ทุกครั้ง (รูป/LaTeX ที่ไม่ได้ดูก็ถูกสร้าง)
+# ตอนนี้: เลือก View ด้วย Radio -> รันเฉพาะ render ของ View ที่เลือกเท่านั้น
 
-with t1:
+def view_drawings():
     # Pass Data to Drawing Module
     if 'tab_drawings' in globals():
         drop_data = {"has_drop": has_drop, "width": drop_w, "length": drop_l, "depth": h_drop}
@@ -276,31 +340,31 @@ with t1:
     else:
         st.info("Module 'tab_drawings' not loaded. (Drawing Placeholder)")
 
-with t2:
+def view_calc():
     if 'tab_calc' in globals():
         tab_calc.render(
             punch_res=punch_res,
             v_oneway_res=shear_res,
             mat_props=user_inputs,
             loads=loads_res,
-            Lx=Lx, Ly=Ly
+            Lx=Lx, Ly=Ly,
+            analysis=results
         )
     else:
          st.info("Module 'tab_calc' not loaded.")
 
-with t3:
+def view_ddm():
     # เรียกใช้ DDM_Tab ที่เราเพิ่งสร้าง
     if 'DDM_Tab' in globals():
         DDM_Tab.render_dual(
-            data_x=ddm_res.get('x', {}),
-            data_y=ddm_res.get('y', {}),
             mat_props=user_inputs,
-            w_u=wu
+            w_u=wu,
+            analysis=results
         )
     else:
         st.error("ไม่พบโมดูล DDM_Tab")
 
-with t4:
+def view_efm():
     if 'tab_efm' in globals():
         tab_efm.render(
             c1_w=cx, c2_w=cy, L1=Lx, L2=Ly, lc=lc, h_slab=h_slab, fc=fc,
@@ -309,7 +373,62 @@ with t4:
             col_type=col_type,
             h_drop=h_drop + h_slab if has_drop else h_slab,
             drop_w=drop_w/100 if has_drop else 0,
-            drop_l=drop_l/100 if has_drop else 0
+            drop_l=drop_l/100 if has_drop else 0,
+            analysis=results
         )
     else:
         st.info("Module 'tab_efm' not loaded. (EFM Placeholder)")
+
+VIEWS = {
+    "📐 Drawings & Geom": view_drawings,
+    "📝 Calculation Detail": view_calc,
+    "📊 Moment (DDM)": view_ddm,
+    "🏗️ Stiffness (EFM)": view_efm,
+}
+
+with st.sidebar.expander("🖥️ Display", expanded=False):
+    render_all = st.checkbox("Render all tabs at once (slower)", value=False,
+                             help="ปิด = คำนวณ/วาดเฉพาะหน้าที่เลือก (เร็วกว่า)")
+
+if render_all:
+    for tab, (view_name, view_fn) in zip(st.tabs(list(VIEWS)), VIEWS.items()):
+        with tab, perf.timer("view." + view_name):
+            view_fn()
+else:
+    active_view = st.radio("View", list(VIEWS), horizontal=True,
+                           key="active_view", label_visibility="collapsed")
+    with perf.timer("view." + active_view):
+        VIEWS[active_view]()
+
+# =========================================================
+# 6. PERFORMANCE PANEL (LAST RERUN + HISTORY)
+# =========================================================
+if perf_run is not None:
+    perf_run.stop() # the panel itself is not timed
+
+with st.sidebar.expander("⏱️ Performance", expanded=False):
+    st.checkbox("Record timings", key="perf_on",
+                help="จับเวลา engine stages / render / figures / st.latex ทุก rerun (เก็บ 50 ครั้งล่าสุด)")
+    recorder = st.session_state.perf_recorder
+    last = recorder.last()
+    if perf_on and last:
+        st.metric("Last rerun", f"{last['total'] * 1e3:,.0f} ms")
+        rows = recorder.breakdown(last)
+        st.dataframe(pd.DataFrame(rows, columns=["name", "ms", "count", "share"]).style.format(
+            {"ms": "{:,.1f}", "share": "{:.0%}"}), hide_index=True, width="stretch")
+        if len(recorder.history) > 1:
+            st.caption("History (ms per rerun)")
+            st.line_chart(pd.DataFrame({"total": [r["total"] * 1e3 for r in recorder.history]}))
+            mean = recorder.summary()
+            st.dataframe(pd.DataFrame(
+                [{"name": k, "mean ms": v["mean_ms"], "mean count": v["mean_count"]} for k, v in mean.items()]
+            ).sort_values("mean ms", ascending=False).style.format({"mean ms": "{:,.1f}", "mean count": "{:.1f}"}),
+                hide_index=True, width="stretch")
+        if st.button("Clear history", key="perf_clear"):
+            recorder.clear()
+    if perf_on and disk_store is not None:
+        ds = disk_store.stats()
+        st.caption(f"Disk store: {ds['entries']:,} entries, {ds['bytes'] / 2**20:,.1f} MB "
+                   f"(hits {ds['hits']}, misses {ds['misses']})")
+    elif perf_on:
+        st.caption("Timings appear from the next rerun.")
@@ -0,0 +1,9 @@
+# benchmarks/__init__.py
+"""
+Benchmark suite: calculation kernels, the FlatSlabDesign pipeline and every figure function
+on a fixed case corpus (interior / edge / corner x flat / drop).
+    python -m benchmarks run -o bench.json --compare
+End-to-end rerun latency with N concurrent AppTest sessions (needs streamlit):
+    python -m benchmarks.load_test --sessions 8 --steps 25 -o load.json
+Run from the repository root (modules are imported from there).
+"""
@@ -0,0 +1,375 @@
+# benchmarks/bench.py
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+
+import calculations as calc
+import DDM_Logic
+import figure_manager
+from benchmarks import corpus
+
+# ==========================================
+# BENCHMARK SUITE (KERNELS, PIPELINE, FIGURES)
+# ==========================================
+#   python -m benchmarks run -o bench.json             # time everything -> JSON
+#   python -m benchmarks run --save-baseline            # store benchmarks/baseline.json
+#   python -m benchmarks run --compare                  # ... and diff against the baseline
+#   python -m benchmarks compare old.json new.json      # exit code 1 on regression
+# Numbers are "us per call" (best of N repeats); kernel benchmarks loop over the whole
+# corpus so every column type / drop combination is represented in one figure.
+
+SCHEMA_VERSION = 1
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.15 # +15 % on the best time = regression
+DEFAULT_REPEATS = 5
+DEFAULT_MIN_TIME = 0.1 # seconds per repeat (loop count is calibrated to reach it)
+
+
+class Benchmark:
+    def __init__(self, name, group, fn, calls=1):
+        self.name = name
+        self.group = group # "kernel" | "pipeline" | "figure"
+        self.fn = fn # one loop
+        self.calls = calls # kernel calls per loop (-> us per call)
+
+
+# ==========================================
+# 1. TIMING
+# ==========================================
+def measure(fn, repeats=DEFAULT_REPEATS, min_time=DEFAULT_MIN_TIME):
+    """Calibrate the loop count to ~min_time, then time `repeats` repeats (gc off like timeit)"""
+    fn() # warm-up (imports, caches, figure pool)
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - t0 >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    times = []
+    gc_was_on = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            times.append((time.perf_counter() - t0) / loops)
+    finally:
+        if gc_was_on:
+            gc.enable()
+    return times, loops
+
+
+# ==========================================
+# 2. BENCHMARK DEFINITIONS
+# ==========================================
+def _prepare_cases():
+    """Corpus + engine results (setup, not timed)"""
+    prepared = []
+    for name, ui in corpus.cases():
+        res = calc.FlatSlabDesign(dict(ui), factors=dict(corpus.FACTORS)).run_full_analysis()
+        prepared.append((name, ui, res))
+    return prepared
+
+
+def _kernel_args(ui, res):
+    Lx, Ly, cx, cy = ui["Lx"], ui["Ly"], ui["cx"], ui["cy"]
+    d = res["geometry"]["d_slab"]
+    w_u = res["loads"]["w_u"]
+    Mu = 0.65 * 0.75 * res["ddm"]["x"]["Mo"] # interior negative, column strip
+    k = res["efm"]["x"]["stiffness"]
+    h_total = ui["h_slab"] + ui["h_drop"] if ui["has_drop"] else None
+    return {
+        "design_flexure_slab": (Mu, Ly * 100.0 / 2.0, d, ui["h_slab"], ui["fc"], ui["fy"], ui["d_bar"]),
+        "check_punching_shear": (w_u * (Lx * Ly - (cx + d) * (cy + d) / 1e4), ui["fc"], cx, cy, d,
+                                 ui["col_type"], res["efm"]["x"]["frame"]["Munbal"]),
+        "calculate_stiffness": (cx, cy, Lx, Ly, ui["lc"], ui["h_slab"], ui["fc"], h_total,
+                                ui["drop_w"] / 100.0, ui["drop_l"] / 100.0),
+        "solve_efm_distribution": (k["Kec"], k["Ks"], w_u, Lx, Ly, ui["col_type"] != "interior"),
+        "calc_rebar_logic": (Mu, Ly / 2.0, 12, 20.0, ui["h_slab"], ui["cover"], ui["fc"], ui["fy"], True),
+    }
+
+
+KERNELS = {
+    "design_flexure_slab": calc.design_flexure_slab,
+    "check_punching_shear": calc.check_punching_shear,
+    "calculate_stiffness": calc.calculate_stiffness,
+    "solve_efm_distribution": calc.solve_efm_distribution,
+    "calc_rebar_logic": DDM_Logic.calc_rebar_logic,
+}
+
+
+def kernel_benchmarks(prepared):
+    arg_sets = [_kernel_args(ui, res) for _, ui, res in prepared]
+    out = []
+    for kname, kfn in KERNELS.items():
+        args = [a[kname] for a in arg_sets]
+        def loop(kfn=kfn, args=args):
+            for a in args:
+                kfn(*a)
+        out.append(Benchmark(f"kernel.{kname}", "kernel", loop, calls=len(args)))
+    return out
+
+
+def pipeline_benchmarks(prepared):
+    inputs = [ui for _, ui, _ in prepared]
+
+    def full_analysis():
+        for ui in inputs:
+            calc.FlatSlabDesign(dict(ui), factors=dict(corpus.FACTORS)).run_full_analysis()
+
+    models = [calc.FlatSlabDesign(dict(ui), factors=dict(corpus.FACTORS)) for ui in inputs]
+    edit = {"i": 0}
+    def incremental_ll():
+        # Interactive edit: only LL changes -> stages downstream of LL rerun
+        edit["i"] += 1
+        for m in models:
+            m.update(LL=300.0 + edit["i"] % 7)
+            m.run_full_analysis()
+
+    out = [Benchmark("pipeline.run_full_analysis", "pipeline", full_analysis, calls=len(inputs)),
+           Benchmark("pipeline.run_full_analysis[LL edit]", "pipeline", incremental_ll, calls=len(inputs))]
+    by_type = {}
+    for name, ui, _ in prepared:
+        by_type.setdefault(name.rsplit("-", 1)[0], []).append(ui)
+    for group_name, uis in by_type.items():
+        def loop(uis=uis):
+            for ui in uis:
+                calc.FlatSlabDesign(dict(ui), factors=dict(corpus.FACTORS)).run_full_analysis()
+        out.append(Benchmark(f"pipeline.run_full_analysis[{group_name}]", "pipeline", loop, calls=len(uis)))
+    return out
+
+
+def _figure_args(prepared):
+    """Representative arguments per figure function (edge column with drop = busiest drawings)"""
+    _, ui, res = next(p for p in prepared if p[0].startswith("edge-drop"))
+    ddm_x = DDM_Logic.update_moments_based_on_config(dict(res["ddm"]["x"]), "End Span - No Beam")
+    m_vals = ddm_x["M_vals"]
+    k = res["efm"]["x"]["stiffness"]
+    frame = res["efm"]["x"]["frame"]
+    p = res["shear_punching"]
+    d = res["geometry"]["d_slab"]
+    rebar_map = {"CS_Top": "DB16@15", "CS_Bot": "DB12@20", "MS_Top": "DB12@20", "MS_Bot": "DB12@25"}
+    Lx, Ly, cx, cy, h = ui["Lx"], ui["Ly"], ui["cx"], ui["cy"], ui["h_slab"]
+    return {
+        ("DDM_Schematics", "draw_span_schematic"): ("End Span - No Beam",),
+        ("geometry_view", "plot_combined_view"): (Lx, Ly, cx, cy, h, ui["lc"], m_vals),
+        ("viz_torsion", "plot_torsion_member"): (ui["col_type"], cx, cy, h, Lx, Ly),
+        ("ddm_plots", "draw_span_schematic"): ("End Span - No Beam",),
+        ("ddm_plots", "plot_ddm_moment"): (Lx, cx / 100.0, m_vals),
+        ("ddm_plots", "plot_rebar_detailing"): (Lx, h, cx, rebar_map, "X"),
+        ("ddm_plots", "plot_rebar_plan_view"): (Lx, Ly, cx, rebar_map, "X"),
+        ("ddm_plots", "plot_punching_shear_geometry"): (cx, cy, d, float(p.get("bo", 2 * (cx + cy + 2 * d))),
+                                                        p.get("status", "OK"), float(p.get("ratio", 0.0))),
+        ("tab_efm", "plot_stick_model"): (k["Ks"], k["Sum_Kc"], k["Kt"], k["Kec"]),
+        ("tab_efm", "plot_moment_envelope"): (Lx, float(frame["M_neg_left"][0]), float(frame["M_neg_right"][0]),
+                                              float(frame["M_pos_max"][0]), cx),
+        ("tab_efm", "draw_section_detail"): (Ly * 50.0, h, 12, 20.0, "Column Strip Top"),
+        ("tab_ddm", "draw_span_schematic"): ("End Span - No Beam",),
+    }
+
+
+def figure_benchmarks(prepared, skipped):
+    """Build + rasterize (PNG, default dpi) = cost of a figure-cache miss"""
+    import importlib
+    out = []
+    for (mod_name, fn_name), args in _figure_args(prepared).items():
+        try:
+            fn = getattr(importlib.import_module(mod_name), fn_name)
+        except ImportError as e:
+            # UI modules (ddm_plots, tab_efm, tab_ddm) import streamlit at module level
+            skipped[f"figure.{mod_name}.{fn_name}"] = f"import failed: {e}"
+            continue
+        def loop(fn=fn, args=args):
+            figure_manager.rasterize(fn(*args))
+        out.append(Benchmark(f"figure.{mod_name}.{fn_name}", "figure", loop))
+    return out
+
+
+def collect(groups=("kernel", "pipeline", "figure")):
+    skipped = {}
+    prepared = _prepare_cases()
+    benches = []
+    if "kernel" in groups: benches += kernel_benchmarks(prepared)
+    if "pipeline" in groups: benches += pipeline_benchmarks(prepared)
+    if "figure" in groups: benches += figure_benchmarks(prepared, skipped)
+    return benches, skipped
+
+
+# ==========================================
+# 3. RUN -> JSON
+# ==========================================
+def _meta():
+    import matplotlib
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(BASELINE_PATH), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "engine_version": calc.ENGINE_VERSION,
+        "corpus_version": corpus.CORPUS_VERSION,
+        "n_cases": len(corpus.cases()),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run(filter_text=None, groups=("kernel", "pipeline", "figure"), repeats=DEFAULT_REPEATS,
+        min_time=DEFAULT_MIN_TIME, progress=None):
+    """Time every (matching) benchmark. Returns the JSON-ready results dict"""
+    warnings.filterwarnings("ignore", message="Glyph .* missing from font") # Thai labels
+    benches, skipped = collect(groups)
+    if filter_text:
+        benches = [b for b in benches if filter_text in b.name]
+        skipped = {k: v for k, v in skipped.items() if filter_text in k}
+
+    results = {}
+    for b in benches:
+        times, loops = measure(b.fn, repeats, min_time)
+        per_call = [t / b.calls * 1e6 for t in times]
+        results[b.name] = {
+            "group": b.group, "unit": "us/call",
+            "min": min(per_call), "median": statistics.median(per_call),
+            "mean": statistics.fmean(per_call),
+            "stdev": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+            "loops": loops, "repeats": repeats, "calls_per_loop": b.calls,
+        }
+        if progress: progress(b.name, results[b.name])
+    return {"schema": SCHEMA_VERSION, "meta": _meta(), "benchmarks": results, "skipped": skipped}
+
+
+def save(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("schema") != SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported benchmark schema {data.get('schema')}")
+    return data
+
+
+# ==========================================
+# 4. COMPARE AGAINST A BASELINE
+# ==========================================
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Best-of-N time per benchmark, current / baseline
+    Returns: rows [{name, base, new, ratio, status}] with status REGRESSION / faster / ok / new / missing
+    """
+    base_b, cur_b = baseline["benchmarks"], current["benchmarks"]
+    rows = []
+    for name in sorted(set(base_b) | set(cur_b)):
+        b, c = base_b.get(name), cur_b.get(name)
+        if b is None:
+            rows.append({"name": name, "base": None, "new": c["min"], "ratio": None, "status": "new"})
+            continue
+        if c is None:
+            rows.append({"name": name, "base": b["min"], "new": None, "ratio": None, "status": "missing"})
+            continue
+        ratio = c["min"] / b["min"] if b["min"] > 0 else float("inf")
+        if ratio > 1.0 + threshold:
+            status = "REGRESSION"
+        elif ratio < 1.0 / (1.0 + threshold):
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append({"name": name, "base": b["min"], "new": c["min"], "ratio": ratio, "status": status})
+    return rows
+
+
+def format_table(rows):
+    fmt = lambda v: "-" if v is None else f"{v:,.2f}"
+    width = max([len(r["name"]) for r in rows] + [9])
+    lines = [f"{'benchmark':<{width}}  {'base us':>12}  {'new us':>12}  {'ratio':>6}  status"]
+    for r in rows:
+        ratio = "-" if r["ratio"] is None else f"{r['ratio']:.2f}"
+        lines.append(f"{r['name']:<{width}}  {fmt(r['base']):>12}  {fmt(r['new']):>12}  {ratio:>6}  {r['status']}")
+    return "\n".join(lines)
+
+
+def _context_warnings(baseline, current):
+    keys = ("engine_version", "corpus_version", "python", "numpy", "matplotlib", "platform")
+    bm, cm = baseline.get("meta", {}), current.get("meta", {})
+    return [f"note: {k} differs (baseline {bm.get(k)} vs current {cm.get(k)})" for k in keys if bm.get(k) != cm.get(k)]
+
+
+# ==========================================
+# 5. COMMAND LINE
+# ==========================================
+def build_parser():
+    p = argparse.ArgumentParser(prog="python -m benchmarks", description="Flat slab benchmark suite")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    r = sub.add_parser("run", help="run the benchmarks and write JSON")
+    r.add_argument("-o", "--output", help="results JSON (default: print a summary only)")
+    r.add_argument("-k", "--filter", help="only benchmarks whose name contains this text")
+    r.add_argument("--group", action="append", choices=("kernel", "pipeline", "figure"),
+                   help="restrict to a group (repeatable)")
+    r.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    r.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="seconds per repeat")
+    r.add_argument("--quick", action="store_true", help="3 repeats x 0.02 s (smoke run)")
+    r.add_argument("--save-baseline", action="store_true", help=f"also write {BASELINE_PATH}")
+    r.add_argument("--compare", nargs="?", const=BASELINE_PATH, metavar="BASELINE",
+                   help="compare with a baseline JSON (default: the stored baseline)")
+    r.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    c = sub.add_parser("compare", help="compare two result files")
+    c.add_argument("baseline")
+    c.add_argument("current")
+    c.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    return p
+
+
+def _report(baseline, current, threshold):
+    for note in _context_warnings(baseline, current):
+        print(note, file=sys.stderr)
+    rows = compare(baseline, current, threshold)
+    print(format_table(rows))
+    n_reg = sum(r["status"] == "REGRESSION" for r in rows)
+    print(f"\n{n_reg} regression(s) at +{threshold:.0%} threshold")
+    return 1 if n_reg else 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "compare":
+        return _report(load(args.baseline), load(args.current), args.threshold)
+
+    repeats, min_time = (3, 0.02) if args.quick else (args.repeats, args.min_time)
+    progress = lambda name, r: print(f"{name:<55} {r['min']:>12,.2f} us", file=sys.stderr)
+    results = run(args.filter, tuple(args.group or ("kernel", "pipeline", "figure")),
+                  repeats, min_time, progress)
+    for name, reason in results["skipped"].items():
+        print(f"skipped {name}: {reason}", file=sys.stderr)
+    if args.output:
+        save(results, args.output)
+    if args.save_baseline:
+        save(results, BASELINE_PATH)
+    if args.compare:
+        if not os.path.exists(args.compare):
+            print(f"no baseline at {args.compare} (run with --save-baseline first)", file=sys.stderr)
+            return 2
+        return _report(load(args.compare), results, args.threshold)
+    return 0
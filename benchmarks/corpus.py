@@ -0,0 +1,48 @@
+# benchmarks/corpus.py
+import itertools
+
+# ==========================================
+# FIXED CASE CORPUS
+# ==========================================
+# Never randomize / edit existing cases: results are only comparable with a baseline
+# recorded on the same corpus. Add new cases at the end and bump CORPUS_VERSION.
+# Keys = app.py user_inputs.
+
+CORPUS_VERSION = 1
+
+COLUMN_TYPES = ("interior", "edge", "corner")
+
+# (name, Lx, Ly, h_slab, cx, cy, SDL, LL)
+GEOMETRIES = (
+    ("typical", 8.0, 6.0, 22.0, 40.0, 50.0, 150.0, 300.0),
+    ("long", 10.0, 7.5, 28.0, 50.0, 60.0, 200.0, 500.0),
+)
+
+DROP = {"h_drop": 10.0, "drop_w": 280.0, "drop_l": 220.0} # cm
+
+
+def make_case(col_type, has_drop, geometry):
+    name, Lx, Ly, h, cx, cy, sdl, ll = geometry
+    ui = {
+        "fc": 280.0, "fy": 4000.0, "h_slab": h, "cover": 2.5,
+        "Lx": Lx, "Ly": Ly, "cx": cx, "cy": cy, "lc": 3.0,
+        "col_type": col_type, "alpha_s": {"interior": 40, "edge": 30, "corner": 20}[col_type],
+        "has_edge_beam": False, "has_drop": has_drop,
+        "h_drop": 0.0, "drop_w": 0.0, "drop_l": 0.0,
+        "use_drop_as_support": False,
+        "SDL": sdl, "LL": ll, "factor_dl": 1.4, "factor_ll": 1.7,
+        "phi": 0.90, "phi_shear": 0.85, "d_bar": 12,
+        "rebar_cfg": {}, "open_w": 0.0, "open_dist": 0.0,
+    }
+    if has_drop:
+        ui.update(DROP)
+    return f"{col_type}-{'drop' if has_drop else 'flat'}-{name}", ui
+
+
+def cases():
+    """[(case_name, user_inputs)]: interior / edge / corner x flat / drop x geometries"""
+    return [make_case(col, drop, geo)
+            for col, drop, geo in itertools.product(COLUMN_TYPES, (False, True), GEOMETRIES)]
+
+
+FACTORS = {"DL": 1.4, "LL": 1.7}
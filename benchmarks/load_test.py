@@ -0,0 +1,307 @@
+# benchmarks/load_test.py
+import argparse
+import atexit
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    from streamlit.testing.v1 import AppTest
+    HAS_APPTEST = True
+except ImportError:
+    HAS_APPTEST = False
+
+try:
+    import resource # peak RSS (POSIX only)
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT) # app modules live at the repository root
+
+import figure_manager
+
+# ==========================================
+# END-TO-END RERUN LATENCY (SIMULATED SESSIONS)
+# ==========================================
+# N AppTest sessions in ONE process = N engineers on one Streamlit server: they share the
+# module-level result cache, figure cache/pool and the GIL exactly like real sessions.
+# Every session replays a seeded random script of sidebar edits (spans, column type,
+# drop panel, rebar, view switch) and each rerun is timed.
+#   python -m benchmarks.load_test --sessions 8 --steps 25 -o load.json
+#   python -m benchmarks.load_test --capacity 500      # most sessions with p95 <= 500 ms
+# The app's disk ResultStore never points at ~/.cache/flatslab (results of earlier runs
+# would make the numbers irreproducible): --store off (default) = memory caches only,
+# --store fresh = an empty SQLite file in a temp dir, deleted at exit.
+
+APP_PATH = os.path.join(ROOT, "app.py")
+DEFAULT_TIMEOUT = 120 # seconds per rerun (first run imports + draws everything)
+
+COLUMN_OPTIONS = ("Interior Column (ใน)", "Edge Column (ขอบ)", "Corner Column (มุม)")
+VIEW_OPTIONS = ("📐 Drawings & Geom", "📝 Calculation Detail", "📊 Moment (DDM)", "🏗️ Stiffness (EFM)")
+STORE_MODES = ("off", "fresh")
+
+_store_path = None # FLATSLAB_STORE chosen for this process (the app reads it once)
+
+
+def isolate_store(mode="off"):
+    """
+    Set FLATSLAB_STORE before the first app run (result_store keeps one store per process)
+    Returns: the path in effect ("off" = no disk tier)
+    """
+    global _store_path
+    if mode not in STORE_MODES:
+        raise ValueError(f"store mode must be one of {STORE_MODES}")
+    if _store_path is None:
+        if mode == "fresh":
+            tmp = tempfile.mkdtemp(prefix="flatslab_load_")
+            atexit.register(shutil.rmtree, tmp, ignore_errors=True)
+            _store_path = os.path.join(tmp, "store.sqlite3")
+        else:
+            _store_path = "off"
+        os.environ["FLATSLAB_STORE"] = _store_path
+    elif (_store_path == "off") != (mode == "off"):
+        raise RuntimeError(f"store already set to {_store_path} for this process")
+    return _store_path
+
+
+# ==========================================
+# 1. SCRIPTED SIDEBAR ACTIONS
+# ==========================================
+def _widget(at, kind, label):
+    for w in getattr(at, kind):
+        if w.label == label:
+            return w
+    raise LookupError(f"{kind} '{label}' not on the page")
+
+
+def act_spans(at, rng):
+    _widget(at, "number_input", "Span Lx (m)").set_value(rng.choice([6.0, 7.5, 8.0, 9.0, 10.0]))
+    _widget(at, "number_input", "Span Ly (m)").set_value(rng.choice([5.0, 6.0, 7.0, 8.0]))
+
+def act_col_type(at, rng):
+    _widget(at, "selectbox", "Select Column Location:").set_value(rng.choice(COLUMN_OPTIONS))
+
+def act_drop(at, rng):
+    box = _widget(at, "checkbox", "Add Drop Panel")
+    if box.value:
+        box.uncheck()
+    else:
+        box.check()
+
+def act_thickness(at, rng):
+    _widget(at, "number_input", "Slab Thickness (cm)").set_value(rng.choice([18.0, 20.0, 22.0, 25.0, 30.0]))
+
+def act_rebar(at, rng):
+    _widget(at, "selectbox", "Main Bar Diameter (mm)").set_value(rng.choice([12, 16, 20]))
+    _widget(at, "number_input", "Typical Spacing (cm)").set_value(rng.choice([15.0, 20.0, 25.0]))
+
+def act_view(at, rng):
+    at.radio(key="active_view").set_value(rng.choice(VIEW_OPTIONS))
+
+ACTIONS = {
+    "spans": act_spans,
+    "col_type": act_col_type,
+    "drop": act_drop,
+    "thickness": act_thickness,
+    "rebar": act_rebar,
+    "view": act_view,
+}
+
+
+# ==========================================
+# 2. ONE SESSION
+# ==========================================
+def run_session(session_id, steps, seed=0, timeout=DEFAULT_TIMEOUT, on_rerun=None):
+    """
+    First load + `steps` scripted edits on one AppTest session
+    Returns: {"first_load": s, "reruns": [(action, seconds)], "errors": [...], "skipped": n}
+    """
+    rng = random.Random(f"{seed}:{session_id}") # repeatable per (seed, session)
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    out = {"session": session_id, "reruns": [], "errors": [], "skipped": 0}
+
+    t0 = time.perf_counter()
+    at.run()
+    out["first_load"] = time.perf_counter() - t0
+    out["errors"] += [str(e.value) for e in at.exception]
+
+    names = list(ACTIONS)
+    for _ in range(steps):
+        name = rng.choice(names)
+        try:
+            ACTIONS[name](at, rng)
+        except LookupError:
+            out["skipped"] += 1 # widget hidden in the current state (e.g. advanced rebar mode)
+            continue
+        t0 = time.perf_counter()
+        at.run()
+        dt = time.perf_counter() - t0
+        out["reruns"].append((name, dt))
+        out["errors"] += [f"{name}: {e.value}" for e in at.exception]
+        if on_rerun: on_rerun()
+    return out
+
+
+# ==========================================
+# 3. MANY SESSIONS IN PARALLEL
+# ==========================================
+def _rss_mb():
+    """Current resident set size (Linux /proc), None elsewhere"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss_mb():
+    if not HAS_RESOURCE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024 # bytes on macOS, KB on Linux
+
+
+def _percentiles(values):
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None, "mean": None}
+    ms = np.asarray(values) * 1e3
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99),
+            "max": float(ms.max()), "mean": float(ms.mean())}
+
+
+def run_load(sessions=4, steps=20, seed=0, timeout=DEFAULT_TIMEOUT, store="off"):
+    """
+    Run `sessions` scripted sessions concurrently
+    store: "off" or "fresh" disk ResultStore (see isolate_store)
+    Returns: JSON-ready report (latency percentiles in ms, RSS in MB, figure counters)
+    """
+    if not HAS_APPTEST:
+        raise RuntimeError("streamlit.testing (AppTest) not available -> pip install 'streamlit>=1.28'")
+    store_path = isolate_store(store)
+
+    peak_live = {"figures": 0}
+    lock = threading.Lock()
+    def sample_figures():
+        n = figure_manager.live_figure_count()
+        with lock:
+            peak_live["figures"] = max(peak_live["figures"], n)
+
+    rss_start = _rss_mb()
+    fig_start = figure_manager.stats()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        futures = [pool.submit(run_session, i, steps, seed, timeout, sample_figures) for i in range(sessions)]
+        results = [f.result() for f in futures]
+    wall = time.perf_counter() - t0
+    fig_end = figure_manager.stats()
+
+    reruns = [dt for r in results for _, dt in r["reruns"]]
+    by_action = {}
+    for r in results:
+        for name, dt in r["reruns"]:
+            by_action.setdefault(name, []).append(dt)
+
+    return {
+        "config": {"sessions": sessions, "steps": steps, "seed": seed, "app": APP_PATH, "store": store_path},
+        "wall_seconds": wall,
+        "reruns": len(reruns),
+        "throughput_rps": len(reruns) / wall if wall > 0 else None,
+        "rerun_ms": _percentiles(reruns),
+        "first_load_ms": _percentiles([r["first_load"] for r in results]),
+        "by_action_ms": {k: _percentiles(v) for k, v in sorted(by_action.items())},
+        "rss_mb": {"start": rss_start, "end": _rss_mb(), "peak": _peak_rss_mb()},
+        "figures": {
+            "created": fig_end["created"] - fig_start["created"],
+            "reused": fig_end["reused"] - fig_start["reused"],
+            "peak_live": peak_live["figures"],
+            "live_after_gc": figure_manager.live_figure_count(collect=True),
+            "pooled_idle": fig_end["idle"],
+        },
+        "errors": [e for r in results for e in r["errors"]],
+        "skipped_actions": sum(r["skipped"] for r in results),
+    }
+
+
+def find_capacity(target_p95_ms, steps=20, seed=0, max_sessions=64, timeout=DEFAULT_TIMEOUT, progress=None,
+                  store="off"):
+    """Double the session count until rerun p95 exceeds the target -> largest passing count"""
+    best, reports = 0, []
+    n = 1
+    while n <= max_sessions:
+        rep = run_load(n, steps, seed, timeout, store)
+        reports.append(rep)
+        if progress: progress(rep)
+        if rep["errors"] or rep["rerun_ms"]["p95"] is None or rep["rerun_ms"]["p95"] > target_p95_ms:
+            break
+        best = n
+        n *= 2
+    return {"target_p95_ms": target_p95_ms, "capacity_sessions": best, "runs": reports}
+
+
+# ==========================================
+# 4. COMMAND LINE
+# ==========================================
+def _summary(rep):
+    r, rss, fig = rep["rerun_ms"], rep["rss_mb"], rep["figures"]
+    fmt = lambda v, unit="ms": "-" if v is None else f"{v:,.0f} {unit}"
+    return (f"{rep['config']['sessions']} sessions x {rep['config']['steps']} steps: "
+            f"{rep['reruns']} reruns in {rep['wall_seconds']:.1f} s ({rep['throughput_rps'] or 0:.1f}/s)\n"
+            f"  rerun p50 {fmt(r['p50'])} | p95 {fmt(r['p95'])} | p99 {fmt(r['p99'])} | max {fmt(r['max'])}\n"
+            f"  RSS peak {fmt(rss['peak'], 'MB')} | figures created {fig['created']}, reused {fig['reused']}, "
+            f"peak live {fig['peak_live']}, live after gc {fig['live_after_gc']}\n"
+            f"  errors {len(rep['errors'])}")
+
+
+def build_parser():
+    p = argparse.ArgumentParser(prog="python -m benchmarks.load_test",
+                                description="Concurrent Streamlit rerun latency (AppTest)")
+    p.add_argument("-n", "--sessions", type=int, default=4)
+    p.add_argument("--steps", type=int, default=20, help="scripted edits per session")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds per rerun")
+    p.add_argument("--capacity", type=float, metavar="P95_MS",
+                   help="find the most sessions (1, 2, 4, ...) whose rerun p95 stays under P95_MS")
+    p.add_argument("--max-sessions", type=int, default=64)
+    p.add_argument("--store", choices=STORE_MODES, default="off",
+                   help="disk result store: off, or a fresh temp file (never the user's cache)")
+    p.add_argument("-o", "--output", help="report JSON")
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not HAS_APPTEST:
+        print("streamlit.testing (AppTest) not available -> pip install 'streamlit>=1.28'", file=sys.stderr)
+        return 2
+
+    if args.capacity:
+        report = find_capacity(args.capacity, args.steps, args.seed, args.max_sessions, args.timeout,
+                               progress=lambda rep: print(_summary(rep), file=sys.stderr), store=args.store)
+        print(f"capacity: {report['capacity_sessions']} concurrent sessions at p95 <= {args.capacity:.0f} ms")
+    else:
+        report = run_load(args.sessions, args.steps, args.seed, args.timeout, args.store)
+        print(_summary(report))
+        for err in report["errors"][:5]:
+            print(f"  ! {err}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    errors = report["errors"] if not args.capacity else [e for r in report["runs"] for e in r["errors"]]
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
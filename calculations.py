@@ -1,6 +1,13 @@
 # calculations.py
 import numpy as np
 import math
+from collections.abc import Mapping
+from types import MappingProxyType
+
+import perf
+
+# Bump whenever a change alters analysis results (invalidates cached results)
+ENGINE_VERSION = "2.3.0"
 
 # ==========================================
 # PART 1: HELPER FUNCTIONS (CORE LOGIC)
@@ -73,6 +80,108 @@ def design_flexure_slab(Mu_kgm, b_cm, d_cm, h_cm, fc, fy, d_bar_mm, phi=0.90):
         "rho_percent": (As_design / (b_cm*d_cm)) * 100 if d_cm > 0 else 0
     }
 
+# Status codes returned by design_flexure_slab_batch
+FLEX_OK = 0
+FLEX_NO_MOMENT = 1
+FLEX_INVALID_DEPTH = 2
+FLEX_TOO_SMALL = 3
+
+def design_flexure_slab_batch(Mu_kgm, b_cm, d_cm, h_cm, fc, fy, d_bar_mm, phi=0.90, with_text=False):
+    """
+    Vectorized version of design_flexure_slab (array-in / array-out)
+    All inputs broadcast against each other. Results match the scalar function exactly.
+    Returns: Dictionary of arrays (As_req, rho, spacing, status, ...) + 'txt' if with_text
+    """
+    Mu_kgm, b_cm, d_cm, h_cm, fc, fy, d_bar_mm, phi = np.broadcast_arrays(
+        *(np.atleast_1d(v) for v in (Mu_kgm, b_cm, d_cm, h_cm, fc, fy, d_bar_mm, phi))
+    )
+    Mu_kgcm = np.abs(Mu_kgm) * 100.0
+
+    # --- Branch Masks (same order as scalar version) ---
+    no_moment = Mu_kgcm == 0
+    bad_depth = ~no_moment & (d_cm <= 0)
+    active = ~no_moment & ~bad_depth
+
+    # Dummy values on inactive rows keep numpy quiet (results are masked out later)
+    d_safe = np.where(active, d_cm, 1.0)
+    b_safe = np.where(active, b_cm, 1.0)
+
+    # np.float_power goes through libm pow() like Python's ** (x*x can differ by 1 ulp)
+    Rn = Mu_kgcm / (phi * b_safe * np.float_power(d_safe, 2))
+    term = 1 - (2 * Rn) / (0.85 * fc)
+    too_small = active & (term < 0)
+    active = active & ~too_small
+
+    rho_req = (0.85 * fc / fy) * (1 - np.sqrt(np.where(active, term, 0.0)))
+    As_req = rho_req * b_safe * d_safe
+
+    # --- Minimum Reinforcement (Temp & Shrinkage) ---
+    As_min = 0.0018 * b_cm * h_cm
+    As_design = np.maximum(As_req, As_min)
+
+    # --- Spacing (ACI max: 2h or 45cm) ---
+    A_bar = 3.1416 * np.float_power(d_bar_mm/10.0, 2) / 4.0
+    has_steel = As_design > 0
+    spacing_theoretical_cm = (A_bar / np.where(has_steel, As_design, 1.0)) * b_safe
+    s_max = np.minimum(2 * h_cm, 45.0)
+    s_final = np.where(has_steel, np.minimum(spacing_theoretical_cm, s_max), 45.0)
+
+    status = np.full(Mu_kgcm.shape, FLEX_OK, dtype=np.int8)
+    status[no_moment] = FLEX_NO_MOMENT
+    status[bad_depth] = FLEX_INVALID_DEPTH
+    status[too_small] = FLEX_TOO_SMALL
+    failed = bad_depth | too_small
+
+    out = {
+        "Mu": Mu_kgm,
+        "As_calc": np.where(active, As_req, 0.0),
+        "As_min": np.where(active, As_min, 0.0),
+        "As_req": np.where(active, As_design, np.where(failed, 999.0, 0.0)),
+        "rho": np.where(active, (As_design / (b_safe*d_safe)) * 100, np.where(failed, 999.0, 0.0)),
+        "spacing": np.where(active, s_final, 0.0),
+        "status": status,
+    }
+
+    if with_text:
+        # Round spacing down to nearest 0.5cm (Practical for construction)
+        s_final_rounded = np.floor(s_final * 2) / 2.0
+        s_show_m = s_final_rounded / 100.0
+        txt = np.empty(Mu_kgcm.shape, dtype=object)
+        txt[no_moment] = "-"
+        txt[bad_depth] = "Error (d<=0)"
+        txt[too_small] = "Section Too Small (Fail)"
+        for i in zip(*np.nonzero(active)):
+            db = d_bar_mm[i].item()
+            if not has_steel[i]:
+                txt[i] = "Min"
+            elif s_final_rounded[i] < 5.0: # < 5 cm is too tight
+                txt[i] = f"Too Tight! (DB{db}@{s_show_m[i]:.2f}m)"
+            else:
+                txt[i] = f"DB{db} @ {s_show_m[i]:.2f} m"
+        out["txt"] = txt
+
+    return out
+
+def flexure_batch_row(batch, i):
+    """
+    Rebuild the design_flexure_slab() dictionary for row i of a batch result
+    (requires with_text=True)
+    """
+    code = batch["status"][i]
+    if code == FLEX_NO_MOMENT:
+        return {"As_req": 0, "rho": 0, "spacing": 0, "txt": "-"}
+    if code in (FLEX_INVALID_DEPTH, FLEX_TOO_SMALL):
+        return {"As_req": 999, "rho": 999, "spacing": 0, "txt": batch["txt"][i], "status": "FAIL"}
+    return {
+        "Mu": batch["Mu"][i].item(),
+        "As_calc": batch["As_calc"][i].item(),
+        "As_min": batch["As_min"][i].item(),
+        "As_design": batch["As_req"][i].item(),
+        "spacing_cm": batch["spacing"][i].item(),
+        "txt": batch["txt"][i],
+        "rho_percent": batch["rho"][i].item()
+    }
+
 def calculate_section_properties(c1, c2, d, col_type, open_w=0, open_dist=0):
     """
     Helper to calculate Ac, Jc, and gamma_v for Punching Shear
@@ -220,6 +329,125 @@ def check_punching_shear(Vu, fc, c1, c2, d, col_type="interior", Munbal=0.0, ope
         "note": note_txt
     }
 
+# Column type codes for the batch punching engine (-1 = unknown -> same fallback as scalar)
+COL_TYPE_CODES = {"interior": 0, "edge": 1, "corner": 2}
+
+PUNCHING_BATCH_DTYPE = np.dtype([
+    ("col_code", "i1"), ("Vu", "f8"), ("Munbal", "f8"), ("d", "f8"),
+    ("bo", "f8"), ("Ac", "f8"), ("deduction", "f8"),
+    ("gamma_v", "f8"), ("Jc", "f8"), ("c_AB", "f8"),
+    ("vc_nominal", "f8"), ("vc_beta", "f8"), ("vc_size", "f8"),
+    ("stress_actual", "f8"), ("stress_allow", "f8"),
+    ("phi_Vc", "f8"), ("Vc_nominal", "f8"),
+    ("ratio", "f8"), ("status", "U4")
+])
+
+def col_type_to_code(col_type):
+    """Convert 'interior'/'edge'/'corner' (scalar or array) to int8 codes"""
+    arr = np.atleast_1d(col_type)
+    if arr.dtype.kind in "iu":
+        return arr.astype(np.int8)
+    codes = np.full(arr.shape, -1, dtype=np.int8)
+    for name, code in COL_TYPE_CODES.items():
+        codes[arr == name] = code
+    return codes
+
+def calculate_section_properties_batch(c1, c2, d, col_code, open_w=0, open_dist=0):
+    """
+    Vectorized calculate_section_properties (all column types at once via masks)
+    col_code: array of COL_TYPE_CODES values
+    Returns: Ac, Jc, gamma_v, c_AB, bo_eff, deduction (arrays)
+    """
+    c1, c2, d, col_code, open_w, open_dist = np.broadcast_arrays(
+        *(np.atleast_1d(v) for v in (c1, c2, d, col_code, open_w, open_dist))
+    )
+    c1 = c1.astype(float); c2 = c2.astype(float); d = d.astype(float)
+    pw = np.float_power # Same rounding as Python's ** in the scalar version
+
+    is_edge = col_code == COL_TYPE_CODES["edge"]
+    is_corner = col_code == COL_TYPE_CODES["corner"]
+    is_box = ~is_edge & ~is_corner # Interior + fallback
+
+    # --- 1. Geometry Based on Column Type ---
+    b1 = np.where(is_box, c1 + d, c1 + d/2.0)
+    b2 = np.where(is_corner, c2 + d/2.0, c2 + d)
+    bo = np.where(is_box, 2 * (b1 + b2), np.where(is_edge, 2*b1 + b2, b1 + b2))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Edge (U-Shape) / Corner (L-Shape): centroid from inner face
+        x_cc = np.where(is_edge, (2 * b1 * (b1/2.0)) / bo, (b1 * (b1/2.0)) / bo)
+        I_face = (b2 * pw(d, 3))/12.0 + (b2 * d) * pw(x_cc, 2)
+        I_side = (b1 * pw(d, 3))/12.0 + (d * pw(b1, 3))/12.0 + (b1 * d) * pw(b1/2.0 - x_cc, 2)
+        Jc_box = (d * pw(b1, 3))/6.0 + (pw(d, 3) * b1)/6.0 + (d * b2 * pw(b1, 2))/2.0
+
+        c_AB = np.where(is_box, b1 / 2.0, x_cc)
+        Jc = np.where(is_box, Jc_box, np.where(is_edge, I_face + 2.0 * I_side, I_face + I_side))
+
+        # --- 2. Handle Opening Deduction ---
+        near = (open_w > 0) & (open_dist < 4 * d)
+        deduction = np.where(near, np.minimum(open_w, bo * 0.30), 0.0)
+        bo_eff = bo - deduction
+        Ac = bo_eff * d
+
+        # Gamma factors
+        gamma_f = 1 / (1 + (2/3) * np.sqrt(b1/b2))
+    gamma_v = 1 - gamma_f
+
+    return Ac, Jc, gamma_v, c_AB, bo_eff, deduction
+
+def check_punching_shear_batch(Vu, fc, c1, c2, d, col_type="interior", Munbal=0.0, open_w=0, open_dist=0, phi=0.85):
+    """
+    Batched check_punching_shear for many columns (interior/edge/corner mixed)
+    col_type: names or COL_TYPE_CODES, scalar or array
+    Returns: numpy structured array (PUNCHING_BATCH_DTYPE), one row per column
+    """
+    col_code = col_type_to_code(col_type)
+    Vu, fc, c1, c2, d, col_code, Munbal, open_w, open_dist, phi = np.broadcast_arrays(
+        *(np.atleast_1d(v) for v in (Vu, fc, c1, c2, d, col_code, Munbal, open_w, open_dist, phi))
+    )
+    Vu = Vu.astype(float); fc = fc.astype(float); c1 = c1.astype(float)
+    c2 = c2.astype(float); d = d.astype(float); Munbal = Munbal.astype(float)
+
+    Ac, Jc, gamma_v, c_AB, bo, deduc_len = calculate_section_properties_batch(c1, c2, d, col_code, open_w, open_dist)
+    ac_ok = Ac > 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Stress Calculation (Direct + Moment Transfer)
+        stress_direct = Vu / Ac
+        stress_moment = np.where(Jc > 0, (gamma_v * np.abs(Munbal * 100.0) * c_AB) / Jc, 0.0)
+        vu_max = stress_direct + stress_moment
+
+        # Capacity: three ACI limits
+        sqrt_fc = np.sqrt(fc)
+        c_min = np.minimum(c1, c2)
+        beta = np.where(c_min > 0, np.maximum(c1, c2) / c_min, 1.0)
+        vc_nominal = 1.06 * sqrt_fc
+        vc_beta = 0.27 * (2 + 4/beta) * sqrt_fc
+
+        alpha_s = np.select([col_code == COL_TYPE_CODES["interior"], col_code == COL_TYPE_CODES["edge"]], [40, 30], 20)
+        vc_size = np.where(bo > 0, 0.27 * ((alpha_s * d / bo) + 2) * sqrt_fc, vc_nominal)
+
+        vc_final = np.minimum(np.minimum(vc_nominal, vc_beta), vc_size)
+        phi_vc = phi * vc_final
+        ratio = np.where(phi_vc > 0, vu_max / phi_vc, 999.0)
+
+    # Ac <= 0 (Opening too big?) -> FAIL
+    ratio = np.where(ac_ok, ratio, 999.0)
+
+    out = np.zeros(Vu.shape, dtype=PUNCHING_BATCH_DTYPE)
+    out["col_code"] = col_code
+    out["Vu"] = Vu; out["Munbal"] = Munbal; out["d"] = d
+    out["bo"] = bo; out["Ac"] = Ac; out["deduction"] = deduc_len
+    out["gamma_v"] = gamma_v; out["Jc"] = Jc; out["c_AB"] = c_AB
+    out["vc_nominal"] = vc_nominal; out["vc_beta"] = vc_beta; out["vc_size"] = vc_size
+    out["stress_actual"] = np.where(ac_ok, vu_max, 0.0)
+    out["stress_allow"] = phi_vc
+    out["phi_Vc"] = phi_vc * Ac
+    out["Vc_nominal"] = vc_final * Ac
+    out["ratio"] = ratio
+    out["status"] = np.where(ratio <= 1.0, "OK", "FAIL")
+    return out
+
 def check_punching_dual_case(w_u, Lx, Ly, fc, c1, c2, d_drop, d_slab, drop_w, drop_l, col_type, Munbal=0.0, phi=0.85):
     """
     Handle Drop Panel (Check 2 perimeters: Inside Drop & Outside Drop)
@@ -295,10 +523,54 @@ def check_long_term_deflection(w_service, L, h, fc, As_provided, b=100.0):
         "Delta_Immediate": Delta_immediate,
         "Delta_LongTerm": Delta_LT,
         "Delta_Total": Delta_Total, 
-        "Limit_240": Limit_240, 
+        "Limit_240": Limit_240,
         "status": status
     }
 
+def check_min_thickness(h_slab, Lx, Ly, cx, cy, fy, is_structural_drop=False, panel="interior"):
+    """
+    ACI 318 Minimum Slab Thickness (same rule as tab_calc.render_thickness_check)
+    panel: 'interior', 'exterior' (no edge beam) or 'exterior_beam'
+    """
+    fy_mpa = fy * 0.0980665 # ksc -> MPa
+    Ln = max(Lx - cx/100.0, Ly - cy/100.0) # Longest clear span (m)
+
+    if panel == "exterior":
+        denom = 33 if is_structural_drop else 30
+    else: # Interior / Exterior with edge beam
+        denom = 36 if is_structural_drop else 33
+
+    steel_term = 0.8 + (fy_mpa / 1400.0)
+    h_min_calc = (Ln * steel_term / denom) * 100 # cm
+    abs_min = 10.0 if is_structural_drop else 12.5
+    h_req = max(h_min_calc, abs_min)
+
+    return {
+        "Ln": Ln, "denom": denom, "h_min_calc": h_min_calc, "h_req": h_req,
+        "ratio": h_req / h_slab if h_slab > 0 else 999.0,
+        "status": "PASS" if h_slab >= h_req else "FAIL"
+    }
+
+def check_min_thickness_batch(h_slab, Lx, Ly, cx, cy, fy, is_structural_drop=False, exterior=False):
+    """
+    Column-wise check_min_thickness (every argument scalar or array)
+    exterior: True = 'exterior' panel without edge beam, False = 'interior' / 'exterior_beam'
+    Returns: dict of arrays h_min_calc, h_req, ratio
+    """
+    h_slab, Lx, Ly, cx, cy, fy = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (h_slab, Lx, Ly, cx, cy, fy)))
+    drop = np.broadcast_to(np.asarray(is_structural_drop, dtype=bool), h_slab.shape)
+    ext = np.broadcast_to(np.asarray(exterior, dtype=bool), h_slab.shape)
+
+    Ln = np.maximum(Lx - cx/100.0, Ly - cy/100.0)
+    denom = np.where(ext, np.where(drop, 33.0, 30.0), np.where(drop, 36.0, 33.0))
+    steel_term = 0.8 + (fy * 0.0980665 / 1400.0)
+    h_min_calc = (Ln * steel_term / denom) * 100
+    h_req = np.maximum(h_min_calc, np.where(drop, 10.0, 12.5))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(h_slab > 0, h_req / h_slab, 999.0)
+    return {"h_min_calc": h_min_calc, "h_req": h_req, "ratio": ratio}
+
 def check_ddm_limitations(L1, L2, num_spans=3, L_adjacent=None):
     """
     ตรวจสอบเงื่อนไขบังคับของ DDM ตามมาตรฐาน ACI 318
@@ -445,17 +717,293 @@ def solve_efm_distribution(Kec, Ks, w_u, L_span, L_width, is_edge_span=False):
         "M_simple": M_simple
     }
 
+def calculate_stiffness_batch(c1, c2, L1, L2, lc, h_slab, fc, h_drop=None, drop_w=0):
+    """
+    Vectorized calculate_stiffness. h_drop is the TOTAL thickness (NaN/None = no drop)
+    Returns: Ks, Sum_Kc, Kt, Kec (arrays)
+    """
+    if h_drop is None: h_drop = np.nan
+    c1, c2, L1, L2, lc, h_slab, fc, h_drop, drop_w = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (c1, c2, L1, L2, lc, h_slab, fc, h_drop, drop_w))
+    )
+    pw = np.float_power
+    has_drop = ~np.isnan(h_drop) & (h_drop > h_slab) & (drop_w > 0)
+    h_drop = np.where(has_drop, h_drop, h_slab)
+
+    E_c = 15100 * np.sqrt(fc)
+
+    # 1. Column Stiffness (Kc)
+    Ic = c2 * pw(c1, 3) / 12.0
+    Kc = 4 * E_c * Ic / (lc * 100.0)
+    Sum_Kc = 2 * Kc
+
+    # 2. Slab Stiffness (Ks)
+    Is = (L2*100.0) * pw(h_slab, 3) / 12.0
+    Ks = 4 * E_c * Is / (L1 * 100.0)
+
+    # 3. Torsional Stiffness (Kt)
+    def get_C(x, y): return (1 - 0.63 * x / y) * (pw(x, 3) * y) / 3.0
+    C_slab = get_C(h_slab, c1)
+    C_drop = get_C(h_drop, c1)
+    len_total = L2 * 100.0
+    len_drop = np.minimum(drop_w * 100.0, len_total)
+    len_slab = np.maximum(0, len_total - len_drop)
+    use_drop = has_drop & (C_drop > 0) & (C_slab > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        C_eff = np.where(use_drop, len_total / (len_drop / C_drop + len_slab / C_slab), C_slab)
+
+        term_geom = (1 - c2/(L2*100.0))
+        term_geom = np.where(term_geom <= 0, 0.01, term_geom)
+        denom = (L2*100.0 * pw(term_geom, 3))
+        Kt = np.where(denom > 0, 2 * 9 * E_c * C_eff / denom, 0.0)
+
+        # 4. Equivalent Stiffness (Kec)
+        Kec = np.where((Kt > 0) & (Sum_Kc > 0), 1 / (1/Sum_Kc + 1/Kt), 0.0)
+
+    return Ks, Sum_Kc, Kt, Kec
+
+def solve_efm_distribution_batch(Kec, Ks, w_u, L_span, L_width, is_edge_span=False):
+    """
+    Vectorized solve_efm_distribution (same 3-cycle distribution, arrays in/out)
+    Returns: Dictionary of arrays
+    """
+    Kec, Ks, w_u, L_span, L_width, is_edge_span = np.broadcast_arrays(
+        *(np.atleast_1d(v) for v in (Kec, Ks, w_u, L_span, L_width, is_edge_span))
+    )
+    W_total = w_u * L_width # kg/m
+    FEM = (W_total * np.float_power(L_span, 2)) / 12.0 # kg-m
+
+    # Edge Span: Exterior node = Col (Kec) + Slab (Ks) | Interior node = Col + 2 Slabs
+    sum_K1 = np.where(is_edge_span, Kec + Ks, Kec + 2*Ks)
+    sum_K2 = Kec + 2*Ks
+    with np.errstate(divide="ignore", invalid="ignore"):
+        DF1_slab = np.where(sum_K1 > 0, Ks / sum_K1, 0.0)
+        DF2_slab = np.where(sum_K2 > 0, Ks / sum_K2, 0.0)
+
+    # Moment Distribution (3 Cycles)
+    M12 = -FEM
+    M21 = +FEM
+    for i in range(3):
+        Bal1 = -1 * (M12) * DF1_slab
+        Bal2 = -1 * (M21) * DF2_slab
+        M12 = M12 + Bal1 + Bal2 * 0.5
+        M21 = M21 + Bal2 + Bal1 * 0.5
+
+    M_neg_left = np.abs(M12)
+    M_neg_right = np.abs(M21)
+    M_simple = (W_total * np.float_power(L_span, 2)) / 8.0
+
+    return {
+        "FEM": FEM,
+        "DF_left": DF1_slab,
+        "DF_right": DF2_slab,
+        "M_neg_left": M_neg_left,
+        "M_neg_right": M_neg_right,
+        "M_pos": M_simple - (M_neg_left + M_neg_right)/2.0,
+        "M_simple": M_simple
+    }
+
+# ------------------------------------------
+# Multi-span Equivalent Frame (Direct Stiffness)
+# ------------------------------------------
+# Unknowns = joint rotations of an N-span frame (N+1 joints).
+# Slab-beam i (joints i, i+1): stiffness Ks_i, carry-over 0.5 (same as Hardy Cross above)
+# Joint j: equivalent column Kec_j to ground.
+# Sign: member end moments clockwise (+) -> left support hogging = negative (M12 = -FEM)
+# Leading "..." axes = independent frames (e.g. many design cases) solved in one call.
+
+def build_efm_frame_stiffness(Ks, Kec):
+    """
+    Global rotational stiffness matrix of an N-span equivalent frame
+    Ks: (..., N) slab-beam stiffness per span | Kec: (..., N+1) per joint
+    Returns: K (..., N+1, N+1)
+    """
+    Ks = np.asarray(Ks, dtype=float)
+    Kec = np.asarray(Kec, dtype=float)
+    n = Ks.shape[-1]
+    Kec = np.broadcast_to(Kec, Ks.shape[:-1] + (n + 1,))
+
+    K = np.zeros(Ks.shape[:-1] + (n + 1, n + 1))
+    i = np.arange(n)
+    j = np.arange(n + 1)
+    K[..., i, i] += Ks
+    K[..., i + 1, i + 1] += Ks
+    K[..., i, i + 1] = 0.5 * Ks
+    K[..., i + 1, i] = 0.5 * Ks
+    K[..., j, j] += Kec
+    return K
+
+def solve_efm_frame(Ks, Kec, w_line, L_spans):
+    """
+    Exact joint moments of an N-span equivalent frame (one linear solve)
+    Ks: (..., N) | Kec: (..., N+1) | L_spans: (..., N) in m
+    w_line: (..., N) factored line load per span (kg/m)
+            or (..., N, m) -> m load cases solved against ONE factorization
+    Returns: Dictionary of per-span arrays (..., N[, m]) + joint arrays (..., N+1[, m])
+    """
+    Ks = np.asarray(Ks, dtype=float)
+    L = np.asarray(L_spans, dtype=float)
+    w = np.asarray(w_line, dtype=float)
+    single = w.ndim == Ks.ndim
+    if single:
+        w = w[..., None]
+    Ks_c = Ks[..., None]
+    L2 = np.float_power(L, 2)[..., None]
+
+    # Fixed-end moments (uniform load)
+    FEM = w * L2 / 12.0
+    FEM_l = -FEM
+    FEM_r = +FEM
+
+    # Joint load vector = -(sum of FEMs meeting at the joint)
+    shape = w.shape[:-2] + (w.shape[-2] + 1, w.shape[-1])
+    P = np.zeros(np.broadcast_shapes(shape, Ks.shape[:-1] + shape[-2:]))
+    P[..., :-1, :] -= FEM_l
+    P[..., 1:, :] -= FEM_r
+
+    K = build_efm_frame_stiffness(Ks, Kec)
+    theta = np.linalg.solve(K, P) # all load cases share one LU factorization
+
+    # Slope-deflection: M = FEM + Ks*(theta_near + 0.5*theta_far)
+    th_l = theta[..., :-1, :]
+    th_r = theta[..., 1:, :]
+    M_left = FEM_l + Ks_c * (th_l + 0.5 * th_r)
+    M_right = FEM_r + Ks_c * (th_r + 0.5 * th_l)
+
+    M_simple = w * L2 / 8.0
+    M_mid = M_simple + (M_left - M_right) / 2.0 # sagging (+) at midspan
+
+    # Unbalanced slab moment at each joint = moment delivered to the columns
+    Kec_c = np.broadcast_to(np.asarray(Kec, dtype=float), Ks.shape[:-1] + (Ks.shape[-1] + 1,))[..., None]
+    M_col = Kec_c * theta
+
+    out = {
+        "theta": theta,
+        "M_left": M_left, "M_right": M_right,
+        "M_neg_left": np.abs(M_left), "M_neg_right": np.abs(M_right),
+        "M_pos": M_mid, "M_simple": M_simple,
+        "M_unbal": np.abs(M_col)
+    }
+    if single:
+        out = {k: v[..., 0] for k, v in out.items()}
+    return out
+
+def efm_frame_from_geometry(L_spans, L_width, c1, c2, lc, h_slab, fc, h_drop=None, drop_w=0):
+    """
+    Ks per span and Kec per joint for a frame of identical columns (via calculate_stiffness_batch)
+    L_spans: (..., N) span lengths (m) | other inputs scalar or broadcastable to (..., 1)
+    Returns: Ks (..., N), Kec (..., N+1)
+    """
+    L_spans = np.asarray(L_spans, dtype=float)
+    col = lambda v: v if v is None else np.asarray(v, dtype=float)[..., None]
+    Ks, _, _, Kec = calculate_stiffness_batch(
+        col(c1), col(c2), L_spans, col(L_width), col(lc), col(h_slab), col(fc), col(h_drop), col(drop_w)
+    )
+    Ks = np.broadcast_to(Ks, np.broadcast_shapes(Ks.shape, L_spans.shape))
+    Kec_joint = Kec[..., :1] # column stiffness does not depend on the span length
+    Kec_joint = np.broadcast_to(Kec_joint, Ks.shape[:-1] + (Ks.shape[-1] + 1,))
+    return Ks, Kec_joint
+
+def needs_pattern_loading(w_dead, w_live):
+    """ACI 318 6.4.3.2: pattern live load required only if L > 0.75 D (unfactored)"""
+    return w_live > 0.75 * w_dead
+
+def efm_live_load_patterns(n_spans, full_only=False):
+    """
+    Live-load arrangements (ACI 318 6.4.3) as a (N, m) matrix of LL multipliers
+    Col 0: full factored LL on all spans
+    Alternate spans (odd / even) at 3/4 LL -> max positive at midspan
+    Adjacent span pairs at 3/4 LL          -> max negative at each interior support
+    """
+    cases = [np.ones(n_spans)]
+    if not full_only and n_spans > 1:
+        spans = np.arange(n_spans)
+        cases += [0.75 * (spans % 2 == k) for k in (0, 1)]
+        for j in range(1, n_spans):
+            cases.append(0.75 * ((spans == j - 1) | (spans == j)))
+    return np.stack(cases, axis=-1).astype(float)
+
+def solve_efm_pattern_envelope(Ks, Kec, w_dead, w_live, L_spans, full_only=False):
+    """
+    Solve every live-load pattern against ONE factorized frame (multi-column RHS)
+    w_dead, w_live: factored line loads (kg/m), broadcastable to Ks (..., N)
+    Returns: max/min envelopes per span (..., N) and per joint (..., N+1)
+    """
+    Ks = np.asarray(Ks, dtype=float)
+    patterns = efm_live_load_patterns(Ks.shape[-1], full_only) # (N, m)
+
+    w_dead = np.asarray(w_dead, dtype=float)[..., None]
+    w_live = np.asarray(w_live, dtype=float)[..., None]
+    w_cases = w_dead + w_live * patterns # (..., N, m)
+
+    res = solve_efm_frame(Ks, Kec, w_cases, L_spans)
+
+    return {
+        "M_neg_left": res["M_neg_left"].max(axis=-1),
+        "M_neg_right": res["M_neg_right"].max(axis=-1),
+        "M_pos_max": res["M_pos"].max(axis=-1),
+        "M_pos_min": res["M_pos"].min(axis=-1),
+        "M_unbal": res["M_unbal"].max(axis=-1),
+        "n_cases": patterns.shape[-1]
+    }
+
 # ==========================================
 # PART 3: MAIN CONTROLLER CLASS (UPDATED)
 # ==========================================
+def _same_fingerprint(a, b):
+    """Stage fingerprints equal? (array-valued inputs that cannot be compared -> changed)"""
+    try:
+        return bool(a == b)
+    except ValueError:
+        return False
+
+def _copy_containers(obj):
+    """New dict/list/tuple containers, shared leaves (callers may edit their copy)"""
+    if isinstance(obj, dict):
+        return {k: _copy_containers(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_copy_containers(v) for v in obj]
+    if isinstance(obj, tuple):
+        return tuple(_copy_containers(v) for v in obj)
+    return obj
+
 class FlatSlabDesign:
     """
     Class นี้ทำหน้าที่เป็น 'Engineering Logic Controller'
     รวบรวม Logic การคำนวณทั้งหมด
     """
+    # ---------------------------------------------------------------
+    # STAGE DEPENDENCY GRAPH
+    # stage -> (input keys it reads, factor keys it reads, upstream stages)
+    # A stage recomputes only when one of these changed since its last run,
+    # e.g. LL -> loads, efm, shear_oneway, shear_punching, ddm, deflection but NOT efm_stiffness
+    # ---------------------------------------------------------------
+    _DROP_KEYS = ("has_drop", "h_drop", "drop_w", "drop_l", "h_slab", "Lx", "Ly") # structural drop check
+    STAGES = {
+        "loads":          (("h_slab", "SDL", "LL"), ("DL", "LL"), ()),
+        "geometry":       (("h_slab", "h_drop", "cover", "d_bar"), (), ()),
+        "shear_oneway":   (("Lx", "Ly", "cx", "cy", "fc", "h_slab", "cover", "d_bar"), ("phi_shear",), ("loads",)),
+        "efm_stiffness":  (("Lx", "Ly", "cx", "cy", "lc", "fc", "num_spans") + _DROP_KEYS, (), ()),
+        "efm":            (("Lx", "Ly", "h_slab", "SDL", "LL", "col_type", "num_spans"), ("DL", "LL"),
+                           ("loads", "efm_stiffness")),
+        "shear_punching": (("Lx", "Ly", "cx", "cy", "fc", "col_type", "open_w", "open_dist") + _DROP_KEYS,
+                           ("phi_shear",), ("loads", "geometry", "efm")),
+        "ddm":            (("Lx", "Ly", "cx", "cy", "fc", "fy", "cover", "d_bar", "col_type") + _DROP_KEYS,
+                           ("phi_flexure",), ("loads",)),
+        "deflection":     (("Lx", "Ly", "h_slab", "fc"), (), ("loads",)),
+    }
+    # Stages returned by run_full_analysis (in result order)
+    RESULT_STAGES = ("loads", "geometry", "shear_oneway", "shear_punching", "ddm", "efm", "deflection")
+
     def __init__(self, inputs, factors=None):
         self.inputs = inputs
-        
+        self._stage_memo = {} # stage -> (fingerprint, version, output)
+        self._stage_version = 0
+        self.stage_stats = {"computed": 0, "reused": 0}
+        self._set_factors(factors)
+        self._bind_inputs()
+
+    def _set_factors(self, factors):
         # --- [SAFETY CRITICAL] Load Factors & Phi Configuration ---
         if factors:
             self.factors = factors
@@ -478,6 +1026,8 @@ class FlatSlabDesign:
                 'code_ref': "Default"
             }
 
+    def _bind_inputs(self):
+        inputs = self.inputs
         self.Lx = inputs.get('Lx', 8.0)
         self.Ly = inputs.get('Ly', 6.0)
         self.cx = inputs.get('cx', 40.0)
@@ -502,6 +1052,49 @@ class FlatSlabDesign:
         if self.has_drop:
             self._check_aci_drop_compliance()
 
+    def update(self, changes=None, factors=None, replace=False, **kw):
+        """
+        Change some inputs (and/or factors) of this model, e.g. model.update(LL=400)
+        replace=True: changes is the complete new inputs dict (keys not in it are dropped)
+        The next run recomputes only the stages that read a changed field (see STAGES).
+        """
+        base = {} if replace else self.inputs
+        self.inputs = {**base, **(changes or {}), **kw} # never edits the caller's dict
+        if factors is not None:
+            self._set_factors(dict(factors))
+        self._bind_inputs()
+        return self
+
+    def _stage(self, name):
+        """(version, output) of one stage; reuses the memo when nothing it reads has changed"""
+        keys, factor_keys, upstream = self.STAGES[name]
+        up = [self._stage(u) for u in upstream]
+        fingerprint = (
+            tuple(self.inputs.get(k) for k in keys),
+            tuple(self.factors.get(k) for k in factor_keys),
+            tuple(v for v, _ in up),
+        )
+        memo = self._stage_memo.get(name)
+        if memo is not None and _same_fingerprint(memo[0], fingerprint):
+            self.stage_stats["reused"] += 1
+            perf.count("engine." + name + " (memo)")
+            return memo[1], memo[2]
+
+        with perf.timer("engine." + name):
+            out = getattr(self, "_stage_" + name)(*[o for _, o in up])
+        self._stage_version += 1
+        self._stage_memo[name] = (fingerprint, self._stage_version, out)
+        self.stage_stats["computed"] += 1
+        return self._stage_version, out
+
+    def evaluate(self, *stages):
+        """
+        Only the requested stages (+ what they depend on), e.g. evaluate("shear_punching")
+        Returns: {stage: output}; every call gets its own dict tree (memo stays untouched)
+        """
+        self._bind_inputs() # pick up in-place edits of self.inputs
+        return {name: _copy_containers(self._stage(name)[1]) for name in stages}
+
     def _check_aci_drop_compliance(self):
         """
         [NEW] ตรวจสอบขนาด Drop Panel ตาม ACI 318
@@ -661,32 +1254,47 @@ class FlatSlabDesign:
             h_neg = self.h_slab + self.h_drop if use_drop_for_flexure else self.h_slab
             b_strip = (L_width_m * 100.0) / 2.0 # Half strip width for CS/MS usually
             
-            # Design Reinforcement
+            # Design Zones: (key, Mu, d, h)
             # Note: For Exterior Edge, check if b_cs fits within slab? 
             # (Simplified here: assume standard widths)
-            
-            # 1. Exterior Support (Top)
-            des_cs_neg_ext = design_flexure_slab(M_cs_neg_ext, b_strip, d_neg, h_neg, self.fc, self.fy, self.d_bar, phi=phi_f)
-            des_ms_neg_ext = design_flexure_slab(M_ms_neg_ext, b_strip, d_neg, self.h_slab, self.fc, self.fy, self.d_bar, phi=phi_f)
-            
-            # 2. Mid Span (Bottom)
-            des_cs_pos = design_flexure_slab(M_cs_pos, b_strip, d_pos, self.h_slab, self.fc, self.fy, self.d_bar, phi=phi_f)
-            des_ms_pos = design_flexure_slab(M_ms_pos, b_strip, d_pos, self.h_slab, self.fc, self.fy, self.d_bar, phi=phi_f)
-            
-            # 3. Interior Support (Top)
-            des_cs_neg_int = design_flexure_slab(M_cs_neg_int, b_strip, d_neg, h_neg, self.fc, self.fy, self.d_bar, phi=phi_f)
-            des_ms_neg_int = design_flexure_slab(M_ms_neg_int, b_strip, d_neg, self.h_slab, self.fc, self.fy, self.d_bar, phi=phi_f)
+            zones = [
+                # 1. Exterior Support (Top)
+                ("cs_neg_ext", M_cs_neg_ext, d_neg, h_neg),
+                ("ms_neg_ext", M_ms_neg_ext, d_neg, self.h_slab),
+                # 2. Mid Span (Bottom)
+                ("cs_pos", M_cs_pos, d_pos, self.h_slab),
+                ("ms_pos", M_ms_pos, d_pos, self.h_slab),
+                # 3. Interior Support (Top)
+                ("cs_neg_int", M_cs_neg_int, d_neg, h_neg),
+                ("ms_neg_int", M_ms_neg_int, d_neg, self.h_slab),
+            ]
 
             return {
                 "coeffs": (f_neg_ext, f_pos, f_neg_int),
                 "M_total": (M_total_neg_ext, M_total_pos, M_total_neg_int),
-                "design": {
-                    "cs_neg_ext": des_cs_neg_ext, "ms_neg_ext": des_ms_neg_ext,
-                    "cs_pos": des_cs_pos,         "ms_pos": des_ms_pos,
-                    "cs_neg_int": des_cs_neg_int, "ms_neg_int": des_ms_neg_int
-                }
+                "zones": zones, "b_strip": b_strip
             }
 
+        def design_strips(*strips):
+            """Design every zone of every strip in ONE vectorized call"""
+            Mu, b, d, h = [], [], [], []
+            for strip in strips:
+                for _, Mu_z, d_z, h_z in strip["zones"]:
+                    Mu.append(Mu_z); b.append(strip["b_strip"]); d.append(d_z); h.append(h_z)
+
+            batch = design_flexure_slab_batch(
+                np.array(Mu), np.array(b), np.array(d), np.array(h),
+                self.fc, self.fy, self.d_bar, phi=phi_f, with_text=True
+            )
+
+            i = 0
+            for strip in strips:
+                strip["design"] = {}
+                for key, *_ in strip.pop("zones"):
+                    strip["design"][key] = flexure_batch_row(batch, i)
+                    i += 1
+                del strip["b_strip"]
+
         # --- Main Execution ---
         col_type = self.inputs['col_type']
 
@@ -720,6 +1328,9 @@ class FlatSlabDesign:
             
         res_y = process_strip_smart(Mo_y, self.Lx, span_type_y)
 
+        # 4. Design All Zones (Both Directions)
+        design_strips(res_x, res_y)
+
         return {
             "x": {
                 "L_span": self.Lx, "L_width": self.Ly, "ln": ln_x, "Mo": Mo_x, 
@@ -735,11 +1346,8 @@ class FlatSlabDesign:
 
 
     
-    def _analyze_efm(self, w_u):
-        """Perform Equivalent Frame Method Analysis."""
-        results = {}
-        col_type = self.inputs['col_type'] 
-
+    def _efm_stiffness(self):
+        """EFM stiffness of both directions + the continuous frame (geometry only, no loads)"""
         # [UPDATED] Determine dimensions to pass for Stiffness
         # If it's a Shear Cap (not structural drop), pass None/0 to ignore stiffness contribution
         if self.has_drop and self.is_structural_drop:
@@ -752,76 +1360,106 @@ class FlatSlabDesign:
             calc_drop_w = 0
             calc_drop_l = 0
 
-        # --- X-Direction EFM ---
-        Ks_x, Sum_Kc_x, Kt_x, Kec_x = calculate_stiffness(
-            c1=self.cx, c2=self.cy, L1=self.Lx, L2=self.Ly, 
-            lc=self.lc, h_slab=self.h_slab, fc=self.fc,
-            h_drop=calc_h_drop,
-            drop_w=calc_drop_w
-        )
+        # Equal spans each side of the column (continuous frame)
+        n_spans = max(int(self.inputs.get('num_spans', 3)), 1)
+
+        stiffness = {}
+        for axis, L_span, L_width, c1, c2, d_w in (
+            ('x', self.Lx, self.Ly, self.cx, self.cy, calc_drop_w),
+            ('y', self.Ly, self.Lx, self.cy, self.cx, calc_drop_l),
+        ):
+            Ks, Sum_Kc, Kt, Kec = calculate_stiffness(
+                c1=c1, c2=c2, L1=L_span, L2=L_width, 
+                lc=self.lc, h_slab=self.h_slab, fc=self.fc,
+                h_drop=calc_h_drop,
+                drop_w=d_w
+            )
+            L_spans = np.full(n_spans, float(L_span))
+            Ks_f, Kec_f = efm_frame_from_geometry(
+                L_spans, L_width, c1, c2, self.lc, self.h_slab, self.fc, calc_h_drop, d_w
+            )
+            stiffness[axis] = {'Ks': Ks, 'Sum_Kc': Sum_Kc, 'Kt': Kt, 'Kec': Kec,
+                               'L_spans': L_spans, 'Ks_frame': Ks_f, 'Kec_frame': Kec_f}
+        return stiffness
+
+    def _analyze_efm(self, w_u, stiffness=None):
+        """Perform Equivalent Frame Method Analysis."""
+        if stiffness is None:
+            stiffness = self._efm_stiffness()
+        results = {}
+        col_type = self.inputs['col_type'] 
         is_edge_x = True if col_type in ['edge', 'corner'] else False
-        moments_x = solve_efm_distribution(Kec_x, Ks_x, w_u, self.Lx, self.Ly, is_edge_span=is_edge_x)
-        results['x'] = {'stiffness': {'Kec': Kec_x}, 'moments': moments_x}
-
-        # --- Y-Direction EFM ---
-        Ks_y, Sum_Kc_y, Kt_y, Kec_y = calculate_stiffness(
-            c1=self.cy, c2=self.cx, L1=self.Ly, L2=self.Lx, 
-            lc=self.lc, h_slab=self.h_slab, fc=self.fc,
-            h_drop=calc_h_drop,
-            drop_w=calc_drop_l
-        )
         is_edge_y = True if col_type == 'corner' else False
-        moments_y = solve_efm_distribution(Kec_y, Ks_y, w_u, self.Ly, self.Lx, is_edge_span=is_edge_y)
-        results['y'] = {'stiffness': {'Kec': Kec_y}, 'moments': moments_y}
-        
+
+        # --- X / Y-Direction EFM ---
+        for axis, L_span, L_width, is_ext in (('x', self.Lx, self.Ly, is_edge_x), ('y', self.Ly, self.Lx, is_edge_y)):
+            k = stiffness[axis]
+            moments = solve_efm_distribution(k['Kec'], k['Ks'], w_u, L_span, L_width, is_edge_span=is_ext)
+            results[axis] = {'stiffness': {'Ks': k['Ks'], 'Sum_Kc': k['Sum_Kc'], 'Kt': k['Kt'], 'Kec': k['Kec']},
+                             'moments': moments}
+
+        # --- Continuous Frame + Pattern Live Load (ACI 318 6.4.3) ---
+        # All patterns share one factorization
+        w_dead = (self.h_slab / 100.0) * 2400 + self.inputs['SDL']
+        w_live = self.inputs['LL']
+        full_only = not needs_pattern_loading(w_dead, w_live)
+        f_dl = self.factors.get('DL', 1.4)
+        f_ll = self.factors.get('LL', 1.7)
+
+        for axis, L_width, is_ext in (('x', self.Ly, is_edge_x), ('y', self.Lx, is_edge_y)):
+            k = stiffness[axis]
+            L_spans = k['L_spans']
+            n_spans = len(L_spans)
+            env = solve_efm_pattern_envelope(
+                k['Ks_frame'], k['Kec_frame'], f_dl * w_dead * L_width, f_ll * w_live * L_width, L_spans, full_only
+            )
+            # Design joint: exterior column -> joint 0 | interior column -> first interior joint
+            joint = 0 if (is_ext or n_spans == 1) else 1
+            env['design_joint'] = joint
+            env['Munbal'] = float(env['M_unbal'][joint])
+            env['pattern_loading'] = not full_only
+            results[axis]['frame'] = env
+
         return results
 
-    def run_full_analysis(self):
-        """Main entry point: Updated Sequence to Link EFM Moment to Punching"""
-        # 1. Prep Data
-        w_u = self._calculate_loads()
-        w_service = self._calculate_service_load()
-        d_slab = self._get_eff_depth(self.h_slab)
-        
+    # ---------------------------------------------------------------
+    # STAGES (one method per STAGES entry, upstream outputs as arguments)
+    # ---------------------------------------------------------------
+    def _stage_loads(self):
+        return {"w_u": self._calculate_loads(), "w_service": self._calculate_service_load(),
+                "SDL": self.inputs['SDL'], "LL": self.inputs['LL']}
+
+    def _stage_geometry(self):
         # For Punching Shear Check: ALWAYS use physical dimensions (Structural Drop OR Shear Cap)
         # Because even a Shear Cap helps punching shear.
-        d_punching_total = self._get_eff_depth(self.h_slab + self.h_drop)
+        return {"d_slab": self._get_eff_depth(self.h_slab),
+                "d_total": self._get_eff_depth(self.h_slab + self.h_drop)}
 
-        # 2. DDM Limitations Check
-        # Assumes valid if num_spans/L_adj are missing (simplified for single panel app)
-        ddm_valid, ddm_warn = check_ddm_limitations(
-            self.Lx, self.Ly, 
-            num_spans=self.inputs.get('num_spans', 3), 
-            L_adjacent=self.inputs.get('L_adjacent', None)
-        )
+    def _stage_shear_oneway(self, loads):
+        # d_slab computed here (not from 'geometry') -> changing h_drop does not rerun this stage
+        return self._analyze_oneway(loads["w_u"], self._get_eff_depth(self.h_slab))
 
-        # 3. Shear Analysis (One-way)
-        shear_res = self._analyze_oneway(w_u, d_slab)
+    def _stage_efm_stiffness(self):
+        return self._efm_stiffness()
+
+    def _stage_efm(self, loads, stiffness):
+        return self._analyze_efm(loads["w_u"], stiffness)
+
+    def _stage_shear_punching(self, loads, geometry, efm_res):
+        """Punching (Updated with Openings, EFM Moment & Dynamic Phi)"""
+        w_u = loads["w_u"]
+        d_slab = geometry["d_slab"]
+        d_punching_total = geometry["d_total"]
 
-        # ============================================================
-        # 4. RUN EFM FIRST (Move Up) -> To Get Unbalanced Moments
-        # ============================================================
-        efm_res = self._analyze_efm(w_u)
-        
         # Extract Munbal Logic:
-        col_type = self.inputs['col_type']
-        
-        # X-Direction Munbal
-        Munbal_x = 0
-        if col_type in ['edge', 'corner']:
-             Munbal_x = efm_res['x']['moments']['M_neg_left'] # Left node is exterior
-        
-        # Y-Direction Munbal
-        Munbal_y = 0
-        if col_type == 'corner':
-             Munbal_y = efm_res['y']['moments']['M_neg_left']
+        # Unbalanced moment at the design column from the pattern-load envelope
+        # (exterior joint for edge/corner directions, first interior joint otherwise)
+        Munbal_x = efm_res['x']['frame']['Munbal']
+        Munbal_y = efm_res['y']['frame']['Munbal']
 
         # Design Munbal (Max of X or Y)
         Munbal_design = max(abs(Munbal_x), abs(Munbal_y))
 
-        # ============================================================
-        # 5. PUNCHING ANALYSIS (Updated with Openings, EFM Moment & Dynamic Phi)
-        # ============================================================
         # NOTE: Shear Caps (even if not Structural Drops) still help with Punching Shear
         op_w = self.inputs.get('open_w', 0.0)
         op_dist = self.inputs.get('open_dist', 0.0)
@@ -854,22 +1492,518 @@ class FlatSlabDesign:
                 phi=phi_s
             )
             punch_res['drop_status'] = "No Drop"
+        return punch_res
 
-        # 6. DDM Analysis
+    def _stage_ddm(self, loads):
         # Will automatically use flat plate design if is_structural_drop is False
-        ddm_res = self._analyze_ddm_moments(w_u)
-        
-        # 7. Serviceability
-        h_min = max(self.Lx, self.Ly)*100 / 33.0
-        deflection_res = check_long_term_deflection(
-            w_service, max(self.Lx, self.Ly), self.h_slab, self.fc, None
+        return self._analyze_ddm_moments(loads["w_u"])
+
+    def _stage_deflection(self, loads):
+        return check_long_term_deflection(
+            loads["w_service"], max(self.Lx, self.Ly), self.h_slab, self.fc, None
         )
 
+    def run_full_analysis(self):
+        """
+        Main entry point: every result stage through the dependency graph
+        EFM runs before punching (unbalanced moment); unchanged stages come from the memo.
+        """
+        return self.evaluate(*self.RESULT_STAGES)
+
+    def analyze(self):
+        """run_full_analysis() wrapped as one immutable AnalysisResult (shared by every tab)"""
+        return AnalysisResult(self.run_full_analysis(), self.inputs, self.factors)
+
+# ==========================================
+# PART 4: BATCH CONTROLLER (MANY CASES, COLUMN-WISE)
+# ==========================================
+class FlatSlabBatch:
+    """
+    Column-wise counterpart of FlatSlabDesign
+    1 row = 1 panel/column case, using the same keys that app.py packs into user_inputs.
+    Every stage (loads, one-way shear, EFM, punching, DDM, deflection) runs on whole
+    columns at once and the results come back as ONE flat table.
+    """
+    # Same fallbacks as FlatSlabDesign.__init__
+    DEFAULTS = {
+        "Lx": 8.0, "Ly": 6.0, "cx": 40.0, "cy": 40.0, "lc": 3.0,
+        "h_slab": 20.0, "cover": 2.5, "d_bar": 12, "fc": 240, "fy": 4000,
+        "has_drop": False, "h_drop": 0.0, "drop_w": 0.0, "drop_l": 0.0,
+        "open_w": 0.0, "open_dist": 0.0, "num_spans": 3,
+        "factor_dl": 1.4, "factor_ll": 1.7
+    }
+    REQUIRED = ("SDL", "LL", "col_type")
+
+    DDM_ZONES = ("cs_neg_ext", "ms_neg_ext", "cs_pos", "ms_pos", "cs_neg_int", "ms_neg_int")
+
+    def __init__(self, cases, factors=None):
+        """
+        cases: pandas DataFrame, numpy structured array or dict of columns
+        factors: optional {'DL', 'LL'} applied to every row (otherwise factor_dl/factor_ll columns)
+        """
+        self.return_frame = hasattr(cases, "columns") # pandas DataFrame -> DataFrame out
+        if hasattr(cases, "dtype") and cases.dtype.names:
+            names = cases.dtype.names
+        else:
+            names = list(cases.keys())
+
+        missing = [k for k in self.REQUIRED if k not in names]
+        if missing:
+            raise KeyError(f"FlatSlabBatch: missing required column(s) {missing}")
+
+        def col(key):
+            if key in names:
+                return np.asarray(cases[key])
+            return np.asarray(self.DEFAULTS[key])
+
+        self.n = len(np.asarray(cases[self.REQUIRED[0]]))
+        shape = (self.n,)
+        def num(key): return np.broadcast_to(col(key).astype(float), shape)
+
+        self.Lx, self.Ly = num("Lx"), num("Ly")
+        self.cx, self.cy = num("cx"), num("cy")
+        self.lc = num("lc")
+        self.h_slab, self.cover = num("h_slab"), num("cover")
+        self.d_bar = np.broadcast_to(col("d_bar"), shape)
+        self.fc, self.fy = num("fc"), num("fy")
+        self.SDL, self.LL = num("SDL"), num("LL")
+        self.has_drop = np.broadcast_to(col("has_drop").astype(bool), shape)
+        self.h_drop, self.drop_w, self.drop_l = num("h_drop"), num("drop_w"), num("drop_l")
+        self.open_w, self.open_dist = num("open_w"), num("open_dist")
+        self.num_spans = np.maximum(np.broadcast_to(col("num_spans"), shape).astype(int), 1)
+        self.col_code = np.broadcast_to(col_type_to_code(col("col_type")), shape)
+
+        # --- Load Factors & Phi (same auto-detect rule as FlatSlabDesign) ---
+        if factors:
+            self.f_dl = np.full(shape, float(factors.get('DL', 1.4)))
+            self.f_ll = np.full(shape, float(factors.get('LL', 1.7)))
+        else:
+            self.f_dl, self.f_ll = num("factor_dl"), num("factor_ll")
+        self.phi_shear = np.where(self.f_ll < 1.65, 0.75, 0.85)
+        self.phi_flexure = 0.90
+
+        # --- ACI Drop Panel Compliance ---
+        pass_thick = self.h_drop >= self.h_slab / 4.0
+        pass_size = (self.drop_w / 2.0 >= self.Lx / 6.0) & (self.drop_l / 2.0 >= self.Ly / 6.0)
+        self.is_structural_drop = self.has_drop & pass_thick & pass_size
+
+    def _get_eff_depth(self, h_total):
+        d = h_total - self.cover - (self.d_bar / 10.0) / 2.0
+        return np.maximum(d, 1.0)
+
+    def _analyze_oneway(self, w_u, d_slab):
+        d_m = d_slab / 100.0
+        phi_Vc = self.phi_shear * (0.53 * np.sqrt(self.fc) * 100.0 * d_slab)
+
+        def one_dir(L, c):
+            Vu_face = w_u * (L / 2.0) - w_u * (c / 100.0 / 2.0)
+            Vu_critical = np.maximum(Vu_face - (w_u * 1.0 * d_m), 0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = np.where(phi_Vc > 0, Vu_critical / phi_Vc, 999.0)
+            return Vu_critical, ratio
+
+        Vu_x, ratio_x = one_dir(self.Lx, self.cx)
+        Vu_y, ratio_y = one_dir(self.Ly, self.cy)
+        x_wins = ratio_x > ratio_y
+        ratio = np.where(x_wins, ratio_x, ratio_y)
+        return {
+            "oneway_Vu_critical": np.where(x_wins, Vu_x, Vu_y),
+            "oneway_phi_Vc": phi_Vc,
+            "oneway_ratio": ratio,
+            "oneway_status": np.where(ratio <= 1.0, "OK", "FAIL"),
+            "oneway_dir": np.where(x_wins, "X-Axis", "Y-Axis")
+        }
+
+    def _analyze_efm(self, w_u):
+        # Structural drop -> total thickness into stiffness, Shear Cap -> ignored
+        calc_h_drop = np.where(self.is_structural_drop, self.h_slab + self.h_drop, np.nan)
+        calc_drop_w = np.where(self.is_structural_drop, self.drop_w, 0.0)
+        calc_drop_l = np.where(self.is_structural_drop, self.drop_l, 0.0)
+
+        Ks_x, _, _, Kec_x = calculate_stiffness_batch(
+            self.cx, self.cy, self.Lx, self.Ly, self.lc, self.h_slab, self.fc, calc_h_drop, calc_drop_w)
+        is_edge_x = self.col_code >= COL_TYPE_CODES["edge"]
+        mom_x = solve_efm_distribution_batch(Kec_x, Ks_x, w_u, self.Lx, self.Ly, is_edge_x)
+
+        Ks_y, _, _, Kec_y = calculate_stiffness_batch(
+            self.cy, self.cx, self.Ly, self.Lx, self.lc, self.h_slab, self.fc, calc_h_drop, calc_drop_l)
+        is_edge_y = self.col_code == COL_TYPE_CODES["corner"]
+        mom_y = solve_efm_distribution_batch(Kec_y, Ks_y, w_u, self.Ly, self.Lx, is_edge_y)
+
+        out = {"efm_x_Kec": Kec_x, "efm_y_Kec": Kec_y}
+        for axis, mom in (("x", mom_x), ("y", mom_y)):
+            for key in ("M_neg_left", "M_neg_right", "M_pos"):
+                out[f"efm_{axis}_{key}"] = mom[key]
+
+        # Continuous frame + pattern live load -> unbalanced moment at the design joint
+        w_dead = (self.h_slab / 100.0) * 2400 + self.SDL
+        full_only = ~needs_pattern_loading(w_dead, self.LL)
+        for axis, L_span, L_width, c1, c2, d_w, is_ext in (
+            ("x", self.Lx, self.Ly, self.cx, self.cy, calc_drop_w, is_edge_x),
+            ("y", self.Ly, self.Lx, self.cy, self.cx, calc_drop_l, is_edge_y),
+        ):
+            w_d = self.f_dl * w_dead * L_width
+            w_l = self.f_ll * self.LL * L_width
+            Munbal = np.zeros(self.n)
+            # Frames of equal size & pattern set are solved together
+            for n_sp in np.unique(self.num_spans):
+                for fo in (False, True):
+                    rows = (self.num_spans == n_sp) & (full_only == fo)
+                    if not rows.any():
+                        continue
+                    L_spans = np.repeat(L_span[rows, None], n_sp, axis=1)
+                    Ks_f, Kec_f = efm_frame_from_geometry(
+                        L_spans, L_width[rows], c1[rows], c2[rows], self.lc[rows],
+                        self.h_slab[rows], self.fc[rows], calc_h_drop[rows], d_w[rows]
+                    )
+                    env = solve_efm_pattern_envelope(
+                        Ks_f, Kec_f, w_d[rows, None], w_l[rows, None], L_spans, fo
+                    )
+                    joint = np.where(is_ext[rows] | (n_sp == 1), 0, 1)
+                    Munbal[rows] = env["M_unbal"][np.arange(rows.sum()), joint]
+            out[f"efm_{axis}_Munbal"] = Munbal
+
+        out["Munbal"] = np.maximum(out["efm_x_Munbal"], out["efm_y_Munbal"])
+        return out
+
+    def _analyze_punching(self, w_u, d_slab, d_punching_total, Munbal):
+        """All punching perimeters of all rows in ONE batched check"""
+        n = self.n
+        area = self.Lx * self.Ly
+
+        # A) No Drop: column face, with openings
+        c1_d = self.cx + d_slab
+        c2_d = self.cy + d_slab
+        Vu_single = w_u * (area - (c1_d/100.0) * (c2_d/100.0))
+
+        # B) Drop / Shear Cap: inside drop (d_drop) & outside drop (d_slab, Munbal/2)
+        Vu_in = w_u * area * 0.95
+        Vu_out = w_u * area * 0.90
+
+        zeros = np.zeros(n)
+        res = check_punching_shear_batch(
+            np.concatenate([Vu_single, Vu_in, Vu_out]),
+            np.tile(self.fc, 3),
+            np.concatenate([self.cx, self.cx, self.drop_w * 100]),
+            np.concatenate([self.cy, self.cy, self.drop_l * 100]),
+            np.concatenate([d_slab, d_punching_total, d_slab]),
+            np.tile(self.col_code, 3),
+            np.concatenate([Munbal, Munbal, Munbal * 0.5]),
+            np.concatenate([self.open_w, zeros, zeros]),
+            np.concatenate([self.open_dist, zeros, zeros]),
+            np.tile(self.phi_shear, 3)
+        )
+        single, inside, outside = res[:n], res[n:2*n], res[2*n:]
+
+        pick_inside = inside["ratio"] > outside["ratio"]
+        dual = np.where(pick_inside, inside, outside)
+        gov = np.where(self.has_drop, dual, single)
+        case = np.where(
+            self.has_drop,
+            np.where(pick_inside, "Inside Drop (d_drop)", "Outside Drop (d_slab)"),
+            "Column Face"
+        )
         return {
-            "loads": {"w_u": w_u, "w_service": w_service, "SDL": self.inputs['SDL'], "LL": self.inputs['LL']},
-            "geometry": {"d_slab": d_slab, "d_total": d_punching_total},
-            "shear_oneway": shear_res,
-            "shear_punching": punch_res,
-            "ddm": ddm_res,
-            "efm": efm_res
+            "punch_case": case,
+            "punch_Vu": gov["Vu"],
+            "punch_d": gov["d"],
+            "punch_bo": gov["bo"],
+            "punch_gamma_v": gov["gamma_v"],
+            "punch_stress_actual": gov["stress_actual"],
+            "punch_stress_allow": gov["stress_allow"],
+            "punch_ratio": gov["ratio"],
+            "punch_status": gov["status"]
         }
+
+    def _analyze_ddm_moments(self, w_u, d_slab):
+        use_drop = self.is_structural_drop
+        eff_cx = np.where(use_drop, self.drop_w * 100.0, self.cx)
+        eff_cy = np.where(use_drop, self.drop_l * 100.0, self.cy)
+        h_neg = np.where(use_drop, self.h_slab + self.h_drop, self.h_slab)
+        d_neg = np.where(use_drop, self._get_eff_depth(self.h_slab + self.h_drop), d_slab)
+        d_pos = d_slab
+
+        def Mo_of(L_span, L_width, c_eff):
+            ln = L_span - c_eff/100.0
+            ln = np.where(ln < 0.65 * L_span, 0.65 * L_span, ln)
+            return (w_u * L_width * np.float_power(ln, 2)) / 8
+
+        Mo_x = Mo_of(self.Lx, self.Ly, eff_cx)
+        Mo_y = Mo_of(self.Ly, self.Lx, eff_cy)
+        ext_x = self.col_code >= COL_TYPE_CODES["edge"]
+        ext_y = self.col_code == COL_TYPE_CODES["corner"]
+
+        # (neg_ext, pos, neg_int) fractions of Mo & Column Strip shares (ACI 318 Tables)
+        def strip_moments(Mo, is_ext):
+            f = [np.where(is_ext, e, i) for e, i in ((0.26, 0.65), (0.52, 0.35), (0.70, 0.65))]
+            pct = [np.where(is_ext, 1.00, 0.75), 0.60, 0.75]
+            M_total = [Mo * fi for fi in f]
+            M_cs = [M * p for M, p in zip(M_total, pct)]
+            M_ms = [M - Mc for M, Mc in zip(M_total, M_cs)]
+            return M_cs, M_ms
+
+        Mu, b, d, h = [], [], [], []
+        for Mo, L_width, is_ext in ((Mo_x, self.Ly, ext_x), (Mo_y, self.Lx, ext_y)):
+            M_cs, M_ms = strip_moments(Mo, is_ext)
+            b_strip = (L_width * 100.0) / 2.0
+            # Same zone order as DDM_ZONES
+            for Mu_z, d_z, h_z in (
+                (M_cs[0], d_neg, h_neg), (M_ms[0], d_neg, self.h_slab),
+                (M_cs[1], d_pos, self.h_slab), (M_ms[1], d_pos, self.h_slab),
+                (M_cs[2], d_neg, h_neg), (M_ms[2], d_neg, self.h_slab),
+            ):
+                Mu.append(Mu_z); b.append(b_strip); d.append(d_z); h.append(h_z)
+
+        # 12 zones x N cases in ONE call
+        des = design_flexure_slab_batch(
+            np.stack(Mu), np.stack(b), np.stack(d), np.stack(h),
+            self.fc, self.fy, self.d_bar, phi=self.phi_flexure
+        )
+
+        out = {"ddm_x_Mo": Mo_x, "ddm_y_Mo": Mo_y}
+        i = 0
+        for axis in ("x", "y"):
+            for zone in self.DDM_ZONES:
+                out[f"ddm_{axis}_{zone}_As"] = des["As_req"][i]
+                out[f"ddm_{axis}_{zone}_spacing"] = des["spacing"][i]
+                i += 1
+        out["ddm_fail_zones"] = (des["status"] >= FLEX_INVALID_DEPTH).sum(axis=0)
+        return out
+
+    def _check_deflection(self, w_service):
+        """Same approximation as check_long_term_deflection (b = 100 cm)"""
+        b = 100.0
+        Ec = 15100 * np.sqrt(self.fc)
+        L_cm = np.maximum(self.Lx, self.Ly) * 100.0
+        w_line_kg_cm = (w_service * (b/100.0)) / 100.0
+        Ie = 0.4 * (b * np.float_power(self.h_slab, 3) / 12.0)
+        Delta_immediate = (5 * w_line_kg_cm * np.float_power(L_cm, 4)) / (384 * Ec * Ie) * 0.5
+        Delta_Total = Delta_immediate + Delta_immediate * 2.0
+        Limit_240 = L_cm / 240.0
+        return {
+            "defl_total": Delta_Total,
+            "defl_limit": Limit_240,
+            "defl_ratio": Delta_Total / Limit_240,
+            "defl_status": np.where(Delta_Total <= Limit_240, "PASS", "FAIL")
+        }
+
+    def run_full_analysis(self):
+        """Run every stage column-wise -> one flat results table (1 row per case)"""
+        # 1. Loads & Depths
+        w_self = (self.h_slab / 100.0) * 2400
+        w_u = self.f_dl * (w_self + self.SDL) + self.f_ll * self.LL
+        w_service = (w_self + self.SDL) + self.LL
+        d_slab = self._get_eff_depth(self.h_slab)
+        d_punching_total = self._get_eff_depth(self.h_slab + self.h_drop)
+
+        cols = {
+            "w_u": w_u, "w_service": w_service,
+            "d_slab": d_slab, "d_total": d_punching_total,
+            "is_structural_drop": self.is_structural_drop.copy()
+        }
+        # 2. Stages
+        cols.update(self._analyze_oneway(w_u, d_slab))
+        efm = self._analyze_efm(w_u)
+        cols.update(efm)
+        cols.update(self._analyze_punching(w_u, d_slab, d_punching_total, efm["Munbal"]))
+        cols.update(self._analyze_ddm_moments(w_u, d_slab))
+        cols.update(self._check_deflection(w_service))
+
+        return self._make_table(cols)
+
+    def _make_table(self, cols):
+        if self.return_frame:
+            import pandas as pd # Only needed when the caller works in pandas
+            return pd.DataFrame(cols)
+        table = np.zeros(self.n, dtype=[(k, v.dtype) for k, v in cols.items()])
+        for k, v in cols.items():
+            table[k] = v
+        return table
+
+# ==========================================
+# PART 5: SHARED ANALYSIS RESULT (IMMUTABLE + LAZY DETAILS)
+# ==========================================
+# FlatSlabDesign(...).analyze() runs the engine ONCE; every tab reads this object
+# instead of recomputing wu / d / bo / Jc / gamma_v with its own assumptions.
+# Details for the step-by-step views are derived on first access and memoized.
+
+def _freeze_tree(obj):
+    """dict -> read-only mapping, list -> tuple, ndarray -> read-only (recursive)"""
+    if isinstance(obj, Mapping):
+        return MappingProxyType({k: _freeze_tree(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze_tree(v) for v in obj)
+    if isinstance(obj, np.ndarray):
+        obj.flags.writeable = False
+    return obj
+
+def _thaw_tree(obj):
+    """Inverse of _freeze_tree (plain dicts/lists, e.g. for JSON export)"""
+    if isinstance(obj, Mapping):
+        return {k: _thaw_tree(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return [_thaw_tree(v) for v in obj]
+    return obj
+
+class AnalysisResult(Mapping):
+    """
+    Read-only view of run_full_analysis() (same keys: loads, geometry, shear_oneway,
+    shear_punching, ddm, efm, deflection) + lazy detail accessors for the UI
+    """
+    PUNCH_LABELS = ("d/2 from Column Face", "d/2 from Drop/Cap Edge")
+
+    def __init__(self, results, inputs, factors):
+        self._data = _freeze_tree(results)
+        self.inputs = _freeze_tree(inputs)
+        self.factors = _freeze_tree(factors or {})
+        self._details = {}
+
+    @classmethod
+    def from_inputs(cls, inputs, factors=None):
+        """Run the engine (factors default to the factor_dl/factor_ll inputs)"""
+        if factors is None:
+            factors = {'DL': inputs.get('factor_dl', 1.4), 'LL': inputs.get('factor_ll', 1.7)}
+        return FlatSlabDesign(dict(inputs), factors=dict(factors)).analyze()
+
+    # --- Mapping protocol (drop-in for the old results dict) ---
+    def __getitem__(self, key): return self._data[key]
+    def __iter__(self): return iter(self._data)
+    def __len__(self): return len(self._data)
+    def __repr__(self): return f"AnalysisResult({list(self._data)})"
+
+    def to_dict(self):
+        return _thaw_tree(self._data)
+
+    def _detail(self, key, build):
+        # Benign race: two sessions may build the same detail once each
+        if key not in self._details:
+            self._details[key] = _freeze_tree(build())
+        return self._details[key]
+
+    # --- Shortcuts ---
+    @property
+    def loads(self): return self._data['loads']
+    @property
+    def geometry(self): return self._data['geometry']
+    @property
+    def oneway(self): return self._data['shear_oneway']
+    @property
+    def punching(self): return self._data['shear_punching']
+    @property
+    def ddm(self): return self._data['ddm']
+    @property
+    def efm(self): return self._data['efm']
+    @property
+    def deflection(self): return self._data['deflection']
+    @property
+    def w_u(self): return self.loads['w_u']
+    @property
+    def col_type(self): return self.inputs.get('col_type', 'interior')
+
+    # --- Lazy details ---
+    def punching_sections(self):
+        """
+        Checked critical sections in display order: column face first, then drop edge
+        Each: {label, c1, c2 (cm, 'column' size used for the section), res (engine result)}
+        """
+        def build():
+            p = self.punching
+            cx, cy = self.inputs.get('cx', 40.0), self.inputs.get('cy', 40.0)
+            if not p.get('is_dual'):
+                return [{"label": self.PUNCH_LABELS[0], "c1": cx, "c2": cy, "res": p}]
+            inner, outer = (p, p['other_case']) if p.get('case', '').startswith("Inside") else (p['other_case'], p)
+            return [
+                {"label": self.PUNCH_LABELS[0], "c1": cx, "c2": cy, "res": inner},
+                {"label": self.PUNCH_LABELS[1], "c1": self.inputs.get('drop_w', 0.0) * 100,
+                 "c2": self.inputs.get('drop_l', 0.0) * 100, "res": outer},
+            ]
+        return self._detail("punching_sections", build)
+
+    def punching_detail(self, section=0):
+        """Capacity breakdown (3 ACI equations) + stresses of one critical section"""
+        def build():
+            sec = self.punching_sections()[section]
+            r, c1, c2 = sec['res'], sec['c1'], sec['c2']
+            out = {"label": sec['label'], "c1": c1, "c2": c2, "col_type": self.col_type}
+            if 'Ac' not in r: # engine error result (e.g. opening too big)
+                out.update(r)
+                return out
+            d, bo, Ac = r['d'], r['bo'], r['Ac']
+            fc = self.inputs.get('fc', 240)
+            sqrt_fc = np.sqrt(fc)
+            beta = max(c1, c2) / min(c1, c2) if min(c1, c2) > 0 else 1.0
+            alpha_s = {"interior": 40, "edge": 30}.get(self.col_type, 20)
+            vc_basic = 1.06 * sqrt_fc
+            vc_beta = 0.27 * (2 + 4/beta) * sqrt_fc
+            vc_size = 0.27 * ((alpha_s * d / bo) + 2) * sqrt_fc if bo > 0 else vc_basic
+            # c_AB is not kept by the engine -> same section geometry once more
+            is_face = not self.punching.get('is_dual')
+            _, _, _, c_AB, _, _ = calculate_section_properties(
+                c1, c2, d, self.col_type,
+                self.inputs.get('open_w', 0) if is_face else 0,
+                self.inputs.get('open_dist', 0) if is_face else 0
+            )
+            v_direct = r['Vu'] / Ac
+            out.update({
+                "d": d, "bo": bo, "Ac": Ac, "beta": beta, "alpha_s": alpha_s, "sqrt_fc": sqrt_fc,
+                "Vc_beta": vc_beta * Ac, "Vc_size": vc_size * Ac, "Vc_basic": vc_basic * Ac,
+                "Vc": r['Vc_nominal'], "phi": self.factors.get('phi_shear', 0.85), "phi_Vc": r['phi_Vc'],
+                "Vu": r['Vu'], "Munbal": r['Munbal'], "gamma_v": r['gamma_v'], "Jc": r['Jc'], "c_AB": c_AB,
+                "v_direct": v_direct, "v_moment": r['stress_actual'] - v_direct,
+                "v_max": r['stress_actual'], "v_allow": r['stress_allow'],
+                "ratio": r['ratio'], "status": r['status'],
+                "deduction": r.get('deduction', 0.0), "case": r.get('case', "")
+            })
+            return out
+        return self._detail(("punching_detail", section), build)
+
+    def punching_physics(self, axis="x"):
+        """
+        Column-face critical section oriented for one frame direction
+        (c1 parallel to the span) -> {type, b1, b2, L1, L2, bo, Jc, c_AB, gamma_v, d, Vu}
+        """
+        def build():
+            sec = self.punching_sections()[0]
+            cx, cy = self.inputs.get('cx', 40.0), self.inputs.get('cy', 40.0)
+            c1, c2 = (cx, cy) if axis.lower() == "x" else (cy, cx)
+            d = sec['res'].get('d', self.geometry['d_total'])
+            Ac, Jc, gamma_v, c_AB, bo, _ = calculate_section_properties(c1, c2, d, self.col_type)
+            if self.col_type == "edge":
+                b1, b2 = c1 + d/2.0, c2 + d
+            elif self.col_type == "corner":
+                b1, b2 = c1 + d/2.0, c2 + d/2.0
+            else:
+                b1, b2 = c1 + d, c2 + d
+            return {
+                "type": {"edge": "Edge", "corner": "Corner"}.get(self.col_type, "Interior"),
+                "c1": c1, "c2": c2, "d": d,
+                "b1": b1, "b2": b2, "L1": b1, "L2": b2,
+                "bo": bo, "Ac": Ac, "Jc": Jc, "c_AB": c_AB, "gamma_v": gamma_v,
+                "Vu": sec['res'].get('Vu', 0.0)
+            }
+        return self._detail(("punching_physics", axis.lower()), build)
+
+    def oneway_detail(self):
+        """Governing one-way shear strip with the geometry the engine used"""
+        def build():
+            r = self.oneway
+            is_x = r.get('critical_dir', "X-Axis").startswith("X")
+            L_span = self.inputs.get('Lx', 8.0) if is_x else self.inputs.get('Ly', 6.0)
+            c = self.inputs.get('cx', 40.0) if is_x else self.inputs.get('cy', 40.0)
+            out = dict(r)
+            out.update({
+                "axis": "X-Direction" if is_x else "Y-Direction",
+                "L_span": L_span, "c": c, "L_clear": L_span - c / 100.0,
+                "d": self.geometry['d_slab'], "w_u": self.w_u,
+                "phi": self.factors.get('phi_shear', 0.85),
+                "sqrt_fc": np.sqrt(self.inputs.get('fc', 240))
+            })
+            return out
+        return self._detail("oneway_detail", build)
+
+    def ddm_direction(self, axis, span_type):
+        """DDM strip moments for a span condition (own copy -> shared result stays untouched)"""
+        def build():
+            from DDM_Logic import update_moments_based_on_config
+            return update_moments_based_on_config(_thaw_tree(self.ddm[axis]), span_type)
+        return self._detail(("ddm_direction", axis, span_type), build)
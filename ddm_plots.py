@@ -1,15 +1,14 @@
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import matplotlib.ticker as ticker
+import figure_manager
 import numpy as np
-import streamlit as st
 
 def draw_span_schematic(span_type):
     """
     สร้างรูปตัดขวาง (Schematic Section) ตามประเภท Span ที่เลือก
     เพื่อให้วิศวกรเห็นภาพ Boundary Condition
     """
-    fig, ax = plt.subplots(figsize=(6, 2))
+    fig, ax = figure_manager.subplots(figsize=(6, 2), key="ddm_plots.draw_span_schematic")
     ax.set_xlim(-1, 11)
     ax.set_ylim(-1, 3)
     ax.axis('off') # ปิดแกนเลข
@@ -129,7 +128,7 @@ def draw_dimension(ax, x1, y1, x2, y2, text, offset=0.3, color='#555'):
 # 1. BENDING MOMENT DIAGRAM
 # ==========================================
 def plot_ddm_moment(L_span, c1, m_vals):
-    fig, ax = plt.subplots(figsize=(10, 4), facecolor=CLR_BG)
+    fig, ax = figure_manager.subplots(figsize=(10, 4), facecolor=CLR_BG, key="ddm_plots.plot_ddm_moment")
     
     x = np.linspace(0, L_span, 400)
     M_neg_cs, M_pos_cs = m_vals['M_cs_neg'], m_vals['M_cs_pos']
@@ -163,7 +162,7 @@ def plot_ddm_moment(L_span, c1, m_vals):
     annotate_peak(L_span/2, M_pos_cs, f"{M_pos_cs:,.0f}", CLR_BAR_BOT, 'bottom')
 
     ax.legend(loc='best', frameon=True)
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 # ==========================================
@@ -173,7 +172,7 @@ def plot_rebar_detailing(L_span, h_slab, c_para, rebar_results, axis_dir):
     h_m = h_slab / 100.0
     c_m = c_para / 100.0
     
-    fig, ax = plt.subplots(figsize=(10, 3.5), facecolor=CLR_BG)
+    fig, ax = figure_manager.subplots(figsize=(10, 3.5), facecolor=CLR_BG, key="ddm_plots.plot_rebar_detailing")
     ax.axis('off')
 
     # Concrete
@@ -222,14 +221,14 @@ def plot_rebar_detailing(L_span, h_slab, c_para, rebar_results, axis_dir):
     ax.set_title(f"SECTION A-A: REBAR DETAILING ({axis_dir})", fontsize=11, fontweight='bold', pad=20)
     ax.set_xlim(-0.5, L_span + 0.5)
     ax.set_ylim(-0.8, h_m + 1.0)
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 # ==========================================
 # 3. PLAN VIEW DETAILED
 # ==========================================
 def plot_rebar_plan_view(L_span, L_width, c_para, rebar_results, axis_dir):
-    fig, ax = plt.subplots(figsize=(8, 8), facecolor=CLR_BG)
+    fig, ax = figure_manager.subplots(figsize=(8, 8), facecolor=CLR_BG, key="ddm_plots.plot_rebar_plan_view")
     ax.axis('off')
     
     W = L_span if axis_dir == 'X' else L_width
@@ -290,7 +289,7 @@ def plot_rebar_plan_view(L_span, L_width, c_para, rebar_results, axis_dir):
     ax.set_title(f"PLAN VIEW: REBAR LAYOUT ({axis_dir})", fontsize=12, fontweight='bold', pad=20)
     ax.set_xlim(-1, W + 1)
     ax.set_ylim(-2, H + 2)
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 # เพิ่มต่อท้ายในไฟล์ ddm_plots.py
@@ -298,7 +297,7 @@ def plot_punching_shear_geometry(c1, c2, d_avg, bo, status, ratio):
     """
     แสดงรูปแปลนจุดรองรับและแนววิกฤต Punching Shear
     """
-    fig, ax = plt.subplots(figsize=(6, 6), facecolor=CLR_BG)
+    fig, ax = figure_manager.subplots(figsize=(6, 6), facecolor=CLR_BG, key="ddm_plots.plot_punching_shear_geometry")
     
     # Scale constants
     limit = max(c1, c2) * 3 + d_avg * 2
@@ -336,5 +335,5 @@ def plot_punching_shear_geometry(c1, c2, d_avg, bo, status, ratio):
     ax.set_title(f"PUNCHING SHEAR CHECK: {status}\nRatio = {ratio:.2f}", 
                  color=color_crit, fontweight='bold', fontsize=12)
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
@@ -0,0 +1,152 @@
+# figure_cache.py
+import hashlib
+import inspect
+import json
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import numpy as np
+
+import figure_manager
+import perf
+
+# ==========================================
+# FIGURE MEMOIZATION (RENDERED BYTES, LRU)
+# ==========================================
+# Diagram functions take a handful of scalars -> same arguments, same picture.
+# Render once to PNG/SVG bytes, keep the bytes, serve with st.image on every rerun.
+# Usage (inside a Streamlit tab):
+#   figure_cache.st_figure(ddm_plots.plot_ddm_moment, L_span, c1, m_vals)
+# set_store(result_store.ResultStore) adds a disk tier shared by processes (app.py does this).
+
+DEFAULT_DPI = figure_manager.DEFAULT_DPI
+MAX_ENTRIES = 128
+MAX_BYTES = 64 * 1024 * 1024 # total size cap of stored images
+# Bump when a shared look changes (figure_manager style, DPI handling, ...). The source of
+# the plot function's module is hashed into every key as well -> bytes persisted in the
+# disk store are never served after the drawing code changes.
+FIGURE_VERSION = 1
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "bytes": 0}
+_disk = None # result_store.ResultStore (optional second tier)
+_render_versions = {} # module name -> hash of its source
+
+
+def set_store(store):
+    """Read/write rendered bytes through a persistent store (None = memory only)"""
+    global _disk
+    _disk = store
+
+
+def _to_jsonable(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    if isinstance(obj, Mapping): # read-only views from calculations.AnalysisResult
+        return dict(obj)
+    raise TypeError(f"Unhashable figure argument of type {type(obj).__name__}")
+
+
+def render_version(plot_fn):
+    """FIGURE_VERSION + hash of the source of the module defining plot_fn (cached per module)"""
+    name = plot_fn.__module__
+    version = _render_versions.get(name)
+    if version is None:
+        try:
+            src = inspect.getsource(sys.modules[name])
+        except (KeyError, TypeError, OSError): # no source (frozen / interactive) -> constant only
+            src = ""
+        version = f"{FIGURE_VERSION}:{hashlib.sha256(src.encode('utf-8')).hexdigest()[:16]}"
+        _render_versions[name] = version
+    return version
+
+
+def figure_key(plot_fn, args, kwargs, fmt, dpi):
+    """Stable key from the plot function + its drawing code version + its arguments (None if not hashable)"""
+    payload = {
+        "fn": f"{plot_fn.__module__}.{plot_fn.__qualname__}",
+        "render": render_version(plot_fn),
+        "args": list(args), "kwargs": kwargs, "fmt": fmt, "dpi": dpi,
+    }
+    try:
+        text = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=_to_jsonable)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def render_figure_bytes(fig, fmt="png", dpi=DEFAULT_DPI):
+    """Rasterize (or export SVG) and release the figure"""
+    return figure_manager.rasterize(fig, fmt, dpi)
+
+
+def _store(key, data):
+    with _lock:
+        if key in _cache:
+            _stats["bytes"] -= len(_cache.pop(key))
+        _cache[key] = data
+        _stats["bytes"] += len(data)
+        while _cache and (len(_cache) > MAX_ENTRIES or _stats["bytes"] > MAX_BYTES):
+            _, old = _cache.popitem(last=False) # evict least recently used
+            _stats["bytes"] -= len(old)
+
+
+def cached_figure_bytes(plot_fn, *args, fmt="png", dpi=DEFAULT_DPI, **kwargs):
+    """
+    Bytes of plot_fn(*args, **kwargs) rendered as PNG/SVG.
+    plot_fn must return a matplotlib Figure; it only runs when the arguments are new.
+    """
+    key = figure_key(plot_fn, args, kwargs, fmt, dpi)
+    if key is not None:
+        with _lock:
+            data = _cache.get(key)
+            if data is not None:
+                _cache.move_to_end(key)
+                _stats["hits"] += 1
+                perf.count("figure.cache_hit")
+                return data
+        if _disk is not None:
+            data = _disk.get("figure", key)
+            if data is not None:
+                perf.count("figure.store_hit")
+                _store(key, data)
+                return data
+
+    with _lock:
+        _stats["misses"] += 1
+    with perf.timer("figure." + plot_fn.__name__):
+        fig = plot_fn(*args, **kwargs)
+    data = render_figure_bytes(fig, fmt, dpi)
+    if key is not None:
+        _store(key, data)
+        if _disk is not None:
+            _disk.put("figure", key, data)
+    return data
+
+
+def st_figure(plot_fn, *args, fmt="png", dpi=DEFAULT_DPI, **kwargs):
+    """Streamlit replacement for st.pyplot(plot_fn(...)) backed by the byte cache"""
+    import streamlit as st
+    data = cached_figure_bytes(plot_fn, *args, fmt=fmt, dpi=dpi, **kwargs)
+    if fmt == "svg":
+        st.image(data.decode("utf-8"))
+    else:
+        st.image(data)
+
+
+def cache_stats():
+    with _lock:
+        return dict(_stats, entries=len(_cache))
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0, bytes=0)
@@ -0,0 +1,156 @@
+# figure_manager.py
+import gc
+import io
+import threading
+import weakref
+
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import perf
+
+# ==========================================
+# FIGURE LIFECYCLE MANAGER
+# ==========================================
+# All plotting modules create figures here instead of plt.subplots/plt.figure.
+# - Figures are plain matplotlib Figure objects (NOT registered in pyplot), so nothing
+#   keeps them alive after the rerun -> memory stays flat on a long-running server.
+# - subplots(key=...) reuses Figure/Axes of a fixed layout: the figure is checked out of
+#   the pool and checked back in by rasterize()/release() -> never shared by two sessions.
+#   Do not keep a pooled figure after releasing it.
+# - live_figure_count() reports how many figures are still in memory.
+
+DEFAULT_DPI = 150
+POOL_PER_KEY = 4 # idle figures kept per layout key (concurrent sessions need >1)
+
+_live = weakref.WeakSet() # every managed figure not yet garbage collected
+_pool_key = weakref.WeakKeyDictionary() # pooled figure -> its layout key
+_idle = {} # layout key -> [(fig, axes), ...] ready for reuse
+_lock = threading.Lock()
+_stats = {"created": 0, "reused": 0, "released": 0}
+
+
+def _new_figure(figsize=None, **fig_kw):
+    fig = Figure(figsize=figsize, **fig_kw)
+    FigureCanvasAgg(fig) # attach a raster canvas (no GUI backend needed)
+    with _lock:
+        _live.add(fig)
+        _stats["created"] += 1
+    return fig
+
+
+def _reset_axes(ax):
+    """Bring a pooled Axes back to a freshly-created state"""
+    rc = matplotlib.rcParams
+    ax.clear()
+    ax.set_axis_on()
+    ax.set_aspect("auto")
+    ax.set_facecolor(rc["axes.facecolor"])
+    for side, spine in ax.spines.items():
+        spine.set_visible(rc.get(f"axes.spines.{side}", True))
+
+
+def figure(figsize=None, **fig_kw):
+    """Unpooled figure (for functions that build their own layout, e.g. gridspec)"""
+    return _new_figure(figsize, **fig_kw)
+
+
+def subplots(nrows=1, ncols=1, figsize=None, key=None, subplot_kw=None, **fig_kw):
+    """
+    Drop-in for plt.subplots(); returns (fig, ax | axes array)
+    key: fixed layout -> take an idle Figure/Axes with the same key + layout from the pool
+         (it goes back to the pool in release()/rasterize())
+    """
+    if key is None:
+        fig = _new_figure(figsize, **fig_kw)
+        return fig, fig.subplots(nrows, ncols, subplot_kw=subplot_kw)
+
+    pool_key = (key, nrows, ncols, tuple(figsize) if figsize else None,
+                repr(sorted(fig_kw.items())), repr(sorted((subplot_kw or {}).items())))
+    with _lock:
+        idle = _idle.get(pool_key)
+        entry = idle.pop() if idle else None
+
+    if entry is None:
+        fig = _new_figure(figsize, **fig_kw)
+        axes = fig.subplots(nrows, ncols, subplot_kw=subplot_kw)
+        fig._fm_axes = axes
+        fig._fm_layout_axes = tuple(fig.axes)
+        with _lock:
+            _pool_key[fig] = pool_key
+        return fig, axes
+
+    fig, axes = entry
+    for ax in list(fig.axes):
+        if any(ax is a for a in fig._fm_layout_axes):
+            _reset_axes(ax)
+        else:
+            fig.delaxes(ax) # twinx / colorbar axes added by the previous drawing
+    for txt in list(fig.texts):
+        txt.remove()
+    fig.set_facecolor(fig_kw.get("facecolor", matplotlib.rcParams["figure.facecolor"]))
+    with _lock:
+        _stats["reused"] += 1
+    return fig, axes
+
+
+def release(fig):
+    """Done with this figure: pooled ones go back to the pool, others are emptied"""
+    with _lock:
+        _stats["released"] += 1
+        pool_key = _pool_key.get(fig)
+        if pool_key is not None:
+            idle = _idle.setdefault(pool_key, [])
+            if len(idle) < POOL_PER_KEY and all(f is not fig for f, _ in idle):
+                idle.append((fig, fig._fm_axes))
+                return
+            del _pool_key[fig]
+    if fig in _live:
+        fig.clear()
+        _live.discard(fig)
+    else:
+        # Legacy pyplot figure
+        import matplotlib.pyplot as plt
+        plt.close(fig)
+
+
+def rasterize(fig, fmt="png", dpi=DEFAULT_DPI):
+    """Render to PNG/SVG bytes, then release the figure"""
+    buf = io.BytesIO()
+    try:
+        with perf.timer("figure.rasterize"):
+            fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches="tight", facecolor=fig.get_facecolor())
+    finally:
+        release(fig)
+    return buf.getvalue()
+
+
+def st_show(fig, fmt="png", dpi=DEFAULT_DPI, width="stretch", **image_kw):
+    """
+    Streamlit replacement for st.pyplot(fig): rasterize, release, st.image
+    width: st.image width ("stretch" = container width like st.pyplot, "content" or pixels)
+    """
+    import streamlit as st
+    data = rasterize(fig, fmt, dpi)
+    st.image(data.decode("utf-8") if fmt == "svg" else data, width=width, **image_kw)
+
+
+def live_figure_count(collect=False):
+    """
+    Figures still in memory (managed + any left open in pyplot)
+    collect=True runs the garbage collector first (figures hold reference cycles)
+    """
+    if collect:
+        gc.collect()
+    import matplotlib.pyplot as plt
+    return len(_live) + len(plt.get_fignums())
+
+
+def stats():
+    out = {"live": live_figure_count()}
+    with _lock:
+        out.update(_stats)
+        out["pooled"] = len(_pool_key)
+        out["idle"] = sum(len(v) for v in _idle.values())
+    return out
@@ -0,0 +1,41 @@
+# flatslab/__init__.py
+"""
+Flat-slab design engine without the UI (numpy only: no Streamlit / Matplotlib / pandas).
+Every calculation kernel used by the tabs is importable from here, e.g. in a worker process:
+    from flatslab import FlatSlabBatch, AnalysisResult, calc_rebar_logic, calculate_punching_physics
+Command line:
+    python -m flatslab batch cases.csv -o results.parquet
+plate_fem (scipy) and solver / sweep stay separate modules -> import them when needed.
+
+This is a facade over the top-level modules (calculations, DDM_Logic, EFM_Logic), not an
+installable package: the repository root must be on sys.path (run from the root, or set
+PYTHONPATH=<repo root>), otherwise the imports below fail with ModuleNotFoundError.
+"""
+from calculations import (
+    ENGINE_VERSION,
+    # Flexure
+    design_flexure_slab, design_flexure_slab_batch, flexure_batch_row,
+    # Punching / one-way shear
+    calculate_section_properties, check_punching_shear,
+    col_type_to_code, calculate_section_properties_batch, check_punching_shear_batch,
+    check_punching_dual_case, check_oneway_shear,
+    # Serviceability / code limits
+    check_min_reinforcement, check_long_term_deflection, check_min_thickness, check_min_thickness_batch,
+    check_ddm_limitations,
+    # EFM
+    calculate_stiffness, solve_efm_distribution,
+    calculate_stiffness_batch, solve_efm_distribution_batch,
+    build_efm_frame_stiffness, solve_efm_frame, efm_frame_from_geometry,
+    needs_pattern_loading, efm_live_load_patterns, solve_efm_pattern_envelope,
+    # Pipelines
+    FlatSlabDesign, FlatSlabBatch, AnalysisResult,
+)
+from DDM_Logic import (
+    get_beta1, calc_rebar_logic, calc_deflection_check,
+    get_ddm_coeffs, update_moments_based_on_config,
+    calculate_punching_physics,
+    score_rebar_catalog, optimize_rebar_catalog,
+)
+from EFM_Logic import run_moment_distribution, calculate_capacity_check
+
+__version__ = ENGINE_VERSION
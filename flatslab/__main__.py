@@ -0,0 +1,6 @@
+# flatslab/__main__.py
+import sys
+
+from flatslab.cli import main
+
+sys.exit(main())
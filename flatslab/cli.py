@@ -0,0 +1,202 @@
+# flatslab/cli.py
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import calculations as calc
+
+# ==========================================
+# HEADLESS BATCH RUNNER
+# ==========================================
+# CSV / Parquet of cases (1 row = 1 panel, same keys as app.py user_inputs)
+#   -> chunks -> worker processes (FlatSlabBatch) -> results appended chunk by chunk
+# Never imports streamlit or matplotlib, so it runs on build agents without a UI.
+#   python -m flatslab batch cases.csv -o results.parquet --workers 4
+
+ENGINE_KEYS = tuple(calc.FlatSlabBatch.DEFAULTS) + calc.FlatSlabBatch.REQUIRED
+RATIO_COLUMNS = ("oneway_ratio", "punch_ratio", "defl_ratio") # demand / capacity, pass <= 1
+DEFAULT_CHUNK_SIZE = 5000
+
+
+# ==========================================
+# 1. INPUT (STREAMED IN CHUNKS)
+# ==========================================
+def read_cases(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield pandas DataFrames of at most chunk_size rows from a .csv or .parquet file"""
+    import pandas as pd
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            yield pd.read_parquet(path) # engine fallback -> one chunk
+            return
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, skipinitialspace=True)
+
+
+def engine_columns(frame):
+    """Only the engine inputs go to the workers (ids / notes stay in the parent)"""
+    missing = [k for k in calc.FlatSlabBatch.REQUIRED if k not in frame.columns]
+    if missing:
+        raise KeyError(f"Input file is missing required column(s) {missing}")
+    return {k: frame[k].to_numpy() for k in ENGINE_KEYS if k in frame.columns}
+
+
+def _run_block(columns, factors):
+    """Worker: one chunk through the batch pipeline (top-level so it can be pickled)"""
+    return calc.FlatSlabBatch(columns, factors=factors).run_full_analysis()
+
+
+def merge_results(frame, table):
+    """Input columns + engine results + overall all_pass flag"""
+    import pandas as pd
+    res = pd.DataFrame({k: table[k] for k in table.dtype.names})
+    ok = np.asarray(table["ddm_fail_zones"]) == 0
+    for k in RATIO_COLUMNS:
+        ok &= np.asarray(table[k]) <= 1.0
+    res["all_pass"] = ok
+    frame = frame.drop(columns=[k for k in res.columns if k in frame.columns]).reset_index(drop=True)
+    return pd.concat([frame, res], axis=1)
+
+
+# ==========================================
+# 2. OUTPUT (APPENDED CHUNK BY CHUNK)
+# ==========================================
+class CsvSink:
+    def __init__(self, path):
+        self.f = open(path, "w", newline="", encoding="utf-8")
+        self.header = True
+
+    def write(self, df):
+        df.to_csv(self.f, header=self.header, index=False)
+        self.header = False
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetSink:
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow (pip install pyarrow) -> or use -o results.csv")
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.writer = None
+
+    def write(self, df):
+        tbl = self.pa.Table.from_pandas(df, preserve_index=False)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, tbl.schema) # schema of the first chunk
+        elif tbl.schema != self.writer.schema:
+            tbl = tbl.cast(self.writer.schema)
+        self.writer.write_table(tbl) # one row group per chunk
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_sink(path):
+    return ParquetSink(path) if path.lower().endswith(".parquet") else CsvSink(path)
+
+
+# ==========================================
+# 3. BATCH DRIVER
+# ==========================================
+def run_batch(src, dst, factors=None, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=None, progress=None):
+    """
+    Stream src (csv/parquet) through the engine and write dst chunk by chunk, in input order
+    factors: {'DL', 'LL'} for every row (None -> factor_dl/factor_ll columns or defaults)
+    max_workers: processes (None -> os.cpu_count(), 1 -> run in this process)
+    Returns: {"rows", "failed", "seconds"}
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, int(max_workers))
+    stats = {"rows": 0, "failed": 0}
+    t0 = time.perf_counter()
+
+    def emit(frame, table):
+        df = merge_results(frame, table)
+        sink.write(df)
+        stats["rows"] += len(df)
+        stats["failed"] += int((~df["all_pass"]).sum())
+        if progress: progress(stats["rows"], time.perf_counter() - t0)
+
+    sink = open_sink(dst)
+    try:
+        chunks = read_cases(src, max(int(chunk_size), 1))
+        if max_workers == 1:
+            for frame in chunks:
+                emit(frame, _run_block(engine_columns(frame), factors))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                # Bounded window: at most 2 chunks per worker in flight -> memory stays flat
+                pending = deque()
+                for frame in chunks:
+                    pending.append((frame, pool.submit(_run_block, engine_columns(frame), factors)))
+                    if len(pending) >= 2 * max_workers:
+                        frame_done, fut = pending.popleft()
+                        emit(frame_done, fut.result())
+                while pending:
+                    frame_done, fut = pending.popleft()
+                    emit(frame_done, fut.result())
+    finally:
+        sink.close()
+
+    stats["seconds"] = time.perf_counter() - t0
+    return stats
+
+
+# ==========================================
+# 4. COMMAND LINE
+# ==========================================
+def build_parser():
+    p = argparse.ArgumentParser(prog="python -m flatslab", description="Flat slab design engine (headless)")
+    p.add_argument("--version", action="version", version=f"%(prog)s engine {calc.ENGINE_VERSION}")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    b = sub.add_parser("batch", help="run every case row of a CSV/Parquet file")
+    b.add_argument("cases", help="input .csv or .parquet (columns = user_inputs keys, e.g. Lx, Ly, h_slab, SDL, LL, col_type)")
+    b.add_argument("-o", "--output", required=True, help="output .csv or .parquet")
+    b.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count, 1 = serial)")
+    b.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per chunk")
+    b.add_argument("--factor-dl", type=float, default=None, help="DL factor for all rows (default: per-row factor_dl)")
+    b.add_argument("--factor-ll", type=float, default=None, help="LL factor for all rows (default: per-row factor_ll)")
+    b.add_argument("--strict", action="store_true", help="exit code 1 if any case fails a check")
+    b.add_argument("-q", "--quiet", action="store_true", help="no progress output")
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "batch":
+        factors = None
+        if args.factor_dl is not None or args.factor_ll is not None:
+            factors = {"DL": args.factor_dl if args.factor_dl is not None else 1.4,
+                       "LL": args.factor_ll if args.factor_ll is not None else 1.7}
+        progress = None
+        if not args.quiet:
+            progress = lambda n, dt: print(f"\r{n:,} cases ({n / max(dt, 1e-9):,.0f}/s)", end="", file=sys.stderr)
+
+        stats = run_batch(args.cases, args.output, factors=factors, chunk_size=args.chunk_size,
+                          max_workers=args.workers, progress=progress)
+        if not args.quiet:
+            print(f"\n{stats['rows']:,} cases in {stats['seconds']:.2f} s -> {args.output} "
+                  f"({stats['failed']:,} failing)", file=sys.stderr)
+        if args.strict and stats["failed"]:
+            return 1
+    return 0
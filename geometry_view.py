@@ -1,8 +1,8 @@
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+import figure_manager
 
 def plot_combined_view(L1, L2, c1, c2, h_slab, lc, M_data=None):
-    fig = plt.figure(figsize=(10, 12))
+    fig = figure_manager.figure(figsize=(10, 12))
     gs = fig.add_gridspec(3, 1, height_ratios=[3, 1, 1.5])
     
     L1_m, L2_m = L1, L2
@@ -53,5 +53,5 @@ def plot_combined_view(L1, L2, c1, c2, h_slab, lc, M_data=None):
     ax2.annotate(f"h={h_slab}cm", xy=(L1_m/2, lc-h_m), xytext=(L1_m/2, lc-h_m*3), arrowprops=dict(arrowstyle='->'), ha='center')
     ax2.axis('off')
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
@@ -0,0 +1,207 @@
+# perf.py
+import functools
+import threading
+import time
+from collections import deque
+
+# ==========================================
+# STAGE TIMING (PER RERUN, RING BUFFER)
+# ==========================================
+# Timers only record inside Recorder.run() on the same thread (one Streamlit rerun).
+# Outside a run every timer is the shared no-op context -> next to no cost when disabled.
+# Usage:
+#   with perf.timer("engine.ddm"): ...
+#   @perf.timed()                       # name = module.function
+#   def render(...): ...
+#   rec = perf.Recorder(); with rec.run("rerun"): ...; rec.last()
+
+DEFAULT_HISTORY = 50
+
+_tls = threading.local() # .run -> {name: [seconds, count]} of the active run
+_active = 0 # threads inside Recorder.run() (0 -> skip the thread-local lookup)
+_active_lock = threading.Lock()
+_owners = {} # thread -> its open run (lets reap() close runs of threads that have ended)
+
+
+class _NullTimer:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULL = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("stats", "name", "t0")
+
+    def __init__(self, stats, name):
+        self.stats, self.name = stats, name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        dt = time.perf_counter() - self.t0
+        entry = self.stats.get(self.name)
+        if entry is None:
+            self.stats[self.name] = [dt, 1]
+        else:
+            entry[0] += dt
+            entry[1] += 1
+        return False
+
+
+def _current():
+    return getattr(_tls, "run", None) if _active else None
+
+
+def enabled():
+    """True while this thread is inside Recorder.run()"""
+    return _current() is not None
+
+
+def timer(name):
+    """Context manager adding the elapsed time to `name` in the active run"""
+    stats = _current()
+    return _NULL if stats is None else _Timer(stats, name)
+
+
+def count(name, n=1):
+    """Count an event without timing it (e.g. memo / cache hits)"""
+    stats = _current()
+    if stats is not None:
+        entry = stats.setdefault(name, [0.0, 0])
+        entry[1] += n
+
+
+def timed(name=None):
+    """Decorator version of timer() (default name: module.qualname)"""
+    def deco(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            stats = _current()
+            if stats is None:
+                return fn(*args, **kwargs)
+            with _Timer(stats, label):
+                return fn(*args, **kwargs)
+        wrapper.__perf_label__ = label
+        return wrapper
+    return deco
+
+
+def reap():
+    """
+    Close (as aborted) every open run whose thread has ended without stop(), e.g. a
+    Streamlit rerun interrupted by st.stop() / a new rerun -> _active drops back to 0
+    """
+    if not _active:
+        return 0
+    with _active_lock:
+        dead = [run for thread, run in _owners.items() if not thread.is_alive()]
+    for run in dead:
+        run._close(aborted=True)
+    return len(dead)
+
+
+def instrument(obj, names, prefix=None):
+    """
+    Replace obj.<name> with timed wrappers, e.g. instrument(st, ("latex", "image"), "st")
+    Idempotent (already wrapped attributes are left alone).
+    """
+    prefix = prefix or getattr(obj, "__name__", type(obj).__name__)
+    for attr in names:
+        fn = getattr(obj, attr, None)
+        if fn is None or hasattr(fn, "__perf_label__"):
+            continue
+        setattr(obj, attr, timed(f"{prefix}.{attr}")(fn))
+
+
+class Recorder:
+    """Per-session ring buffer of the last `maxlen` runs"""
+
+    def __init__(self, maxlen=DEFAULT_HISTORY):
+        self.history = deque(maxlen=maxlen)
+
+    def run(self, label="rerun"):
+        return _Run(self, label)
+
+    def last(self):
+        return self.history[-1] if self.history else None
+
+    def clear(self):
+        self.history.clear()
+
+    def breakdown(self, run=None):
+        """Rows (name, ms, count, share of the run) sorted by time, for one run (default: last)"""
+        run = run or self.last()
+        if not run:
+            return []
+        total = run["total"] or 1e-12
+        rows = [{"name": k, "ms": v[0] * 1e3, "count": v[1], "share": v[0] / total}
+                for k, v in run["stages"].items()]
+        return sorted(rows, key=lambda r: r["ms"], reverse=True)
+
+    def summary(self):
+        """Mean ms / count per name over the whole history"""
+        n = len(self.history)
+        acc = {}
+        for run in self.history:
+            for k, (sec, cnt) in run["stages"].items():
+                a = acc.setdefault(k, [0.0, 0])
+                a[0] += sec
+                a[1] += cnt
+        return {k: {"mean_ms": sec * 1e3 / n, "mean_count": cnt / n} for k, (sec, cnt) in acc.items()}
+
+
+class _Run:
+    """One recorded run: `with rec.run():` or start()/stop() (top-level Streamlit script)"""
+    __slots__ = ("rec", "label", "stats", "t0", "thread")
+
+    def __init__(self, rec, label):
+        self.rec, self.label = rec, label
+        self.stats = None
+        self.thread = None
+
+    def start(self):
+        global _active
+        reap()
+        owner = getattr(_tls, "owner", None)
+        if owner is not None:
+            owner._finish(aborted=True) # previous run on this thread never stopped (st.stop / exception)
+        self.stats = {}
+        self.thread = threading.current_thread()
+        _tls.run, _tls.owner = self.stats, self
+        with _active_lock:
+            _owners[self.thread] = self
+            _active = len(_owners)
+        self.t0 = time.perf_counter()
+        return self
+
+    def stop(self, aborted=False):
+        self._finish(aborted)
+
+    def _finish(self, aborted=False):
+        if getattr(_tls, "owner", None) is self:
+            _tls.run = _tls.owner = None
+        self._close(aborted)
+
+    def _close(self, aborted):
+        """Record the run once (from its own thread or from reap())"""
+        global _active
+        with _active_lock:
+            if _owners.get(self.thread) is not self:
+                return
+            del _owners[self.thread]
+            _active = len(_owners)
+        total = time.perf_counter() - self.t0
+        self.rec.history.append({"label": self.label, "t": time.time(), "total": total,
+                                 "stages": self.stats, "error": aborted})
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self._finish(aborted=exc[0] is not None)
+        return False
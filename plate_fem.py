@@ -0,0 +1,223 @@
+# plate_fem.py
+import numpy as np
+
+# Sparse solver (optional dependency -> clear error only when the FEM is used)
+try:
+    import scipy.sparse as sp
+    import scipy.sparse.linalg as spla
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+# ==========================================
+# PLATE BENDING FEM (KIRCHHOFF, ACM RECTANGLE)
+# ==========================================
+# One bay Lx x Ly with a column at each corner.
+# Element: Adini-Clough-Melosh 12-dof rectangle, dofs per node = (w, dw/dx, dw/dy)
+# Uniform mesh -> every element is the same rectangle, so the element stiffness is
+# K_ref (unit rigidity) scaled by the element D = E h^3 / 12(1-nu^2).
+# Units inside: kg, cm  |  moments returned per unit width (kg-cm/cm = kg-m/m)
+# Sign: w (+) in load direction, m (+) = sagging
+
+GAUSS_3 = (np.array([-np.sqrt(0.6), 0.0, np.sqrt(0.6)]), np.array([5/9, 8/9, 5/9]))
+
+def _acm_terms(x, y):
+    """12-term ACM polynomial and its derivatives at (x, y)"""
+    x = np.asarray(x, dtype=float); y = np.asarray(y, dtype=float)
+    one, zero = np.ones_like(x), np.zeros_like(x)
+    P = np.stack([one, x, y, x*x, x*y, y*y, x**3, x*x*y, x*y*y, y**3, x**3*y, x*y**3], -1)
+    Px = np.stack([zero, one, zero, 2*x, y, zero, 3*x*x, 2*x*y, y*y, zero, 3*x*x*y, y**3], -1)
+    Py = np.stack([zero, zero, one, zero, x, 2*y, zero, x*x, 2*x*y, 3*y*y, x**3, 3*x*y*y], -1)
+    Pxx = np.stack([zero, zero, zero, 2*one, zero, zero, 6*x, 2*y, zero, zero, 6*x*y, zero], -1)
+    Pyy = np.stack([zero, zero, zero, zero, zero, 2*one, zero, zero, 2*x, 6*y, zero, 6*x*y], -1)
+    Pxy = np.stack([zero, zero, zero, zero, one, zero, zero, 2*x, 2*y, zero, 3*x*x, 3*y*y], -1)
+    return P, Px, Py, Pxx, Pyy, Pxy
+
+def acm_reference_element(a, b, nu=0.2):
+    """
+    Element matrices of an a x b rectangle (cm) for unit rigidity D = 1
+    Returns: K_ref (12x12), f_ref (12, load vector for q = 1), B_center (3x12)
+    Node order: (0,0), (a,0), (a,b), (0,b); dofs (w, w_x, w_y) per node
+    """
+    corners = np.array([[0, 0], [a, 0], [a, b], [0, b]], dtype=float)
+    P, Px, Py, *_ = _acm_terms(corners[:, 0], corners[:, 1])
+    C = np.empty((12, 12))
+    C[0::3], C[1::3], C[2::3] = P, Px, Py
+    Cinv = np.linalg.inv(C) # polynomial coeffs = Cinv @ nodal dofs
+
+    Dm = np.array([[1.0, nu, 0.0], [nu, 1.0, 0.0], [0.0, 0.0, (1.0 - nu) / 2.0]])
+    gp, gw = GAUSS_3
+    xg = (gp + 1) * a / 2.0
+    yg = (gp + 1) * b / 2.0
+    X, Y = np.meshgrid(xg, yg, indexing="ij")
+    W = np.outer(gw, gw) * (a / 2.0) * (b / 2.0)
+
+    N, _, _, Nxx, Nyy, Nxy = (t @ Cinv for t in _acm_terms(X.ravel(), Y.ravel()))
+    # Curvature vector kappa = [w_xx, w_yy, 2 w_xy]
+    B = np.stack([Nxx, Nyy, 2 * Nxy], axis=1) # (gauss, 3, 12)
+    K_ref = np.einsum("g,gik,ij,gjl->kl", W.ravel(), B, Dm, B)
+    f_ref = np.einsum("g,gk->k", W.ravel(), N)
+
+    _, _, _, Cxx, Cyy, Cxy = (t @ Cinv for t in _acm_terms(a / 2.0, b / 2.0))
+    B_center = np.stack([Cxx, Cyy, 2 * Cxy])
+    return K_ref, f_ref, Dm @ B_center
+
+def panel_edge_conditions(col_type):
+    """
+    Edge condition per side of the bay: 'cont' (continuous -> symmetry, zero normal slope)
+    or 'free'. Exterior edge of an edge column is x = 0, corner adds y = 0
+    (same convention as the DDM/EFM: edge column -> exterior span in X).
+    """
+    sides = {"x0": "cont", "x1": "cont", "y0": "cont", "y1": "cont"}
+    if col_type in ("edge", "corner"):
+        sides["x0"] = "free"
+    if col_type == "corner":
+        sides["y0"] = "free"
+    return sides
+
+def solve_plate_panel(inputs, w_u, nx=40, ny=None, point_loads=(), openings=None, nu=0.2):
+    """
+    Solve one flat-slab bay by plate FEM
+    inputs: user_inputs keys (Lx, Ly [m], cx, cy, h_slab, fc, has_drop, h_drop, drop_w, drop_l [m],
+            col_type, open_w, open_dist [cm])
+    w_u: uniform factored load (kg/m^2) | point_loads: [(x_m, y_m, P_kg), ...]
+    openings: [(x0, y0, x1, y1) in m]; None -> one open_w x open_w hole at open_dist from
+              the (0,0) column face along X (as in the punching check)
+    Returns: node deflections and element-centre moment fields (mx, my, mxy) in kg-m/m
+    """
+    if not HAS_SCIPY:
+        raise ImportError("plate_fem requires scipy (pip install scipy)")
+
+    Lx = float(inputs.get("Lx", 8.0)) * 100.0
+    Ly = float(inputs.get("Ly", 6.0)) * 100.0
+    cx = float(inputs.get("cx", 40.0)); cy = float(inputs.get("cy", 40.0))
+    h_slab = float(inputs.get("h_slab", 20.0))
+    fc = float(inputs.get("fc", 240))
+    ny = ny or max(int(round(nx * Ly / Lx)), 2)
+    a, b = Lx / nx, Ly / ny
+
+    # --- 1. Mesh ---
+    xn = np.linspace(0.0, Lx, nx + 1)
+    yn = np.linspace(0.0, Ly, ny + 1)
+    ex = (np.arange(nx) + 0.5) * a # element centres
+    ey = (np.arange(ny) + 0.5) * b
+    EX, EY = np.meshgrid(ex, ey) # (ny, nx)
+
+    # Distance from the nearest column centre-line (columns at the 4 corners)
+    dx_col = np.minimum(EX, Lx - EX)
+    dy_col = np.minimum(EY, Ly - EY)
+
+    # Element thickness: slab (+ drop panel around the columns)
+    h_el = np.full(EX.shape, h_slab)
+    if inputs.get("has_drop", False):
+        in_drop = (dx_col <= float(inputs.get("drop_w", 0.0)) * 50.0) & \
+                  (dy_col <= float(inputs.get("drop_l", 0.0)) * 50.0)
+        h_el = np.where(in_drop, h_slab + float(inputs.get("h_drop", 0.0)), h_el)
+
+    # Openings -> element removed (no stiffness, no load)
+    if openings is None:
+        openings = []
+        op_w = float(inputs.get("open_w", 0.0))
+        if op_w > 0:
+            x0 = cx / 2.0 + float(inputs.get("open_dist", 0.0))
+            openings.append((x0 / 100.0, 0.0, (x0 + op_w) / 100.0, op_w / 100.0))
+    solid = np.ones(EX.shape, dtype=bool)
+    for (x0, y0, x1, y1) in openings:
+        solid &= ~((EX >= x0 * 100.0) & (EX <= x1 * 100.0) & (EY >= y0 * 100.0) & (EY <= y1 * 100.0))
+
+    E = 15100 * np.sqrt(fc) # ksc
+    D_el = np.where(solid, E * h_el**3 / (12.0 * (1.0 - nu**2)), 0.0)
+
+    # --- 2. Vectorized element stiffness + sparse assembly ---
+    K_ref, f_ref, DB_center = acm_reference_element(a, b, nu)
+    node = lambda i, j: j * (nx + 1) + i # i along x, j along y
+    I, J = np.meshgrid(np.arange(nx), np.arange(ny)) # (ny, nx)
+    conn = np.stack([node(I, J), node(I + 1, J), node(I + 1, J + 1), node(I, J + 1)], -1).reshape(-1, 4)
+    edofs = (3 * conn[:, :, None] + np.arange(3)).reshape(-1, 12) # (n_el, 12)
+
+    n_dof = 3 * (nx + 1) * (ny + 1)
+    D_flat = D_el.ravel()
+    rows = np.repeat(edofs, 12, axis=1).ravel()
+    cols = np.tile(edofs, (1, 12)).ravel()
+    vals = (D_flat[:, None, None] * K_ref).ravel()
+    K = sp.csc_matrix((vals, (rows, cols)), shape=(n_dof, n_dof)) # duplicates are summed
+
+    q = w_u / 1.0e4 # kg/m^2 -> kg/cm^2
+    F = np.bincount(edofs.ravel(), weights=(solid.ravel()[:, None] * q * f_ref).ravel(), minlength=n_dof)
+    for (px, py, P) in point_loads:
+        i = int(round(px * 100.0 / a)); j = int(round(py * 100.0 / b))
+        F[3 * node(min(max(i, 0), nx), min(max(j, 0), ny))] += P
+
+    # --- 3. Boundary conditions ---
+    NX, NY = np.meshgrid(xn, yn) # node coords (ny+1, nx+1)
+    fixed = np.zeros((ny + 1, nx + 1, 3), dtype=bool)
+    tol = 1e-6
+    on_col = (np.minimum(NX, Lx - NX) <= cx / 2.0 + tol) & (np.minimum(NY, Ly - NY) <= cy / 2.0 + tol)
+    fixed[on_col, 0] = True # column support: w = 0 over the column area
+
+    sides = panel_edge_conditions(inputs.get("col_type", "interior"))
+    if sides["x0"] == "cont": fixed[:, 0, 1] = True
+    if sides["x1"] == "cont": fixed[:, -1, 1] = True
+    if sides["y0"] == "cont": fixed[0, :, 2] = True
+    if sides["y1"] == "cont": fixed[-1, :, 2] = True
+
+    # Nodes that only touch removed elements have no stiffness -> fix them
+    used = np.zeros((ny + 1) * (nx + 1), dtype=bool)
+    used[conn[solid.ravel()].ravel()] = True
+    fixed.reshape(-1, 3)[~used] = True
+
+    free = ~fixed.ravel()
+    K_ff = K[free][:, free]
+    U = np.zeros(n_dof)
+    # K is SPD -> symmetric ordering, no pivoting (several times faster than plain spsolve)
+    lu = spla.splu(K_ff, permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0.0,
+                   options=dict(SymmetricMode=True))
+    U[free] = lu.solve(F[free])
+
+    # --- 4. Moments at element centres: m = -D Dm kappa ---
+    m = -np.einsum("ij,ej->ei", DB_center, U[edofs]) * D_flat[:, None]
+    mx, my, mxy = (m[:, k].reshape(ny, nx) for k in range(3))
+
+    return {
+        "x_nodes": xn / 100.0, "y_nodes": yn / 100.0,
+        "x": ex / 100.0, "y": ey / 100.0, # element centres (m)
+        "w": U[0::3].reshape(ny + 1, nx + 1), # deflection (cm)
+        "mx": mx, "my": my, "mxy": mxy, # kg-m/m
+        "solid": solid, "h": h_el,
+        "Lx": Lx / 100.0, "Ly": Ly / 100.0, "cx": cx, "cy": cy,
+        "n_dof": int(free.sum())
+    }
+
+def plate_strip_moments(res, axis="x"):
+    """
+    Integrate the FEM moment field over column / middle strips (ACI 318: CS half-width
+    = 0.25 min(L1, L2) each side of the column line) -> design moments in kg-m
+    axis 'x': mx across sections at the column face (neg) and midspan (pos)
+    Returns: {"cs_neg", "ms_neg", "cs_pos", "ms_pos", "M_total_neg", "M_total_pos"}
+    """
+    if axis == "x":
+        m, s_along, s_across = res["mx"], res["x"], res["y"]
+        L_span, L_width, c_face = res["Lx"], res["Ly"], res["cx"] / 200.0
+    else:
+        m, s_along, s_across = res["my"].T, res["y"], res["x"]
+        L_span, L_width, c_face = res["Ly"], res["Lx"], res["cy"] / 200.0
+
+    width = s_across[1] - s_across[0] if len(s_across) > 1 else L_width
+    cs_half = 0.25 * min(L_span, L_width)
+    in_cs = np.minimum(s_across, L_width - s_across) <= cs_half
+
+    def section(k):
+        strip = m[:, k] * width # kg-m per element row
+        return strip[in_cs].sum(), strip[~in_cs].sum()
+
+    # Negative: first element column past the column face (both ends, worst)
+    k_l = int(np.searchsorted(s_along, c_face))
+    k_r = int(np.searchsorted(s_along, L_span - c_face)) - 1
+    neg = min((section(k_l), section(k_r)), key=lambda t: t[0] + t[1])
+    pos = section(int(np.argmin(np.abs(s_along - L_span / 2.0))))
+
+    return {
+        "cs_neg": neg[0], "ms_neg": neg[1],
+        "cs_pos": pos[0], "ms_pos": pos[1],
+        "M_total_neg": neg[0] + neg[1], "M_total_pos": pos[0] + pos[1]
+    }
@@ -0,0 +1,307 @@
+# prelim_tables.py
+import argparse
+import bisect
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+import calculations as calc
+
+# ==========================================
+# PRELIMINARY DESIGN TABLES (MINIMUM h_slab, MULTILINEAR LOOKUP)
+# ==========================================
+# "What thickness for this span / load / column?" without running the engine:
+#   python prelim_tables.py build              # offline, writes prelim_tables.npz (ships with the app)
+#   tables = prelim_tables.get_tables()        # None if the file is missing or stale
+#   tables.lookup(Lx=8, Ly=6, LL=300, cx=40, col_type="interior")["h_slab"]
+# Every table node = thinnest h_slab (H_STEP grid) passing punching, one-way shear,
+# deflection and ACI h_min (same checks as solver.solve_min_thickness), found by a
+# column-wise bisection over all nodes at once with FlatSlabBatch.
+# The file stores ENGINE_VERSION + GRID_VERSION -> a table built by another engine is refused.
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prelim_tables.npz")
+GRID_VERSION = 2
+
+# Interpolation axes (square column: cx = cy)
+AXES = {
+    "Lx": (4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 11.0, 12.0),  # m
+    "Ly": (4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 11.0, 12.0),  # m
+    "LL": (150.0, 200.0, 300.0, 400.0, 500.0, 750.0, 1000.0),  # kg/m²
+    "cx": (25.0, 30.0, 40.0, 50.0, 60.0, 80.0),  # cm
+}
+COL_TYPES = ("interior", "edge", "corner")
+DROP_OPTIONS = (False, True)
+
+# Everything else is fixed (app.py defaults); shown next to the estimate in the sidebar
+FIXED = {"fc": 240.0, "fy": 4000.0, "SDL": 150.0, "cover": 2.5, "d_bar": 12, "lc": 3.0}
+FACTORS = {"DL": 1.4, "LL": 1.7}
+H_RANGE = (10.0, 120.0) # cm
+H_STEP = 0.5
+
+# Drop panel of the 'with drop' tables: ACI minimum (L/6 each side of the column, h/4 deep)
+DROP_SIZE = 1.0 / 3.0 # drop_w = Lx/3, drop_l = Ly/3 (engine units)
+DROP_DEPTH = 0.25 # h_drop = h_slab/4
+DROP_TOL = 1e-9 # Lx*(1/3)/2 rounds below Lx/6 at 5, 7, 10 m -> the engine would call it non-structural
+
+CHECKS = ("punching", "oneway", "deflection", "min_thickness")
+_RATIO_FIELDS = ("punch_ratio", "oneway_ratio", "defl_ratio")
+NOT_FOUND = 255 # governing code of nodes that fail even at H_RANGE[1]
+
+
+# ==========================================
+# 1. OFFLINE GENERATOR
+# ==========================================
+def _node_inputs():
+    """Every (col_type, drop, Lx, Ly, LL, cx) node as columns, C-order = table layout"""
+    shape = (len(COL_TYPES), len(DROP_OPTIONS)) + tuple(len(v) for v in AXES.values())
+    idx = np.indices(shape).reshape(len(shape), -1)
+    cols = {
+        "col_type": np.array(COL_TYPES)[idx[0]],
+        "has_drop": np.array(DROP_OPTIONS)[idx[1]],
+    }
+    for i, (k, v) in enumerate(AXES.items()):
+        cols[k] = np.asarray(v)[idx[i + 2]]
+    cols["cy"] = cols["cx"]
+    return shape, cols
+
+
+def _check_ratios(nodes, h):
+    """Ratios (n, len(CHECKS)) of the given nodes at slab thickness h (array)"""
+    n = len(h)
+    drop = nodes["has_drop"]
+    cases = dict(nodes, h_slab=h,
+                 h_drop=np.where(drop, h * DROP_DEPTH, 0.0),
+                 drop_w=np.where(drop, nodes["Lx"] * DROP_SIZE * (1 + DROP_TOL), 0.0),
+                 drop_l=np.where(drop, nodes["Ly"] * DROP_SIZE * (1 + DROP_TOL), 0.0))
+    cases.update({k: np.full(n, v) for k, v in FIXED.items()})
+    res = calc.FlatSlabBatch(cases, factors=FACTORS).run_full_analysis()
+    # The 'with drop' tables claim the ACI structural drop -> never let one silently become a shear cap
+    not_structural = drop & ~res["is_structural_drop"]
+    if not_structural.any():
+        i = int(np.flatnonzero(not_structural)[0])
+        raise RuntimeError(f"{int(not_structural.sum())} 'with drop' node(s) are not a structural drop "
+                           f"(e.g. Lx={nodes['Lx'][i]:g}, Ly={nodes['Ly'][i]:g}, h={h[i]:g})")
+    h_min = calc.check_min_thickness_batch(
+        h, nodes["Lx"], nodes["Ly"], nodes["cx"], nodes["cy"], FIXED["fy"],
+        res["is_structural_drop"], exterior=nodes["col_type"] != "interior")
+    ratios = np.column_stack([np.asarray(res[f], dtype=float) for f in _RATIO_FIELDS] + [h_min["ratio"]])
+    return np.where(np.isnan(ratios), np.inf, ratios)
+
+
+def build_tables(progress=None):
+    """
+    Bisect the thinnest passing h_slab for every node at once (log2(levels) engine passes)
+    Returns: dict of arrays ready for np.savez (see save_tables)
+    """
+    shape, nodes = _node_inputs()
+    levels = np.round(np.arange(H_RANGE[0], H_RANGE[1] + H_STEP / 2, H_STEP), 6)
+    n = len(nodes["Lx"])
+
+    def run(rows, k):
+        sub = {c: v[rows] for c, v in nodes.items()}
+        r = _check_ratios(sub, levels[k])
+        return r, (r <= 1.0).all(axis=1)
+
+    # Bracket: lo = failing level (-1 = below the range), hi = passing level
+    lo = np.full(n, -1)
+    hi = np.full(n, len(levels) - 1)
+    _, top_ok = run(np.arange(n), hi)
+    active = top_ok.copy()
+    step = 0
+    while True:
+        rows = np.flatnonzero(active & (hi - lo > 1))
+        if not len(rows):
+            break
+        mid = (lo[rows] + hi[rows]) // 2
+        _, ok = run(rows, mid)
+        hi[rows[ok]] = mid[ok]
+        lo[rows[~ok]] = mid[~ok]
+        step += 1
+        if progress: progress(step, len(rows))
+
+    ratios, _ = run(np.arange(n), hi)
+    h_min = np.where(top_ok, levels[hi], np.nan).astype(np.float32)
+    governing = np.where(top_ok, ratios.argmax(axis=1), NOT_FOUND).astype(np.uint8)
+
+    meta = {
+        "engine": calc.ENGINE_VERSION, "grid_version": GRID_VERSION,
+        "fixed": FIXED, "factors": FACTORS, "h_range": H_RANGE, "h_step": H_STEP,
+        "drop": {"size": DROP_SIZE, "depth": DROP_DEPTH}, "checks": CHECKS,
+        "col_types": COL_TYPES, "drop_options": DROP_OPTIONS, "axes": list(AXES),
+        "built": time.strftime("%Y-%m-%d"),
+    }
+    out = {"h_min": h_min.reshape(shape), "governing": governing.reshape(shape),
+           "meta": np.array(json.dumps(meta))}
+    out.update({f"axis_{k}": np.asarray(v) for k, v in AXES.items()})
+    return out
+
+
+def save_tables(tables, path=TABLE_PATH):
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(tmp, **tables)
+    os.replace(tmp, path)
+
+
+# ==========================================
+# 2. RUNTIME LOOKUP
+# ==========================================
+class PrelimTables:
+    """Loaded tables + multilinear interpolation (scalar lookup ~15 µs, no numpy in the hot path)"""
+
+    def __init__(self, data):
+        self.meta = json.loads(str(data["meta"]))
+        self.axis_names = list(self.meta["axes"])
+        self.axes = [np.asarray(data[f"axis_{k}"], dtype=float) for k in self.axis_names]
+        self.h_min = np.asarray(data["h_min"], dtype=float)
+        self.governing = np.asarray(data["governing"])
+        self.col_types = list(self.meta["col_types"])
+        self.drop_options = list(self.meta["drop_options"])
+        # Plain Python copies for the scalar path
+        self._axes = [a.tolist() for a in self.axes]
+        self._flat = self.h_min.ravel().tolist()
+        self._gov = self.governing.ravel().tolist()
+        dims = self.h_min.shape
+        self._strides = [int(np.prod(dims[i + 1:])) for i in range(len(dims))]
+
+    @classmethod
+    def load(cls, path=TABLE_PATH, allow_stale=False):
+        with np.load(path) as data:
+            tables = cls({k: data[k] for k in data.files})
+        if not allow_stale and not tables.is_current():
+            raise ValueError(f"{os.path.basename(path)} was built for engine {tables.meta['engine']} "
+                             f"(grid v{tables.meta['grid_version']}); current engine {calc.ENGINE_VERSION} "
+                             f"-> run: python prelim_tables.py build")
+        return tables
+
+    def is_current(self):
+        return self.meta["engine"] == calc.ENGINE_VERSION and self.meta["grid_version"] == GRID_VERSION
+
+    def _cell(self, axis, x):
+        """(lower index, weight of the upper node, clamped?) on one axis"""
+        a = self._axes[axis]
+        if x <= a[0]:
+            return 0, 0.0, x < a[0]
+        if x >= a[-1]:
+            return len(a) - 2, 1.0, x > a[-1]
+        i = bisect.bisect_right(a, x) - 1
+        return i, (x - a[i]) / (a[i + 1] - a[i]), False
+
+    def lookup(self, Lx, Ly, LL, cx, col_type="interior", has_drop=False):
+        """
+        Interpolated minimum h_slab (cm) for one panel
+        Returns: {h_slab, h_rounded (next H_STEP), governing (nearest node), in_range}
+        h_slab is NaN when a surrounding node needs more than H_RANGE[1].
+        """
+        base = (self.col_types.index(col_type) * self._strides[0]
+                + self.drop_options.index(bool(has_drop)) * self._strides[1])
+        cells = [self._cell(i, float(x)) for i, x in enumerate((Lx, Ly, LL, cx))]
+        strides = self._strides[2:]
+
+        h = 0.0
+        for corner in range(1 << len(cells)):
+            w, off = 1.0, base
+            for ax, (i, t, _) in enumerate(cells):
+                if corner >> ax & 1:
+                    w *= t
+                    off += (i + 1) * strides[ax]
+                else:
+                    w *= 1.0 - t
+                    off += i * strides[ax]
+            if w:
+                h += w * self._flat[off]
+        near = base + sum((i + (t >= 0.5)) * s for (i, t, _), s in zip(cells, strides))
+        gov = self._gov[near]
+        step = self.meta["h_step"]
+        return {
+            "h_slab": h,
+            "h_rounded": h if math.isnan(h) else math.ceil(h / step - 1e-9) * step,
+            "governing": CHECKS[gov] if gov != NOT_FOUND else None,
+            "in_range": not any(c[2] for c in cells),
+        }
+
+    def lookup_batch(self, Lx, Ly, LL, cx, col_type="interior", has_drop=False):
+        """Vectorized lookup() (arrays broadcast together) -> array of interpolated h_slab"""
+        ct = np.asarray(calc.col_type_to_code(col_type), dtype=int) # COL_TYPE_CODES order = COL_TYPES
+        drop = np.asarray(has_drop, dtype=bool).astype(int)
+        xs = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float)) for v in (Lx, Ly, LL, cx)), ct, drop)
+        idx, wts = [], []
+        for a, x in zip(self.axes, xs[:4]):
+            x = np.clip(x, a[0], a[-1])
+            i = np.clip(np.searchsorted(a, x, side="right") - 1, 0, len(a) - 2)
+            idx.append(i)
+            wts.append((x - a[i]) / (a[i + 1] - a[i]))
+        h = np.zeros(xs[0].shape)
+        for corner in range(16):
+            w = np.ones(xs[0].shape)
+            sel = [xs[4], xs[5]]
+            for ax in range(4):
+                up = corner >> ax & 1
+                w = w * (wts[ax] if up else 1.0 - wts[ax])
+                sel.append(idx[ax] + up)
+            h += np.where(w > 0, w * self.h_min[tuple(sel)], 0.0)
+        return h
+
+    def assumptions(self):
+        """Short text of what the tables hold fixed (for the UI)"""
+        f, fac = self.meta["fixed"], self.meta["factors"]
+        return (f"f'c {f['fc']:g} ksc, fy {f['fy']:g} ksc, SDL {f['SDL']:g} kg/m², "
+                f"{fac['DL']:g}DL + {fac['LL']:g}LL, no edge beam, square column, "
+                f"drop = L/3 wide x h/4 deep")
+
+
+_tables = None
+
+
+def get_tables(path=TABLE_PATH):
+    """Process-wide tables; None if the file is missing or built by another engine"""
+    global _tables
+    if _tables is None:
+        try:
+            _tables = PrelimTables.load(path)
+        except (OSError, ValueError, KeyError):
+            _tables = False
+    return _tables or None
+
+
+# ==========================================
+# 3. COMMAND LINE
+# ==========================================
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="python prelim_tables.py", description="Preliminary h_slab tables")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="run the engine over the grid and write the .npz")
+    b.add_argument("-o", "--output", default=TABLE_PATH)
+    q = sub.add_parser("query", help="interpolate one panel")
+    q.add_argument("Lx", type=float)
+    q.add_argument("Ly", type=float)
+    q.add_argument("LL", type=float)
+    q.add_argument("cx", type=float)
+    q.add_argument("--col-type", default="interior", choices=COL_TYPES)
+    q.add_argument("--drop", action="store_true")
+    q.add_argument("--path", default=TABLE_PATH)
+    args = p.parse_args(argv)
+
+    if args.cmd == "build":
+        t0 = time.perf_counter()
+        tables = build_tables(progress=lambda i, n: print(f"  bisection step {i}: {n:,} nodes", file=sys.stderr))
+        save_tables(tables, args.output)
+        h = tables["h_min"]
+        print(f"{h.size:,} nodes in {time.perf_counter() - t0:.1f} s -> {args.output} "
+              f"({os.path.getsize(args.output) / 1024:.0f} KB, {np.isnan(h).sum()} nodes above {H_RANGE[1]:g} cm)")
+        return 0
+
+    tables = PrelimTables.load(args.path)
+    t0 = time.perf_counter()
+    res = tables.lookup(args.Lx, args.Ly, args.LL, args.cx, args.col_type, args.drop)
+    dt = (time.perf_counter() - t0) * 1e6
+    print(f"h_slab ≈ {res['h_slab']:.1f} cm (use {res['h_rounded']:g} cm), governing {res['governing']}"
+          f"{'' if res['in_range'] else ' [outside table range, clamped]'} ({dt:.0f} µs)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
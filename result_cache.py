@@ -0,0 +1,212 @@
+# result_cache.py
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import calculations as calc
+import perf
+import sweep
+
+# ==========================================
+# CONTENT-ADDRESSED RESULT CACHE
+# ==========================================
+# Streamlit reruns app.py on every widget change. Display-only widgets (span radio,
+# zone selectbox, ...) do not change user_inputs/factors, so the analysis can be reused.
+# Key = sha256( canonical JSON of the engine inputs + factors + ENGINE_VERSION )
+# Engine inputs = the user_inputs keys the engine reads (sweep.ENGINE_KEYS); UI-only keys
+# (rebar_cfg, display phi, ...) are dropped -> editing them is a hit, not a new store row.
+# Lives at module level -> shared by every rerun/session of the server process.
+# On a miss the last FlatSlabDesign is updated instead of rebuilt, so an edit of one
+# input reruns only the stages that depend on it (FlatSlabDesign.STAGES).
+# Optional second tier: a result_store.ResultStore (SQLite on disk, shared by processes)
+# is read before computing and written after -> restarts / other replicas start warm.
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+def _to_jsonable(obj):
+    """numpy scalars/arrays -> plain Python (for canonical JSON)"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Cannot hash value of type {type(obj).__name__}")
+
+
+def engine_inputs(user_inputs):
+    """The part of user_inputs the engine reads (same keys as a sweep row)"""
+    return {k: user_inputs[k] for k in sweep.ENGINE_KEYS if k in user_inputs}
+
+
+def canonical_key(user_inputs, factors=None, version=None):
+    """Stable hash of the analysis inputs (dict order and UI-only keys do not matter)"""
+    payload = {
+        "inputs": engine_inputs(user_inputs),
+        "factors": factors or {},
+        "engine": version or calc.ENGINE_VERSION,
+    }
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=_to_jsonable)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _fresh_containers(obj):
+    """
+    Copy dict/list/tuple containers, share the leaves.
+    UI code edits result dicts in place (DDM_Tab adds M_vals), so every caller needs
+    its own containers; numpy arrays are frozen (read-only) instead of copied.
+    """
+    if isinstance(obj, dict):
+        return {k: _fresh_containers(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_fresh_containers(v) for v in obj]
+    if isinstance(obj, tuple):
+        return tuple(_fresh_containers(v) for v in obj)
+    return obj
+
+
+def _freeze_arrays(obj):
+    if isinstance(obj, np.ndarray):
+        obj.flags.writeable = False
+    elif isinstance(obj, dict):
+        for v in obj.values(): _freeze_arrays(v)
+    elif isinstance(obj, (list, tuple)):
+        for v in obj: _freeze_arrays(v)
+
+
+class ResultCache:
+    """Thread-safe LRU cache of run_full_analysis() / analyze() results"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, store=None):
+        self.max_entries = max_entries
+        self.store = store # result_store.ResultStore or None (memory only)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._model = None # last model (stage memo) -> reused by the next miss
+        self._model_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key) # most recently used
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False) # evict least recently used
+
+    def _count(self, name):
+        with self._lock: # session threads share the cache -> no lost increments
+            setattr(self, name, getattr(self, name) + 1)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+        with self._model_lock:
+            self._model = None
+
+    def _run_model(self, user_inputs, factors):
+        """
+        Miss: run the shared incremental model
+        Returns: {"results": run_full_analysis(), "inputs", "factors"} (what analyze() wraps)
+        """
+        # FlatSlabDesign writes phi/code_ref into factors -> give it its own copy
+        factors = dict(factors) if factors else None
+        with self._model_lock:
+            if self._model is None or factors is None:
+                self._model = calc.FlatSlabDesign(dict(user_inputs), factors=factors)
+            else:
+                self._model.update(user_inputs, factors=factors, replace=True)
+            model = self._model
+            return {"results": model.run_full_analysis(),
+                    "inputs": dict(model.inputs), "factors": dict(model.factors)}
+
+    def _compute(self, key, user_inputs, factors):
+        """Disk store first, then the engine (the new payload is written back to the store)"""
+        if self.store is not None:
+            payload = self.store.get_object("analysis", key)
+            if payload is not None:
+                perf.count("engine.result_store_hit")
+                return payload
+        payload = self._run_model(user_inputs, factors)
+        if self.store is not None:
+            with perf.timer("engine.result_store_write"):
+                self.store.put_object("analysis", key, payload)
+        return payload
+
+    def stats(self):
+        with self._lock:
+            out = {"entries": len(self._data), "max_entries": self.max_entries,
+                   "hits": self.hits, "misses": self.misses}
+        if self.store is not None:
+            out["store"] = self.store.stats()
+        return out
+
+    def run_full_analysis(self, user_inputs, factors=None):
+        """
+        Cached FlatSlabDesign(user_inputs, factors).run_full_analysis()
+        Every call gets its own dict tree (see _fresh_containers).
+        """
+        user_inputs = engine_inputs(user_inputs) # the model never sees UI-only keys
+        key = canonical_key(user_inputs, factors)
+        result = self.get(key)
+        if result is None:
+            self._count("misses")
+            result = self._compute(key, user_inputs, factors)["results"]
+            _freeze_arrays(result)
+            self.put(key, result)
+        else:
+            self._count("hits")
+            perf.count("engine.result_cache_hit")
+        return _fresh_containers(result)
+
+    def analyze(self, user_inputs, factors=None):
+        """
+        Cached FlatSlabDesign(user_inputs, factors).analyze()
+        AnalysisResult is immutable -> every caller shares the same object (no copies),
+        including the lazy details it has already built.
+        """
+        user_inputs = engine_inputs(user_inputs) # shared result must not carry one session's UI keys
+        key = canonical_key(user_inputs, factors)
+        result = self.get("analysis:" + key)
+        if result is None:
+            self._count("misses")
+            payload = self._compute(key, user_inputs, factors)
+            result = calc.AnalysisResult(payload["results"], payload["inputs"], payload["factors"])
+            self.put("analysis:" + key, result)
+        else:
+            self._count("hits")
+            perf.count("engine.result_cache_hit")
+        return result
+
+
+# Process-wide cache used by app.py
+_default_cache = ResultCache()
+
+
+def get_default_cache():
+    return _default_cache
+
+
+def cached_full_analysis(user_inputs, factors=None):
+    """Drop-in replacement for FlatSlabDesign(user_inputs, factors).run_full_analysis()"""
+    return _default_cache.run_full_analysis(user_inputs, factors)
+
+
+def cached_analysis(user_inputs, factors=None):
+    """Drop-in replacement for FlatSlabDesign(user_inputs, factors).analyze()"""
+    return _default_cache.analyze(user_inputs, factors)
@@ -0,0 +1,258 @@
+# result_store.py
+import argparse
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+
+import calculations as calc
+
+# ==========================================
+# PERSISTENT RESULT STORE (SQLITE, WAL, SHARED BY PROCESSES)
+# ==========================================
+# Second tier behind the in-process caches (result_cache / figure_cache): those die with
+# the server process, this one survives restarts and is shared by every replica that
+# points at the same file -> a new process starts warm on the typical panels.
+#   store = ResultStore("~/.cache/flatslab/store.sqlite3", max_bytes=512 * 2**20)
+#   store.put("analysis", key, data); store.get("analysis", key)
+# Row key = kind : ENGINE_VERSION : caller key -> a new engine never reads old numbers.
+# Figure keys also carry figure_cache.render_version() -> new drawing code, new rows.
+# WAL = many readers + one writer across processes; writes wait up to BUSY_TIMEOUT.
+# Needs a local filesystem (SQLite locking is unreliable on NFS/SMB shares).
+# The store is best effort: any sqlite error counts as a miss and the app recomputes.
+# TRUST: get_object() unpickles what it reads -> anyone who can write the file can run
+# code in every process that opens it. Keep it in a directory only the app's user(s) can
+# write; never point FLATSLAB_STORE at a file from an untrusted source.
+#
+# Environment (app.py -> get_default_store):
+#   FLATSLAB_STORE     = path of the database file ("off" disables, default DEFAULT_PATH; trusted, see above)
+#   FLATSLAB_STORE_MB  = size bound in MB (default 512)
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "flatslab", "store.sqlite3")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+BUSY_TIMEOUT = 5.0 # seconds a writer waits for another process's lock
+TOUCH_INTERVAL = 60.0 # refresh 'accessed' at most once a minute per row (saves writes)
+EVICT_EVERY = 32 # check the size bound every N puts
+EVICT_TARGET = 0.9 # evict down to 90 % of max_bytes (hysteresis)
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS entries (
+        key      TEXT PRIMARY KEY,
+        kind     TEXT NOT NULL,
+        engine   TEXT NOT NULL,
+        data     BLOB NOT NULL,
+        size     INTEGER NOT NULL,
+        created  REAL NOT NULL,
+        accessed REAL NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)",
+)
+
+
+class ResultStore:
+    """Size-bounded key -> bytes store in one SQLite file (thread- and process-safe)"""
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES, engine=None):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.max_bytes = max_bytes
+        self.engine = engine or calc.ENGINE_VERSION
+        self._local = threading.local() # one connection per thread (and per process)
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = self.misses = self.writes = self.evicted = self.errors = 0
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._conn() as con:
+            for sql in _SCHEMA:
+                con.execute(sql)
+
+    # --- Connections ---
+    def _conn(self):
+        con = getattr(self._local, "con", None)
+        if con is None or self._local.pid != os.getpid(): # never reuse a connection across fork()
+            con = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL") # WAL + NORMAL: durable enough for a cache
+            self._local.con, self._local.pid = con, os.getpid()
+        return con
+
+    def _row_key(self, kind, key):
+        return f"{kind}:{self.engine}:{key}"
+
+    def _count(self, name, n=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    # --- Bytes API ---
+    def get(self, kind, key):
+        """Stored bytes or None"""
+        row_key = self._row_key(kind, key)
+        try:
+            con = self._conn()
+            row = con.execute("SELECT data, accessed FROM entries WHERE key = ?", (row_key,)).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+            now = time.time()
+            if now - row[1] > TOUCH_INTERVAL: # LRU bookkeeping without a write per hit
+                con.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, row_key))
+        except sqlite3.Error:
+            self._count("errors")
+            return None
+        self._count("hits")
+        return bytes(row[0])
+
+    def put(self, kind, key, data):
+        """Insert / replace bytes; returns False if the write failed"""
+        now = time.time()
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO entries (key, kind, engine, data, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._row_key(kind, key), kind, self.engine, sqlite3.Binary(data), len(data), now, now))
+        except sqlite3.Error:
+            self._count("errors")
+            return False
+        with self._lock:
+            self.writes += 1
+            self._puts += 1
+            due = self._puts >= EVICT_EVERY
+            if due:
+                self._puts = 0
+        if due:
+            self.evict()
+        return True
+
+    # --- Objects API (pickle) ---
+    def get_object(self, kind, key):
+        """Unpickled object or None (the file must be trusted, see TRUST above)"""
+        data = self.get(kind, key)
+        if data is None:
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception: # written by an incompatible numpy/python -> treat as a miss
+            self._count("errors")
+            return None
+
+    def put_object(self, kind, key, obj):
+        return self.put(kind, key, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+    # --- Maintenance ---
+    def total_bytes(self):
+        return self._conn().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self, max_bytes=None):
+        """Delete least recently accessed rows until the file holds <= EVICT_TARGET * max_bytes"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        try:
+            con = self._conn()
+            con.execute("BEGIN IMMEDIATE") # one evicting process at a time
+            try:
+                excess = con.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0] - limit
+                removed = 0
+                if excess > 0:
+                    excess += limit * (1.0 - EVICT_TARGET)
+                    freed = 0
+                    victims = []
+                    for key, size in con.execute("SELECT key, size FROM entries ORDER BY accessed"):
+                        victims.append((key,))
+                        freed += size
+                        if freed >= excess:
+                            break
+                    con.executemany("DELETE FROM entries WHERE key = ?", victims)
+                    removed = len(victims)
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            self._count("errors")
+            return 0
+        self._count("evicted", removed)
+        return removed
+
+    def purge_other_engines(self):
+        """Drop rows written by other ENGINE_VERSIONs (they can never be read again)"""
+        cur = self._conn().execute("DELETE FROM entries WHERE engine != ?", (self.engine,))
+        return cur.rowcount
+
+    def clear(self):
+        self._conn().execute("DELETE FROM entries")
+        with self._lock:
+            self.hits = self.misses = self.writes = self.evicted = self.errors = 0
+
+    def vacuum(self):
+        """Give the space of deleted rows back to the filesystem"""
+        self._conn().execute("VACUUM")
+
+    def stats(self):
+        try:
+            rows = self._conn().execute(
+                "SELECT kind, COUNT(*), COALESCE(SUM(size), 0) FROM entries GROUP BY kind").fetchall()
+        except sqlite3.Error:
+            rows = []
+        with self._lock:
+            counters = {"hits": self.hits, "misses": self.misses, "writes": self.writes,
+                        "evicted": self.evicted, "errors": self.errors}
+        return dict(counters, path=self.path, engine=self.engine, max_bytes=self.max_bytes,
+                    entries=sum(r[1] for r in rows), bytes=sum(r[2] for r in rows),
+                    kinds={r[0]: {"entries": r[1], "bytes": r[2]} for r in rows})
+
+
+# ==========================================
+# PROCESS-WIDE DEFAULT (CONFIGURED FROM THE ENVIRONMENT)
+# ==========================================
+_default_store = None
+_default_lock = threading.Lock()
+_DISABLED = ("", "0", "off", "none", "false")
+
+
+def get_default_store():
+    """The process-wide ResultStore, or None if disabled / the file cannot be opened"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            path = os.environ.get("FLATSLAB_STORE", DEFAULT_PATH)
+            if path.strip().lower() in _DISABLED:
+                _default_store = False
+            else:
+                try:
+                    max_mb = float(os.environ.get("FLATSLAB_STORE_MB", DEFAULT_MAX_BYTES / 2**20))
+                    _default_store = ResultStore(path, max_bytes=int(max_mb * 2**20))
+                except (ValueError, OSError, sqlite3.Error) as e: # e.g. FLATSLAB_STORE_MB=abc
+                    print(f"result_store disabled: {e}", file=sys.stderr)
+                    _default_store = False
+        return _default_store or None
+
+
+# ==========================================
+# COMMAND LINE (python result_store.py stats | evict | purge | clear)
+# ==========================================
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="python result_store.py", description="Persistent result store maintenance")
+    p.add_argument("action", choices=("stats", "evict", "purge", "clear"))
+    p.add_argument("--path", default=os.environ.get("FLATSLAB_STORE", DEFAULT_PATH))
+    p.add_argument("--max-mb", type=float, help="size bound for evict (default: FLATSLAB_STORE_MB or 512)")
+    args = p.parse_args(argv)
+
+    max_mb = args.max_mb or float(os.environ.get("FLATSLAB_STORE_MB", DEFAULT_MAX_BYTES / 2**20))
+    store = ResultStore(args.path, max_bytes=int(max_mb * 2**20))
+    if args.action == "evict":
+        print(f"evicted {store.evict()} rows")
+    elif args.action == "purge":
+        print(f"removed {store.purge_other_engines()} rows of other engine versions")
+    elif args.action == "clear":
+        store.clear()
+    if args.action != "stats":
+        store.vacuum()
+    s = store.stats()
+    print(f"{s['path']} (engine {s['engine']}): {s['entries']} entries, "
+          f"{s['bytes'] / 2**20:.1f} / {s['max_bytes'] / 2**20:.0f} MB")
+    for kind, k in sorted(s["kinds"].items()):
+        print(f"  {kind:<10} {k['entries']:>7} entries  {k['bytes'] / 2**20:>8.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+# solver.py
+import math
+
+import calculations as calc
+
+# ==========================================
+# MINIMUM THICKNESS SOLVER (BRACKET + BISECT)
+# ==========================================
+# Replaces the manual "nudge h_slab -> rerun" loop.
+# Example:
+#   res = solve_min_thickness(user_inputs, factors)
+#   res["h_slab"], res["governing"], res["evaluations"]
+
+CHECK_NAMES = ("punching", "oneway", "deflection", "min_thickness")
+
+
+def _panel_type(inputs):
+    """Panel position for the ACI h_min rule (from column type / edge beam)"""
+    if inputs.get("col_type", "interior") == "interior":
+        return "interior"
+    return "exterior_beam" if inputs.get("has_edge_beam", False) else "exterior"
+
+
+def evaluate_checks(inputs, factors=None, model=None):
+    """
+    Run the thickness-dependent stages of FlatSlabDesign (no DDM flexure design)
+    and collect every check as a ratio (ratio <= 1.0 -> PASS)
+    model: FlatSlabDesign to reuse -> only stages that read a changed input rerun
+    Returns: {check_name: ratio} in CHECK_NAMES order
+    """
+    if model is None:
+        model = calc.FlatSlabDesign(inputs, factors=dict(factors) if factors else None)
+    else:
+        model.update(inputs, replace=True)
+    res = model.evaluate("shear_punching", "shear_oneway", "deflection")
+
+    defl = res["deflection"]
+    h_min = calc.check_min_thickness(
+        model.h_slab, model.Lx, model.Ly, model.cx, model.cy, model.fy,
+        model.is_structural_drop, _panel_type(inputs)
+    )
+    ratios = (res["shear_punching"]["ratio"], res["shear_oneway"]["ratio"],
+              defl["Delta_Total"] / defl["Limit_240"], h_min["ratio"])
+    return {name: float(r) for name, r in zip(CHECK_NAMES, ratios)}
+
+
+def _bisect_grid(passes, lo, hi, step):
+    """
+    Smallest value on the grid lo + k*step (<= hi) for which passes() is True
+    Bracket first (grow the step from lo), then bisect the bracket.
+    Returns None if even hi fails.
+    """
+    n_max = int(math.floor((hi - lo) / step + 1e-9))
+    val = lambda k: round(lo + k * step, 6)
+
+    if passes(val(0)):
+        return val(0)
+
+    # 1. Bracket: k_fail < answer <= k_pass (doubling jumps)
+    k_fail, jump = 0, 1
+    while True:
+        k_try = min(k_fail + jump, n_max)
+        if passes(val(k_try)):
+            k_pass = k_try
+            break
+        if k_try == n_max:
+            return None
+        k_fail, jump = k_try, jump * 2
+
+    # 2. Bisect
+    while k_pass - k_fail > 1:
+        k_mid = (k_fail + k_pass) // 2
+        if passes(val(k_mid)):
+            k_pass = k_mid
+        else:
+            k_fail = k_mid
+    return val(k_pass)
+
+
+def solve_min_thickness(inputs, factors=None, h_range=(10.0, 80.0), step=0.5,
+                        solve_drop=False, drop_range=(0.0, 40.0)):
+    """
+    Find the thinnest slab (on a `step` cm grid) that passes every check:
+    punching ratio, one-way shear ratio, long-term deflection and ACI h_min.
+    solve_drop: also search the thinnest drop projection h_drop for the final
+                h_slab (only when inputs['has_drop'] is True); assumes checks do not
+                get worse with a deeper drop (see below)
+    Returns: dict with h_slab, h_drop, status, governing check, ratios and evaluation count
+    """
+    base = dict(inputs)
+    solve_drop = solve_drop and base.get("has_drop", False)
+    cache = {}
+    # One model for every trial: an h_drop step keeps loads / one-way shear / deflection
+    model = calc.FlatSlabDesign(dict(base), factors=dict(factors) if factors else None)
+
+    def run(h, hd):
+        key = (h, hd)
+        if key not in cache:
+            trial = dict(base, h_slab=h)
+            if hd is not None:
+                trial["h_drop"] = hd
+            cache[key] = evaluate_checks(trial, factors, model=model)
+        return cache[key]
+
+    def ok(r): return all(v <= 1.0 for v in r.values())
+
+    def best_drop(h):
+        """Thinnest passing drop for slab h (None if none in drop_range)"""
+        return _bisect_grid(lambda hd: ok(run(h, hd)), drop_range[0], drop_range[1], step)
+
+    if solve_drop:
+        # ASSUMPTION (not guaranteed): a deeper drop does not hurt -> slab h is feasible if the
+        # deepest drop passes. Depth can flip is_structural_drop (h_drop >= h/4), which changes
+        # EFM stiffness, Munbal and ACI h_min; no counterexample found in spot checks, but a
+        # non-monotonic case would make the bisection miss a thinner h_slab.
+        feasible = lambda h: ok(run(h, float(drop_range[1])))
+    else:
+        feasible = lambda h: ok(run(h, None))
+
+    h_sol = _bisect_grid(feasible, h_range[0], h_range[1], step)
+
+    if h_sol is None:
+        # Report the best we could do (top of range)
+        h_sol = float(h_range[1])
+        hd_sol = float(drop_range[1]) if solve_drop else None
+        status = "NOT FOUND"
+    else:
+        hd_sol = best_drop(h_sol) if solve_drop else None
+        status = "OK"
+
+    ratios = run(h_sol, hd_sol)
+    governing = max(ratios, key=ratios.get)
+    return {
+        "h_slab": h_sol,
+        "h_drop": hd_sol if solve_drop else base.get("h_drop", 0.0),
+        "status": status,
+        "governing": governing,
+        "ratios": ratios,
+        "evaluations": len(cache),
+    }
@@ -0,0 +1,168 @@
+# sweep.py
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import calculations as calc
+
+# ==========================================
+# PARAMETRIC SWEEP ENGINE
+# ==========================================
+# Grid of design variables -> chunks -> worker processes (FlatSlabBatch) -> one table
+# Example:
+#   grid = {"h_slab": [18, 20, 25], "Lx": np.arange(5, 10.5, 0.5), "LL": [300, 500]}
+#   df = run_sweep(grid, base_inputs=user_inputs, max_workers=4, progress=print)
+
+# Only these input keys are carried into the engine (rebar_cfg etc. are UI-only)
+ENGINE_KEYS = tuple(calc.FlatSlabBatch.DEFAULTS) + calc.FlatSlabBatch.REQUIRED
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def _grid_axes(grid):
+    unknown = [k for k in grid if k not in ENGINE_KEYS]
+    if unknown:
+        raise KeyError(f"Unknown sweep parameter(s): {unknown}")
+    return list(grid), [np.atleast_1d(grid[k]) for k in grid]
+
+
+def grid_size(grid):
+    """Number of cases in the full factorial grid"""
+    return int(np.prod([len(np.atleast_1d(v)) for v in grid.values()])) if grid else 1
+
+
+def grid_rows(grid, base_inputs=None, start=0, stop=None):
+    """
+    Rows [start, stop) of the full factorial expansion, built without the rest of the grid
+    (flat row index -> one index per key, C-order: last key varies fastest)
+    Returns: dict of columns (numpy arrays), length = stop - start
+    """
+    base_inputs = base_inputs or {}
+    keys, values = _grid_axes(grid)
+    total = grid_size(grid)
+    stop = total if stop is None else min(stop, total)
+    n = max(stop - start, 0)
+
+    cases = {}
+    if keys:
+        idx = np.unravel_index(np.arange(start, stop), [len(v) for v in values])
+        for k, v, i in zip(keys, values, idx):
+            cases[k] = v[i]
+
+    for k in ENGINE_KEYS:
+        if k not in cases and k in base_inputs:
+            cases[k] = np.full(n, base_inputs[k])
+
+    missing = [k for k in calc.FlatSlabBatch.REQUIRED if k not in cases]
+    if missing:
+        raise KeyError(f"Sweep needs {missing} in the grid or base_inputs")
+    return cases
+
+
+def expand_grid(grid, base_inputs=None):
+    """
+    Full factorial expansion of a parameter grid
+    grid: {key: list of values} -> every combination becomes one case
+    base_inputs: fixed values for every key not in the grid (e.g. app.py user_inputs)
+    Returns: dict of columns (numpy arrays), length = product of the grid sizes
+    """
+    return grid_rows(grid, base_inputs)
+
+
+def split_chunks(cases, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Split a dict of columns into consecutive row chunks"""
+    n = len(next(iter(cases.values())))
+    for start in range(0, n, chunk_size):
+        yield start, {k: v[start:start + chunk_size] for k, v in cases.items()}
+
+
+def _run_chunk(chunk, factors, keep_cols):
+    """Worker: run one chunk through the batch pipeline (top-level so it can be pickled)"""
+    res = calc.FlatSlabBatch(chunk, factors=factors).run_full_analysis()
+
+    # Prepend the swept variables so every row carries its own coordinates
+    fields = [(k, chunk[k].dtype) for k in keep_cols] + [(k, res.dtype[k]) for k in res.dtype.names]
+    table = np.zeros(len(res), dtype=fields)
+    for k in keep_cols:
+        table[k] = chunk[k]
+    for k in res.dtype.names:
+        table[k] = res[k]
+    return table
+
+
+def run_sweep(grid, base_inputs=None, factors=None, chunk_size=DEFAULT_CHUNK_SIZE,
+              max_workers=None, progress=None, as_frame=True):
+    """
+    Run a parametric study over every combination in grid
+    factors: {'DL', 'LL'} applied to all cases (None -> factor_dl/factor_ll per case)
+    max_workers: number of processes (None -> os.cpu_count(), 1 -> run in this process)
+    progress: optional callback(done_cases, total_cases), called after every chunk
+    Returns: pandas DataFrame (as_frame=True) or numpy structured array, in grid order
+    """
+    cases = expand_grid(grid, base_inputs)
+    keep_cols = list(grid)
+    total = len(next(iter(cases.values())))
+    chunks = list(split_chunks(cases, max(int(chunk_size), 1)))
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(int(max_workers), len(chunks)))
+
+    parts = {}
+    done = 0
+    if max_workers == 1:
+        # Serial path: no process start-up cost for small studies
+        for start, chunk in chunks:
+            parts[start] = _run_chunk(chunk, factors, keep_cols)
+            done += len(parts[start])
+            if progress: progress(done, total)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_run_chunk, chunk, factors, keep_cols): start for start, chunk in chunks}
+            for fut in as_completed(futures):
+                start = futures[fut]
+                parts[start] = fut.result()
+                done += len(parts[start])
+                if progress: progress(done, total)
+
+    table = np.concatenate([parts[s] for s in sorted(parts)])
+    if as_frame:
+        import pandas as pd
+        return pd.DataFrame({k: table[k] for k in table.dtype.names})
+    return table
+
+
+def pass_fail_map(table, x, y, value="punch_ratio", limit=1.0):
+    """
+    Pivot a sweep result into a 2D pass/fail map (max of `value` over the other variables)
+    Returns: (x_values, y_values, worst_value[y, x], passes[y, x])
+    Cells with no rows (x, y combination not in the table) are NaN and do not pass.
+    """
+    xs = np.unique(np.asarray(table[x]))
+    ys = np.unique(np.asarray(table[y]))
+    xi = np.searchsorted(xs, np.asarray(table[x]))
+    yi = np.searchsorted(ys, np.asarray(table[y]))
+    worst = np.full((len(ys), len(xs)), -np.inf)
+    np.maximum.at(worst, (yi, xi), np.asarray(table[value], dtype=float))
+    seen = np.zeros(worst.shape, dtype=bool)
+    seen[yi, xi] = True
+    worst[~seen] = np.nan
+    return xs, ys, worst, seen & (worst <= limit)
+
+
+if __name__ == "__main__":
+    # Quick demo: 10,000-point study
+    import time
+    demo_grid = {
+        "h_slab": np.arange(15.0, 35.0, 2.0),
+        "Lx": np.linspace(4.0, 10.0, 10),
+        "LL": [200.0, 300.0, 400.0, 500.0, 800.0],
+        "fc": [240.0, 280.0, 320.0, 400.0],
+        "cx": [30.0, 40.0, 50.0, 60.0, 80.0],
+    }
+    base = {"SDL": 150.0, "col_type": "interior", "Ly": 6.0, "cy": 40.0}
+    t0 = time.perf_counter()
+    df = run_sweep(demo_grid, base, progress=lambda d, n: print(f"\r{d:,}/{n:,}", end=""))
+    print(f"\n{len(df):,} cases in {time.perf_counter() - t0:.2f} s")
+    print(df[["h_slab", "Lx", "punch_ratio", "oneway_ratio", "defl_ratio"]].describe())
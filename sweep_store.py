@@ -0,0 +1,265 @@
+# sweep_store.py
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import calculations as calc
+import sweep
+
+# ==========================================
+# MEMORY-MAPPED SWEEP RESULTS (RESUMABLE)
+# ==========================================
+# Tens of millions of grid points do not fit in a DataFrame -> one .npy file per output
+# field, memory-mapped; a chunk's rows always land at the same offset (grid order).
+#   store = run_sweep_store(grid, "runs/big", base_inputs=user_inputs, max_workers=8)
+#   ...kill it, run the same call again -> only the missing chunks are computed
+#   punch = SweepStore("runs/big").grid_view("punch_ratio")   # zero-copy, shape = grid
+# Directory layout:
+#   manifest.json   grid / base inputs / factors / fields / chunk size / ENGINE_VERSION
+#   completed.log   append-only: one chunk number per line, written after its data is flushed
+#   <field>.npy     np.lib.format memmap, length = grid size (sparse until written)
+# A chunk missing from completed.log is recomputed on resume and simply overwrites its rows.
+
+MANIFEST = "manifest.json"
+COMPLETED = "completed.log"
+FORMAT_VERSION = 1
+
+# Ratios + deflection + steel area of every DDM zone (strings / spacings are derivable)
+DEFAULT_FIELDS = (
+    ("punch_ratio", "punch_Vu", "oneway_ratio", "defl_total", "defl_ratio", "ddm_fail_zones")
+    + tuple(f"ddm_{ax}_{zone}_As" for ax in ("x", "y") for zone in calc.FlatSlabBatch.DDM_ZONES)
+)
+
+
+def _to_jsonable(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Cannot store value of type {type(obj).__name__} in the manifest")
+
+
+def _plain(obj):
+    """Round-trip through JSON -> the same form a reloaded manifest has"""
+    return json.loads(json.dumps(obj, default=_to_jsonable))
+
+
+def _run_store_chunk(grid, base_inputs, factors, start, stop, fields):
+    """Worker: build rows [start, stop) of the grid and keep only the stored fields"""
+    res = calc.FlatSlabBatch(sweep.grid_rows(grid, base_inputs, start, stop), factors=factors).run_full_analysis()
+    return {k: res[k] for k in fields}
+
+
+class SweepStore:
+    """Read (and fill) one sweep directory; every field is an np.memmap in grid order"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        m = self.manifest
+        self.keys = list(m["grid"])
+        self.axes = {k: np.asarray(v) for k, v in m["grid"].items()}
+        self.shape = tuple(len(v) for v in self.axes.values())
+        self.n_rows = m["n_rows"]
+        self.chunk_size = m["chunk_size"]
+        self.n_chunks = -(-self.n_rows // self.chunk_size)
+        self.fields = list(m["fields"])
+        self._maps = {}
+
+    # --- Creating / writing ---
+    @classmethod
+    def create(cls, path, grid, base_inputs=None, factors=None, fields=DEFAULT_FIELDS,
+               chunk_size=sweep.DEFAULT_CHUNK_SIZE):
+        """
+        New sweep directory (fields = names of FlatSlabBatch outputs, or "all" for every
+        numeric one). Dtypes come from a one-row probe run.
+        """
+        probe = calc.FlatSlabBatch(sweep.grid_rows(grid, base_inputs, 0, 1), factors=factors).run_full_analysis()
+        if fields == "all":
+            fields = [k for k in probe.dtype.names if probe.dtype[k].kind in "biuf"]
+        unknown = [k for k in fields if k not in probe.dtype.names]
+        if unknown:
+            raise KeyError(f"Unknown result field(s): {unknown}")
+        text = [k for k in fields if probe.dtype[k].kind not in "biuf"]
+        if text:
+            raise TypeError(f"Only numeric fields can be memory-mapped: {text}")
+
+        n_rows = sweep.grid_size(grid)
+        os.makedirs(path, exist_ok=True)
+        for k in fields:
+            np.lib.format.open_memmap(os.path.join(path, f"{k}.npy"), mode="w+",
+                                      dtype=probe.dtype[k], shape=(n_rows,))
+        open(os.path.join(path, COMPLETED), "w").close()
+        manifest = cls.signature(grid, base_inputs, factors, fields, chunk_size)
+        manifest["n_rows"] = n_rows
+        tmp = os.path.join(path, MANIFEST + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, os.path.join(path, MANIFEST)) # manifest appears last = directory is valid
+        return cls(path)
+
+    @staticmethod
+    def signature(grid, base_inputs, factors, fields, chunk_size):
+        """Everything that must match for a resume to be valid"""
+        base = {k: v for k, v in (base_inputs or {}).items() if k in sweep.ENGINE_KEYS and k not in grid}
+        return _plain({
+            "format": FORMAT_VERSION, "engine": calc.ENGINE_VERSION,
+            "grid": {k: np.atleast_1d(v) for k, v in grid.items()},
+            "base_inputs": base, "factors": factors, "fields": list(fields), "chunk_size": int(chunk_size),
+        })
+
+    def matches(self, grid, base_inputs, factors, fields, chunk_size):
+        sig = self.signature(grid, base_inputs, factors, fields, chunk_size)
+        return all(self.manifest.get(k) == v for k, v in sig.items())
+
+    def chunk_rows(self, chunk):
+        start = chunk * self.chunk_size
+        return start, min(start + self.chunk_size, self.n_rows)
+
+    def _map(self, field, mode="r"):
+        key = (field, mode)
+        if key not in self._maps:
+            self._maps[key] = np.load(os.path.join(self.path, f"{field}.npy"), mmap_mode=mode)
+        return self._maps[key]
+
+    def repair_log(self):
+        """Cut a torn last line (killed mid-write) before new entries are appended"""
+        log = os.path.join(self.path, COMPLETED)
+        with open(log, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def write_chunk(self, chunk, values):
+        """Store one chunk's fields, flush, then mark it completed (crash-safe order)"""
+        start, stop = self.chunk_rows(chunk)
+        for k in self.fields:
+            mm = self._map(k, "r+")
+            mm[start:stop] = values[k]
+            mm.flush()
+        with open(os.path.join(self.path, COMPLETED), "a", encoding="utf-8") as f:
+            f.write(f"{chunk}\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    # --- Progress ---
+    def completed(self):
+        """Set of finished chunk numbers (a torn last line from a crash is ignored)"""
+        done = set()
+        with open(os.path.join(self.path, COMPLETED), encoding="utf-8") as f:
+            for line in f:
+                if line.endswith("\n") and line.strip().isdigit():
+                    done.add(int(line))
+        return done
+
+    def pending(self):
+        done = self.completed()
+        return [c for c in range(self.n_chunks) if c not in done]
+
+    def is_complete(self):
+        return len(self.completed()) == self.n_chunks
+
+    def done_mask(self):
+        """Boolean per row: True where the result has been computed"""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for c in self.completed():
+            start, stop = self.chunk_rows(c)
+            mask[start:stop] = True
+        return mask
+
+    # --- Reading (zero-copy) ---
+    def field(self, name):
+        """Read-only memmap of one output field, grid order (rows of unfinished chunks are 0)"""
+        return self._map(name)
+
+    def grid_view(self, name):
+        """Field reshaped to the grid: axis i = values of grid key i (still a memmap)"""
+        return self.field(name).reshape(self.shape)
+
+    def coords(self, key, rows=slice(None)):
+        """Values of one swept variable for the given rows (computed from the row index)"""
+        i = self.keys.index(key)
+        idx = np.arange(self.n_rows)[rows]
+        return self.axes[key][np.unravel_index(idx, self.shape)[i]]
+
+    def __getitem__(self, name):
+        """Output field or swept variable by name (so sweep.pass_fail_map works on a store)"""
+        return self.coords(name) if name in self.axes else self.field(name)
+
+    def to_frame(self, rows=slice(None), fields=None):
+        """pandas DataFrame of a row slice (swept variables + fields) for inspection"""
+        import pandas as pd
+        cols = {k: self.coords(k, rows) for k in self.keys}
+        cols.update({k: np.asarray(self.field(k)[rows]) for k in (fields or self.fields)})
+        return pd.DataFrame(cols)
+
+    def worst_map(self, x, y, value="punch_ratio", limit=1.0):
+        """
+        Same result as sweep.pass_fail_map, but streamed chunk by chunk over finished chunks
+        Returns: (x_values, y_values, worst_value[y, x], passes[y, x])
+        Cells no finished chunk has reached yet are NaN and do not pass.
+        """
+        xi_axis, yi_axis = self.keys.index(x), self.keys.index(y)
+        worst = np.full((len(self.axes[y]), len(self.axes[x])), -np.inf)
+        seen = np.zeros(worst.shape, dtype=bool)
+        data = self.field(value)
+        for c in sorted(self.completed()):
+            start, stop = self.chunk_rows(c)
+            idx = np.unravel_index(np.arange(start, stop), self.shape)
+            np.maximum.at(worst, (idx[yi_axis], idx[xi_axis]), np.asarray(data[start:stop], dtype=float))
+            seen[idx[yi_axis], idx[xi_axis]] = True
+        worst[~seen] = np.nan
+        return self.axes[x], self.axes[y], worst, seen & (worst <= limit)
+
+
+def run_sweep_store(grid, path, base_inputs=None, factors=None, fields=DEFAULT_FIELDS,
+                    chunk_size=sweep.DEFAULT_CHUNK_SIZE, max_workers=None, progress=None):
+    """
+    run_sweep() that streams into a SweepStore directory instead of one in-memory table
+    An existing directory of the same sweep is resumed (only pending chunks run); a
+    directory of a different sweep raises ValueError.
+    progress: optional callback(done_cases, total_cases)
+    Returns: SweepStore
+    """
+    chunk_size = max(int(chunk_size), 1)
+    if os.path.exists(os.path.join(path, MANIFEST)):
+        store = SweepStore(path)
+        want = store.fields if fields == "all" else fields
+        if not store.matches(grid, base_inputs, factors, want, chunk_size):
+            raise ValueError(f"{path} holds a different sweep (grid/inputs/fields/engine) -> use a new directory")
+    else:
+        store = SweepStore.create(path, grid, base_inputs, factors, fields, chunk_size)
+
+    store.repair_log()
+    pending = store.pending()
+    base = store.manifest["base_inputs"]
+    done = store.n_rows - sum(stop - start for start, stop in map(store.chunk_rows, pending))
+    if progress: progress(done, store.n_rows)
+    if not pending:
+        return store
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(int(max_workers), len(pending)))
+
+    if max_workers == 1:
+        for c in pending:
+            start, stop = store.chunk_rows(c)
+            store.write_chunk(c, _run_store_chunk(grid, base, factors, start, stop, store.fields))
+            done += stop - start
+            if progress: progress(done, store.n_rows)
+    else:
+        # Workers only compute; this process is the single writer of the memmaps and the log
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_run_store_chunk, grid, base, factors, *store.chunk_rows(c), store.fields): c
+                       for c in pending}
+            for fut in as_completed(futures):
+                c = futures[fut]
+                store.write_chunk(c, fut.result())
+                start, stop = store.chunk_rows(c)
+                done += stop - start
+                if progress: progress(done, store.n_rows)
+    return store
@@ -4,13 +4,16 @@ import pandas as pd
 import numpy as np
 import math
 
+import perf
+
 # ==========================================
 # 0. HELPER FUNCTIONS & IMPORTS
 # ==========================================
 # Try importing helper functions, provide fallback if missing
 try:
-    from calculations import check_min_reinforcement, check_long_term_deflection
+    from calculations import AnalysisResult, check_min_reinforcement, check_long_term_deflection
 except ImportError:
+    AnalysisResult = None # render() then needs the analysis passed in
     # Dummy Fallback functions for testing purely UI or independent run
     def check_min_reinforcement(h): 
         return {'As_min': 0.0018 * 100 * h}
@@ -111,6 +114,7 @@ def inject_custom_css():
     </style>
     """, unsafe_allow_html=True)
 
+@perf.timed()
 def render_step_header(number, text):
     # If number is a string (e.g. "Logic Check"), handle gracefully
     if isinstance(number, str) and not number.isdigit() and len(number) > 2:
@@ -122,6 +126,7 @@ def render_step_header(number, text):
 # ==========================================
 # 2. LOGIC RENDERER (UPDATED: Return Boolean)
 # ==========================================
+@perf.timed()
 def render_structural_logic(mat_props, Lx, Ly):
     
     st.markdown('<div class="step-container">', unsafe_allow_html=True)
@@ -252,65 +257,50 @@ def render_structural_logic(mat_props, Lx, Ly):
 # 3. CALCULATION RENDERERS
 # ==========================================
 
+@perf.timed()
 def render_punching_detailed(res, mat_props, loads, Lx, Ly, label):
     """
     Render detailed punching shear calculation with Step-by-Step explanation.
+    res: AnalysisResult.punching_detail(i) -> every number comes from the engine run
     """
     if not res:
         st.error(f"No data available for {label}")
         return
 
     st.markdown(f"#### 📍 Section: {label}")
+    if 'bo' not in res:
+        st.error(f"❌ {res.get('note', res.get('Note', 'Section could not be checked'))}")
+        return
     
-    # --- 1. Extract Basic Material & Geometry ---
+    # --- 1. Geometry & Material (from the analysis) ---
     fc = mat_props.get('fc', 240)
-    c1 = mat_props.get('cx', 50.0) 
-    c2 = mat_props.get('cy', 50.0)
+    c1, c2 = res['c1'], res['c2']
     cover = mat_props.get('cover', 2.5)
-    
-    # Thickness logic: If checking Column Face and Drop exists, add Drop thickness
-    h_slab_base = mat_props.get('h_slab', 20.0)
-    is_drop_check = "Face" in label or "Column" in label
-    
-    # Check if we should add drop thickness
-    if mat_props.get('has_drop') and is_drop_check:
-        h_total = h_slab_base + mat_props.get('h_drop', 0)
-    else:
-        h_total = h_slab_base
-
-    # --- Effective Depth (d) ---
     d_bar_mm = mat_props.get('d_bar', 12.0)
     d_bar_cm = d_bar_mm / 10.0
-    d = h_total - cover - (d_bar_cm / 2)
-    
-    # --- Analysis Results ---
-    # Safe division
-    min_c = min(c1,c2) if min(c1,c2) > 0 else 1
-    beta = max(c1,c2)/min_c
+    d = res['d']
+    h_total = d + cover + d_bar_cm / 2
     
-    alpha_s = mat_props.get('alpha_s', 40) # 40=Int, 30=Edge, 20=Corner
-    sqrt_fc = math.sqrt(fc)
+    min_c = min(c1, c2) if min(c1, c2) > 0 else 1
+    beta = res['beta']
+    alpha_s = res['alpha_s'] # 40=Int, 30=Edge, 20=Corner
+    sqrt_fc = res['sqrt_fc']
+    b0 = res['bo']
     
-    # --- Calculate b0 for Display ---
+    # --- b0 formula for Display ---
     if alpha_s >= 40:
         pos_title = "Interior Column"
         b0_latex_eq = r"b_0 = 2(c_1 + d) + 2(c_2 + d)"
-        b0_calc = 2*(c1 + d) + 2*(c2 + d)
     elif alpha_s >= 30:
         pos_title = "Edge Column"
         b0_latex_eq = r"b_0 = 2(c_1 + d/2) + (c_2 + d)"
-        b0_calc = 2*(c1 + d/2) + (c2 + d)
     else:
         pos_title = "Corner Column"
         b0_latex_eq = r"b_0 = (c_1 + d/2) + (c_2 + d/2)"
-        b0_calc = (c1 + d/2) + (c2 + d/2)
-        
-    b0 = b0_calc
 
     # --- Step 1: Geometry & Parameters ---
     with st.container():
         st.markdown('<div class="step-container">', unsafe_allow_html=True)
-        # ตรวจสอบว่ามี function render_step_header หรือไม่
         render_step_header(1, "Geometry & Parameters")
         
         col1, col2 = st.columns(2)
@@ -328,9 +318,11 @@ def render_punching_detailed(res, mat_props, loads, Lx, Ly, label):
             st.write(f"**Type:** {pos_title} ($\\alpha_s = {alpha_s}$)")
             st.latex(b0_latex_eq)
             st.markdown(f"<div class='calc-result-box'>b0 = {b0:.2f} cm</div>", unsafe_allow_html=True)
+            if res.get('deduction', 0) > 0:
+                st.caption(f"Opening deduction: {res['deduction']:.1f} cm")
             
             st.markdown('<div class="sub-header">D. Shape Factor</div>', unsafe_allow_html=True)
-            st.latex(fr"\beta = \frac{{{max(c1,c2)}}}{{{min_c}}} = {beta:.2f}")
+            st.latex(fr"\beta = \frac{{{max(c1,c2):.0f}}}{{{min_c:.0f}}} = {beta:.2f}")
             
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -344,28 +336,23 @@ def render_punching_detailed(res, mat_props, loads, Lx, Ly, label):
         # --- Eq 1 ---
         with eq1:
             st.markdown("**1. Rectangularity Effect**")
-            st.latex(r"V_{c1} = 0.53 \left(1 + \frac{2}{\beta}\right) \sqrt{f'_c} b_0 d")
-            term_beta = 1 + (2/beta)
-            val_vc1 = 0.53 * term_beta * sqrt_fc * b0 * d
-            st.markdown(f"<div class='calc-result-box'>{val_vc1:,.0f} kg</div>", unsafe_allow_html=True)
+            st.latex(r"V_{c1} = 0.27 \left(2 + \frac{4}{\beta}\right) \sqrt{f'_c} b_0 d")
+            st.markdown(f"<div class='calc-result-box'>{res['Vc_beta']:,.0f} kg</div>", unsafe_allow_html=True)
 
         # --- Eq 2 ---
         with eq2:
             st.markdown("**2. Size Effect**")
             st.latex(r"V_{c2} = 0.27 \left(\frac{\alpha_s d}{b_0} + 2\right) \sqrt{f'_c} b_0 d") 
-            term_peri_val = (alpha_s * d / b0) + 2
-            val_vc2 = 0.27 * term_peri_val * sqrt_fc * b0 * d 
-            st.markdown(f"<div class='calc-result-box'>{val_vc2:,.0f} kg</div>", unsafe_allow_html=True)
+            st.markdown(f"<div class='calc-result-box'>{res['Vc_size']:,.0f} kg</div>", unsafe_allow_html=True)
 
         # --- Eq 3 ---
         with eq3:
             st.markdown("**3. Basic Limit**")
             st.latex(r"V_{c3} = 1.06 \sqrt{f'_c} b_0 d")
-            val_vc3 = 1.06 * sqrt_fc * b0 * d
-            st.markdown(f"<div class='calc-result-box'>{val_vc3:,.0f} kg</div>", unsafe_allow_html=True)
+            st.markdown(f"<div class='calc-result-box'>{res['Vc_basic']:,.0f} kg</div>", unsafe_allow_html=True)
         
         st.markdown("---")
-        vc_min = min(val_vc1, val_vc2, val_vc3)
+        vc_min = res['Vc']
         st.success(f"📌 **Governing Capacity ($V_c$):** {vc_min:,.0f} kg")
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -374,35 +361,24 @@ def render_punching_detailed(res, mat_props, loads, Lx, Ly, label):
         st.markdown('<div class="step-container">', unsafe_allow_html=True)
         render_step_header(3, "Shear Demand (V<sub>u</sub>)")
         
-        # Loads
         f_dl = mat_props.get('factor_dl', 1.4)
         f_ll = mat_props.get('factor_ll', 1.7)
-        h_m = h_total / 100.0
-        w_sw = h_m * 2400
-        w_sw_val = w_sw + loads['SDL'] # Total Dead Load
-        wu_val = (f_dl * w_sw_val) + (f_ll * loads['LL'])
-
-        # Areas
-        area_trib = Lx * Ly
-        # Critical area (approximate for display)
-        area_crit = ((c1+d)/100) * ((c2+d)/100)
-        
-        # Vu Calc
-        vu_calc_raw = wu_val * (area_trib - area_crit)
-        # Prefer value from result dict if available
-        vu_display = res.get('Vu', vu_calc_raw)
+        wu_val = loads['w_u']
+        w_dl_val = (wu_val - f_ll * loads['LL']) / f_dl # Total Dead Load (slab + SDL)
+        vu_display = res['Vu']
 
         col_L, col_R = st.columns(2)
         
         with col_L:
             st.markdown('<div class="sub-header">A. Factored Load (w<sub>u</sub>)</div>', unsafe_allow_html=True)
             st.latex(fr"w_u = {f_dl}(DL) + {f_ll}(LL)")
-            st.latex(fr"w_u = {f_dl}({w_sw_val:.0f}) + {f_ll}({loads['LL']:.0f})")
+            st.latex(fr"w_u = {f_dl}({w_dl_val:.0f}) + {f_ll}({loads['LL']:.0f})")
             st.markdown(f"**$w_u$ = {wu_val:,.0f} kg/m²**")
 
-            st.markdown('<div class="sub-header">B. Areas</div>', unsafe_allow_html=True)
-            st.write(f"$A_{{trib}} = {area_trib:.2f} m^2$")
-            st.write(f"$A_{{crit}} \\approx {area_crit:.3f} m^2$")
+            st.markdown('<div class="sub-header">B. Tributary Area</div>', unsafe_allow_html=True)
+            st.write(f"$A_{{trib}} = {Lx * Ly:.2f} m^2$")
+            if res.get('case'):
+                st.caption(f"Case: {res['case']}")
 
         with col_R:
             st.markdown('<div class="sub-header">C. Factored Shear (V<sub>u</sub>)</div>', unsafe_allow_html=True)
@@ -412,31 +388,30 @@ def render_punching_detailed(res, mat_props, loads, Lx, Ly, label):
             Vu = {vu_display:,.0f} kg
             </div>
             """, unsafe_allow_html=True)
+            st.write(f"$M_{{unb}}$ = {res['Munbal']:,.0f} kg-m | $\\gamma_v$ = {res['gamma_v']:.3f}")
 
         st.markdown('</div>', unsafe_allow_html=True)
 
-    # --- Step 4: Design Check ---
+    # --- Step 4: Design Check (stress incl. moment transfer, same as the engine) ---
     with st.container():
         st.markdown('<div class="step-container">', unsafe_allow_html=True)
         render_step_header(4, "Design Verdict")
         
-        phi = mat_props.get('phi_shear', 0.85)
-        phi_vn = phi * vc_min
-        
-        # Check Logic
-        passed = vu_display <= phi_vn + 1.0 
+        phi = res['phi']
+        passed = res['ratio'] <= 1.0
         
         c1, c2 = st.columns(2)
         with c1:
-            st.write("### Demand ($V_u$)")
-            st.latex(fr"\mathbf{{{vu_display:,.0f}}} \text{{ kg}}")
+            st.write("### Demand ($v_u$)")
+            st.latex(r"v_u = \frac{V_u}{b_0 d} + \frac{\gamma_v M_{unb} c_{AB}}{J_c}")
+            st.latex(fr"{res['v_direct']:.2f} + {res['v_moment']:.2f} = \mathbf{{{res['v_max']:.2f}}} \text{{ ksc}}")
         with c2:
-            st.write("### Capacity ($\phi V_n$)")
-            st.latex(fr"{phi} \times {vc_min:,.0f} = \mathbf{{{phi_vn:,.0f}}} \text{{ kg}}")
+            st.write("### Capacity ($\phi v_c$)")
+            st.latex(fr"{phi} \times \frac{{{vc_min:,.0f}}}{{b_0 d}} = \mathbf{{{res['v_allow']:.2f}}} \text{{ ksc}}")
         
         st.markdown("---")
         
-        ratio = vu_display / phi_vn if phi_vn > 0 else 999
+        ratio = res['ratio']
         status_text = "PASS (Safe)" if passed else "FAIL (Unsafe)"
         cls = "pass" if passed else "fail"
         
@@ -454,6 +429,7 @@ def render_punching_detailed(res, mat_props, loads, Lx, Ly, label):
 # ==========================================
 # 3. SLAB THICKNESS CHECK (ACI 318) - COMPLETE
 # ==========================================
+@perf.timed()
 def render_thickness_check(mat_props, Lx, Ly, is_structural_drop):
     """
     Render Slab Thickness Check based on ACI 318
@@ -578,7 +554,14 @@ def render_thickness_check(mat_props, Lx, Ly, is_structural_drop):
 # ==========================================
 # 4. MAIN RENDERER
 # ==========================================
-def render(punch_res, v_oneway_res, mat_props, loads, Lx, Ly):
+@perf.timed()
+def render(punch_res, v_oneway_res, mat_props, loads, Lx, Ly, analysis=None):
+    """analysis: calculations.AnalysisResult shared with the other tabs (built here if missing)"""
+    if analysis is None:
+        if AnalysisResult is None: # calculations.py missing -> nothing to report on
+            st.error("ไม่พบ calculations.AnalysisResult -> ส่ง analysis เข้ามา หรือตรวจสอบไฟล์ calculations.py")
+            return
+        analysis = AnalysisResult.from_inputs(mat_props)
     inject_custom_css()
     
     st.title("📑 Structural Calculation Report")
@@ -593,63 +576,46 @@ def render(punch_res, v_oneway_res, mat_props, loads, Lx, Ly):
     is_structural_drop = render_structural_logic(mat_props, Lx, Ly)
     
     # -----------------------------------------------------
-    # PRE-CALCULATION
+    # RESULTS (from the shared analysis, nothing recomputed here)
     # -----------------------------------------------------
     h_slab = mat_props.get('h_slab', 20.0)
-    fc = mat_props.get('fc', 240)
-    w_service = loads['SDL'] + loads['LL']
-    
-    # Recalculate basic checks for display
+    res_deflection = analysis.deflection
     res_min_rebar = check_min_reinforcement(h_slab)
-    res_deflection = check_long_term_deflection(w_service, max(Lx, Ly), h_slab, fc, res_min_rebar['As_min'])
 
     # --- 1. PUNCHING SHEAR ---
     st.header("1. Punching Shear Analysis")
     
-    # Check if Dual Case (Shear Cap / Drop Panel)
-    if punch_res.get('is_dual') or 'check_1' in punch_res:
-        tab1, tab2 = st.tabs(["Inner Section (Column Face)", "Outer Section (Drop/Cap Edge)"])
-        res_1 = punch_res.get('check_1', punch_res)
-        with tab1: 
-            render_punching_detailed(res_1, mat_props, loads, Lx, Ly, "d/2 from Column Face")
-        
-        res_2 = punch_res.get('check_2')
-        if res_2:
-            with tab2: 
-                render_punching_detailed(res_2, mat_props, loads, Lx, Ly, "d/2 from Drop/Cap Edge")
+    # Dual Case (Shear Cap / Drop Panel) -> one tab per critical section
+    sections = analysis.punching_sections()
+    if len(sections) > 1:
+        tabs = st.tabs(["Inner Section (Column Face)", "Outer Section (Drop/Cap Edge)"])
+        for i, (tab, sec) in enumerate(zip(tabs, sections)):
+            with tab:
+                render_punching_detailed(analysis.punching_detail(i), mat_props, analysis.loads, Lx, Ly, sec['label'])
     else:
-        render_punching_detailed(punch_res, mat_props, loads, Lx, Ly, "d/2 from Column Face")
+        render_punching_detailed(analysis.punching_detail(0), mat_props, analysis.loads, Lx, Ly, sections[0]['label'])
 
     # --- 2. ONE-WAY SHEAR ---
     st.header("2. One-Way Shear Analysis")
     st.markdown('<div class="step-container">', unsafe_allow_html=True)
     
-    ln_select = Lx if Lx >= Ly else Ly
-    axis_name = "X-Direction" if Lx >= Ly else "Y-Direction"
+    one = analysis.oneway_detail()
+    ln_select = one['L_span']
+    axis_name = one['axis']
 
-    st.markdown(f"**Controlling Span:** {axis_name}, $L={ln_select:.2f}$ m.")
-    
-    # Data Prep
-    sqrt_fc = math.sqrt(fc)
-    d_bar_mm = mat_props.get('d_bar', 12.0)
-    d_slab = h_slab - mat_props.get('cover', 2.5) - (d_bar_mm/10.0/2)
-    d_meter = d_slab / 100.0
-    bw = 100.0 # Unit Strip
-    
-    # Loads
-    f_dl = mat_props.get('factor_dl', 1.4)
-    f_ll = mat_props.get('factor_ll', 1.7)
-    phi_shear = mat_props.get('phi_shear', 0.85)
-    
-    h_m_one = h_slab / 100.0
-    w_sw_one = h_m_one * 2400
-    wu_calc = (f_dl * (w_sw_one + loads['SDL'])) + (f_ll * loads['LL'])
+    st.markdown(f"**Controlling Span:** {axis_name}, $L={ln_select:.2f}$ m (governing ratio).")
     
-    # Vu Calculation (at distance d from support approx)
-    vu_one_calc = wu_calc * ((ln_select / 2) - d_meter)
+    # Data (engine values)
+    sqrt_fc = one['sqrt_fc']
+    d_slab = one['d']
+    d_meter = one['dist_d']
+    c_half = one['c'] / 200.0
+    phi_shear = one['phi']
+    wu_calc = one['w_u']
     
-    vc_nominal = 0.53 * sqrt_fc * bw * d_slab
-    phi_vc = phi_shear * vc_nominal
+    # Vu at distance d from the column face
+    vu_one_calc = one['Vu_critical']
+    phi_vc = one['phi_Vc']
     
     c_cap, c_dem = st.columns(2)
     
@@ -662,8 +628,8 @@ def render(punch_res, v_oneway_res, mat_props, loads, Lx, Ly):
     with c_dem:
         render_step_header("B", "Demand (V<sub>u</sub> at d)")
         st.write(f"Load $w_u = {wu_calc:,.0f}$ kg/m")
-        st.latex(r"V_u = w_u (L/2 - d)")
-        st.latex(fr"= {wu_calc:,.0f} ({ln_select:.2f}/2 - {d_meter:.2f})")
+        st.latex(r"V_u = w_u (L/2 - c/2 - d)")
+        st.latex(fr"= {wu_calc:,.0f} ({ln_select:.2f}/2 - {c_half:.2f} - {d_meter:.2f})")
         
         color_vu_one = "green" if vu_one_calc <= phi_vc else "red"
         st.markdown(f"<div class='calc-result-box' style='color:{color_vu_one}'>Vu = {vu_one_calc:,.0f} kg/m</div>", unsafe_allow_html=True)
@@ -1,9 +1,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from typing import Dict, Any, Tuple, Optional
+
+import figure_cache
+import figure_manager
+import perf
 
 # ========================================================
 # 0. DEPENDENCY HANDLING
@@ -21,213 +23,9 @@ except ImportError:
     HAS_CALC = False
 
 # ========================================================
-# 1. CORE ENGINEERING LOGIC (ACI 318 / EIT)
+# 1-2. ENGINEERING LOGIC + DDM COEFFICIENTS (DDM_Logic, numpy only)
 # ========================================================
-
-def get_beta1(fc: float) -> float:
-    """
-    Calculate Beta1 factor for equivalent rectangular concrete stress distribution.
-    ACI 318: 0.85 for fc <= 280 ksc (4000 psi).
-    Reduces by 0.05 for every 70 ksc above 280, min 0.65.
-    """
-    if fc <= 280:
-        return 0.85
-    else:
-        beta = 0.85 - 0.05 * ((fc - 280) / 70)
-        return max(0.65, beta)
-
-def calc_rebar_logic(
-    M_u: float, b_width: float, d_bar: float, s_bar: float, 
-    h_slab: float, cover: float, fc: float, fy: float, 
-    is_main_dir: bool, phi_factor: float = 0.90
-) -> Dict[str, Any]:
-    """
-    Perform Flexural Design with detailed intermediate steps.
-    """
-    # Units: kg, cm
-    b_cm = b_width * 100.0
-    h_cm = float(h_slab)
-    Mu_kgcm = M_u * 100.0
-    
-    # 1. Effective Depth (d)
-    # Layer 1 (Outer) or Layer 2 (Inner)
-    d_offset = 0.0 if is_main_dir else (d_bar / 10.0)
-    d_eff = h_cm - cover - (d_bar / 20.0) - d_offset
-    
-    if d_eff <= 0:
-        return {"Status": False, "Note": "Depth Error (d<=0)", "d": 0, "As_req": 0}
-
-    # 2. Beta 1
-    beta1 = get_beta1(fc)
-
-    # 3. Required Strength (Rn)
-    # Rn = Mu / (phi * b * d^2)
-    try:
-        Rn = Mu_kgcm / (phi_factor * b_cm * (d_eff**2))
-    except ZeroDivisionError:
-        Rn = 0
-
-    # 4. Reinforcement Ratio (rho)
-    # rho = (0.85*fc/fy) * (1 - sqrt(1 - 2Rn/(0.85*fc)))
-    term_inside = 1 - (2 * Rn) / (0.85 * fc)
-    
-    rho_calc = 0.0
-    if term_inside < 0:
-        rho_req = 999.0 # Section too small (Fail)
-    else:
-        if M_u < 100: # Negligible moment
-            rho_req = 0.0
-        else:
-            rho_req = (0.85 * fc / fy) * (1 - np.sqrt(term_inside))
-            rho_calc = rho_req
-
-    # 5. Steel Areas
-    As_flex = rho_req * b_cm * d_eff
-    As_min = 0.0018 * b_cm * h_cm # Temp & Shrinkage (ACI Standard for Slabs)
-    
-    # Control Logic: Use Max(As_flex, As_min)
-    # Even if Moment is 0 (e.g. Mid Strip Top), we need As_min for shrinkage
-    As_req_final = max(As_flex, As_min) if rho_req != 999 else 999.0
-    
-    # 6. Provided Steel
-    Ab_area = np.pi * (d_bar / 10.0)**2 / 4.0
-    As_prov = (b_cm / s_bar) * Ab_area
-    
-    # 7. Capacity Check (Phi Mn)
-    if rho_req == 999:
-        PhiMn = 0; a_depth = 0; dc_ratio = 999.0
-    else:
-        # a = As*fy / (0.85*fc*b)
-        a_depth = (As_prov * fy) / (0.85 * fc * b_cm)
-        # Mn = As*fy*(d - a/2)
-        Mn = As_prov * fy * (d_eff - a_depth / 2.0)
-        PhiMn = phi_factor * Mn / 100.0 # kg-m
-        
-        # DC Ratio check (avoid div by zero)
-        if M_u < 50: # Ignore check for zero moment zones
-            dc_ratio = 0.0
-        else:
-            dc_ratio = M_u / PhiMn if PhiMn > 0 else 999.0
-
-    s_max = min(2 * h_cm, 45.0)
-    
-    checks = []
-    if dc_ratio > 1.0: checks.append("Strength Fail")
-    if As_prov < As_min: checks.append("As < Min")
-    if s_bar > s_max: checks.append("Spacing > Max")
-    if rho_req == 999: checks.append("Section Too Small")
-    
-    status_bool = (len(checks) == 0)
-
-    return {
-        "d": d_eff, "beta1": beta1, "Rn": Rn, 
-        "rho_req": rho_req, "rho_calc": rho_calc,
-        "As_min": As_min, "As_flex": As_flex,
-        "As_req": As_req_final, "As_prov": As_prov, 
-        "a": a_depth, "PhiMn": PhiMn, "DC": dc_ratio, 
-        "Status": status_bool, 
-        "Note": ", ".join(checks) if checks else "OK", 
-        "s_max": s_max
-    }
-
-def calc_deflection_check(L_span, h_slab, w_u, fc, span_type):
-    """
-    Simplified Serviceability Check.
-    Note: Real deflection requires effective inertia (Ie).
-    Here we use Ig with a conservative multiplier for long-term effects.
-    """
-    # Minimum Thickness Table (ACI 318)
-    denom = 30.0 # Default
-    if "Interior" in span_type: denom = 33.0
-    elif "Edge" in span_type: denom = 30.0
-    
-    h_min = (L_span * 100) / denom
-    
-    # Elastic Deflection (Approximate)
-    # 5wL^4 / 384EI (Simple) * Continuity Factor
-    # Continuity Factor: 0.6 for interior, 0.8 for end span (Rough approx)
-    k_cont = 0.6 if "Interior" in span_type else 0.8
-    
-    Ec = 15100 * np.sqrt(fc) # ksc
-    b_design = 100.0 # Consider 1m strip width for check
-    Ig = (b_design * h_slab**3) / 12.0
-    
-    w_service = w_u / 1.45 # Approx service load
-    w_line = (w_service * 1.0) / 100.0 # kg/cm per strip width
-    L_cm = L_span * 100.0
-    
-    delta_imm = k_cont * (5 * w_line * L_cm**4) / (384 * Ec * Ig)
-    
-    # Long term multiplier (Creep + Shrinkage)
-    # ACI: lambda = xi / (1 + 50rho')
-    # Conservative assume lambda = 2.0 -> Total = 3.0 * Immediate
-    lambda_long = 2.0
-    delta_total = delta_imm * (1 + lambda_long)
-    
-    limit = L_cm / 240.0
-    
-    return {
-        "h_min": h_min, "status_h": h_slab >= h_min,
-        "delta_imm": delta_imm, "delta_total": delta_total,
-        "limit": limit, "denom": denom
-    }
-
-# ========================================================
-# 2. DDM COEFFICIENT ENGINE
-# ========================================================
-def get_ddm_coeffs(span_type: str) -> Dict[str, float]:
-    """
-    Returns ACI 318 Moment Coefficients.
-    Now includes 'ext_neg' for Unbalanced Moment calculation at edge.
-    """
-    if "Interior" in span_type:
-        # Case: Interior Span
-        return {'neg': 0.65, 'pos': 0.35, 'ext_neg': 0.0, 'desc': 'Interior Span'}
-    
-    elif "Edge Beam" in span_type:
-        # Case: Exterior Span with Stiff Edge Beam
-        # Ext Neg: 0.30, Pos: 0.50, Int Neg: 0.70
-        return {'neg': 0.70, 'pos': 0.50, 'ext_neg': 0.30, 'desc': 'End Span (Stiff Beam)'}
-    
-    elif "No Beam" in span_type:
-        # Case: Exterior Span (Flat Plate)
-        # Ext Neg: 0.26, Pos: 0.52, Int Neg: 0.70
-        return {'neg': 0.70, 'pos': 0.52, 'ext_neg': 0.26, 'desc': 'End Span (Flat Plate)'}
-        
-    return {'neg': 0.65, 'pos': 0.35, 'ext_neg': 0.0, 'desc': 'Default'}
-
-def update_moments_based_on_config(data_obj: Dict, span_type: str) -> Dict:
-    Mo = data_obj['Mo']
-    coeffs = get_ddm_coeffs(span_type)
-    
-    # Total Static Moment Distribution
-    M_neg_total = coeffs['neg'] * Mo    # Interior Negative
-    M_pos_total = coeffs['pos'] * Mo    # Positive
-    M_ext_neg_total = coeffs['ext_neg'] * Mo # Exterior Negative (Unbalanced)
-
-    # Column Strip / Middle Strip Distribution (ACI 318)
-    # Simplified assumptions for Flat Plate (Beta_t = 0 for no beam)
-    # Interior Negative: 75% CS, 25% MS
-    # Positive: 60% CS, 40% MS
-    # Exterior Negative: 100% CS (Conservative for Flat Plate)
-    
-    M_cs_neg = 0.75 * M_neg_total
-    M_ms_neg = 0.25 * M_neg_total
-    
-    M_cs_pos = 0.60 * M_pos_total
-    M_ms_pos = 0.40 * M_pos_total
-    
-    # Store Values
-    data_obj['M_vals'] = {
-        'M_cs_neg': M_cs_neg,
-        'M_ms_neg': M_ms_neg,
-        'M_cs_pos': M_cs_pos,
-        'M_ms_pos': M_ms_pos,
-        'M_unbal': M_ext_neg_total # Important for Edge Column Punching
-    }
-    data_obj['coeffs_desc'] = coeffs['desc'] 
-    data_obj['span_type_str'] = span_type
-    return data_obj
+from DDM_Logic import calc_rebar_logic, calc_deflection_check, update_moments_based_on_config
 
 
 # ========================================================
@@ -430,7 +228,8 @@ def show_detailed_calculation(zone_name, res, inputs, coeff_pct, Mo_val):
 # ========================================================
 # 4. INTERACTIVE DIRECTION CHECK (TAB CONTENT)
 # ========================================================
-def render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir):
+@perf.timed()
+def render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir, analysis=None):
     # -----------------------------------------------------
     # 0. SETUP & UNPACKING
     # -----------------------------------------------------
@@ -440,7 +239,6 @@ def render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir):
     fc = float(mat_props['fc'])
     fy = float(mat_props['fy'])
     phi_bend = mat_props.get('phi', 0.90)        
-    phi_shear = mat_props.get('phi_shear', 0.85) 
     
     # Rebar Config
     cfg = mat_props.get('rebar_cfg', {})
@@ -509,21 +307,20 @@ def render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir):
         st.markdown("### 2️⃣ Punching Shear Check (Verified Calculation)")
         
         # --- A. PREPARE INPUTS ---
-        h_slab_val = float(h_slab)
         cover_val = float(cover)
-        
-        # Assumption: Bar diameter avg ~ 1.6 cm (DB12 + DB20 or similar)
-        d_avg = h_slab_val - cover_val - 1.6 
-        
-        # Load & Dimensions
-        w_u_val = float(w_u)
-        c1 = float(c_para) # Dimension perpendicular to edge (Length of moment arm direction)
-        c2 = float(c_para) # Dimension parallel to edge (Width) - Assuming square column input
+        if analysis is None:
+            analysis = calc.AnalysisResult.from_inputs(mat_props)
+        # Same section as the engine / calculation report (d, c1 x c2, column type, Vu, Munbal, phi)
+        detail = analysis.punching_detail(0)
+        p_props = analysis.punching_physics(axis_id)
+        d_avg = p_props['d']
+        c1 = p_props['c1'] # Dimension perpendicular to edge (Length of moment arm direction)
+        c2 = p_props['c2'] # Dimension parallel to edge (Width)
         
         # --- B. GEOMETRY & CRITICAL SECTION ---
         st.markdown("#### **Step 1: Geometry & Critical Section Properties**")
         
-        is_edge = "Interior" not in span_type_str
+        is_edge = p_props['type'] != 'Interior'
         
         if not is_edge:
             # === INTERIOR COLUMN (4 Sides) ===
@@ -548,8 +345,6 @@ def render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir):
             gamma_v = 1.0 - gamma_f
             
             # 4. Moment
-            M_unbal = 0.0 # Typically 0 for interior in simplified DDM
-            
             # Display Geometry
             st.latex(f"b_o = 2({c1}+{d_avg:.2f}) + 2({c2}+{d_avg:.2f}) = \\mathbf{{{bo:.2f}}} \\; cm")
             
@@ -627,15 +422,12 @@ def render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir):
             gamma_v = 1.0 - gamma_f
             st.latex(f"\\gamma_v = 1 - \\frac{{1}}{{1 + \\frac{{2}}{{3}}\\sqrt{{{L1:.2f}/{L2:.2f}}}}} = \\mathbf{{{gamma_v:.3f}}}")
             
-            M_unbal = m_vals.get('M_unbal', 0)
-
         # --- C. LOADS & STRESS ---
         st.markdown("#### **Step 2: Loads & Stress Calculation**")
         
-        # Vu
-        area_panel = (L_span * L_width)
-        area_col = (c1/100) * (c2/100)
-        Vu = w_u_val * (area_panel - area_col)
+        # Vu, Munbal (shared analysis -> the same moment the engine checked)
+        Vu = p_props['Vu']
+        M_unbal = abs(detail.get('Munbal', 0.0))
         
         # Stress 1: Direct Shear
         v1 = Vu / (bo * d_avg)
@@ -667,26 +459,27 @@ def render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir):
         # --- D. CAPACITY & CONCLUSION ---
         st.markdown("#### **Step 3: Verification (ACI 318)**")
         
-        # Capacity (ACI Metric)
-        # 1.06 * sqrt(fc') is the standard approximation for ksc units 
-        # (Derived from 0.33 sqrt(fc_MPa) or 4 sqrt(fc_psi))
-        phi_vc = phi_shear * 1.06 * (fc**0.5)
+        # Capacity (ACI Metric): governing of the 3 equations, from the shared analysis
+        if 'bo' not in detail: # engine error result (e.g. Ac <= 0) -> no capacity to compare
+            st.error(f"❌ {detail.get('note', detail.get('Note', 'Section could not be checked'))}")
+        else:
+            phi_vc = detail['v_allow']
         
-        ratio = v_total / phi_vc
+            ratio = v_total / phi_vc
         
-        st.write(f"**Capacity ($\\phi v_c$):** {phi_shear} × 1.06 × √{fc} = **{phi_vc:.2f} ksc**")
+            st.write(f"**Capacity ($\\phi v_c$):** {detail['phi']} × min($v_{{c1}}, v_{{c2}}, v_{{c3}}$) = **{phi_vc:.2f} ksc**")
         
-        if v_total <= phi_vc:
-            st.success(f"✅ **PASS** (Ratio: {ratio:.2f})")
-            st.progress(min(ratio, 1.0))
-        else:
-            st.error(f"❌ **FAIL** (Ratio: {ratio:.2f})")
-            st.progress(min(ratio, 1.0))
+            if v_total <= phi_vc:
+                st.success(f"✅ **PASS** (Ratio: {ratio:.2f})")
+                st.progress(min(ratio, 1.0))
+            else:
+                st.error(f"❌ **FAIL** (Ratio: {ratio:.2f})")
+                st.progress(min(ratio, 1.0))
             
-            # Recommendation
-            req_d = d_avg * (ratio**0.5)
-            req_h = req_d + cover_val + 1.6
-            st.warning(f"💡 **Fix:** Needs slab thickness approx **{req_h:.1f} cm**")
+                # Recommendation
+                req_d = d_avg * (ratio**0.5)
+                req_h = req_d + cover_val + 1.6
+                st.warning(f"💡 **Fix:** Needs slab thickness approx **{req_h:.1f} cm**")
             
     # -----------------------------------------------------
     # SECTION 3: SERVICEABILITY (DEFLECTION)
@@ -796,9 +589,9 @@ def render_interactive_direction(data, mat_props, axis_id, w_u, is_main_dir):
         }
         
         with t1: 
-            st.pyplot(ddm_plots.plot_ddm_moment(L_span, c_para/100, m_vals))
+            figure_cache.st_figure(ddm_plots.plot_ddm_moment, L_span, c_para/100, m_vals)
         with t2: 
-            st.pyplot(ddm_plots.plot_rebar_detailing(L_span, h_slab, c_para, rebar_map, axis_id))
+            figure_cache.st_figure(ddm_plots.plot_rebar_detailing, L_span, h_slab, c_para, rebar_map, axis_id)
 
 
 # ========================================================
@@ -811,7 +604,7 @@ def draw_span_schematic(span_type):
     - Expanded Left Margin (xlim -4.0) to prevent Label collision.
     - Cleaned up text alignment for CS/MS strips.
     """
-    fig, ax = plt.subplots(figsize=(10, 6)) 
+    fig, ax = figure_manager.subplots(figsize=(10, 6), key="tab_ddm.draw_span_schematic")
     # ขยายแกน X ด้านซ้ายเพิ่มขึ้น เพื่อกันตัวหนังสือชนกัน
     ax.set_xlim(-4.0, 12.5)
     ax.set_ylim(-1.5, 8.0) 
@@ -939,8 +732,11 @@ def draw_span_schematic(span_type):
 # ========================================================
 # MAIN ENTRY POINT
 # ========================================================
-def render_dual(data_x, data_y, mat_props, w_u):
+@perf.timed()
+def render_dual(data_x, data_y, mat_props, w_u, analysis=None):
     st.markdown("## 🏗️ RC Slab Design (DDM Analysis)")
+    if analysis is None and HAS_CALC:
+        analysis = calc.AnalysisResult.from_inputs(mat_props)
     
     # ------------------------------------------------------------------
     # ส่วนแก้ไข: Span Continuity Settings พร้อมรูปภาพประกอบ
@@ -960,12 +756,12 @@ def render_dual(data_x, data_y, mat_props, w_u):
                 key="sx",
                 help="Interior: ต่อเนื่อง 2 ฝั่ง / End Span: อยู่ริมอาคาร"
             )
-            # อัปเดตข้อมูลโมเมนต์ทันที
-            data_x = update_moments_based_on_config(data_x, type_x)
+            # อัปเดตข้อมูลโมเมนต์ทันที (shared analysis is read-only -> own copy)
+            data_x = analysis.ddm_direction("x", type_x) if analysis is not None else update_moments_based_on_config(data_x, type_x)
             
         with c2_x:
             # แสดงรูป Schematic ทันที
-            st.pyplot(draw_span_schematic(type_x), use_container_width=False)
+            figure_cache.st_figure(draw_span_schematic, type_x)
 
         st.markdown("---") # เส้นคั่นแนวนอน
 
@@ -979,10 +775,10 @@ def render_dual(data_x, data_y, mat_props, w_u):
                 ["Interior Span", "End Span - Edge Beam", "End Span - No Beam"], 
                 key="sy"
             )
-            data_y = update_moments_based_on_config(data_y, type_y)
+            data_y = analysis.ddm_direction("y", type_y) if analysis is not None else update_moments_based_on_config(data_y, type_y)
             
         with c2_y:
-            st.pyplot(draw_span_schematic(type_y), use_container_width=False)
+            figure_cache.st_figure(draw_span_schematic, type_y)
             
     # ------------------------------------------------------------------
     # จบส่วนแก้ไข
@@ -991,6 +787,6 @@ def render_dual(data_x, data_y, mat_props, w_u):
     tab_x, tab_y = st.tabs(["➡️ X-Direction Check", "⬆️ Y-Direction Check"])
     
     with tab_x:
-        render_interactive_direction(data_x, mat_props, "X", w_u, True)
+        render_interactive_direction(data_x, mat_props, "X", w_u, True, analysis)
     with tab_y:
-        render_interactive_direction(data_y, mat_props, "Y", w_u, False)
+        render_interactive_direction(data_y, mat_props, "Y", w_u, False, analysis)
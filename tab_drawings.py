@@ -1,7 +1,8 @@
 # tab_drawings.py
 import streamlit as st
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+import figure_manager
+import perf
 import pandas as pd
 import numpy as np
 
@@ -113,6 +114,7 @@ def get_row_html(label, value, unit, is_header=False, is_highlight=False):
 # ==========================================
 # 4. MAIN RENDERER
 # ==========================================
+@perf.timed()
 def render(L1, L2, c1_w, c2_w, h_slab, lc, cover, d_eff, 
            drop_data=None, moment_vals=None, 
            mat_props=None, loads=None, 
@@ -209,7 +211,7 @@ def render(L1, L2, c1_w, c2_w, h_slab, lc, cover, d_eff,
         # A. PLAN VIEW
         # ------------------------------------
         st.markdown(f"**📐 PLAN VIEW: {col_type.upper()} PANEL**")
-        fig, ax = plt.subplots(figsize=(8, 6))
+        fig, ax = figure_manager.subplots(figsize=(8, 6), key="tab_drawings.plan")
         
         lbls = {"top": "CONTINUOUS", "bot": "CONTINUOUS", "left": "CONTINUOUS", "right": "CONTINUOUS"}
         # Assume design column is Top-Left (0, L2) for visualization consistency
@@ -284,13 +286,13 @@ def render(L1, L2, c1_w, c2_w, h_slab, lc, cover, d_eff,
         ax.axis('off')
         ax.set_xlim(-margin-0.5, L1+margin+0.5)
         ax.set_ylim(-margin-0.5, L2+margin+0.5)
-        st.pyplot(fig, use_container_width=True)
+        figure_manager.st_show(fig)
 
         # ------------------------------------
         # B. SECTION VIEW
         # ------------------------------------
         st.markdown(f"**🏗️ SECTION A-A** (Storey H = {lc:.2f} m)")
-        fig_s, ax_s = plt.subplots(figsize=(8, 4))
+        fig_s, ax_s = figure_manager.subplots(figsize=(8, 4), key="tab_drawings.section")
         
         cut_w = 250
         col_draw_h = 150
@@ -351,7 +353,7 @@ def render(L1, L2, c1_w, c2_w, h_slab, lc, cover, d_eff,
         ax_s.set_xlim(-cut_w/2 - 50, cut_w/2 + 50)
         ax_s.set_ylim(-col_draw_h - 20, h_slab + 30)
         
-        st.pyplot(fig_s, use_container_width=True)
+        figure_manager.st_show(fig_s)
 
     # === RIGHT: DATA SHEET ===
     with col_data:
@@ -2,9 +2,14 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+import matplotlib
 import matplotlib.patches as patches
 
+import EFM_Logic as efm_logic
+import figure_cache
+import figure_manager
+import perf
+
 # พยายาม import calculations ถ้าไม่มีให้แจ้งเตือน (เพื่อป้องกัน App Crash)
 try:
     import calculations as calc  # เชื่อมต่อกับ The Brain V2.0
@@ -12,7 +17,7 @@ except ImportError:
     calc = None
 
 # --- Settings for Professional Plots ---
-plt.rcParams.update({
+matplotlib.rcParams.update({
     'font.family': 'sans-serif', 
     'font.size': 10,
     'axes.spines.top': False, 
@@ -30,7 +35,7 @@ def plot_stick_model(Ks, Sum_Kc, Kt, Kec):
     """
     Draws the Equivalent Frame Model (Spring Model).
     """
-    fig, ax = plt.subplots(figsize=(6, 2.5))
+    fig, ax = figure_manager.subplots(figsize=(6, 2.5), key="tab_efm.plot_stick_model")
     
     # Main Axes
     ax.axhline(0, color='black', linewidth=1) # Slab axis
@@ -60,7 +65,7 @@ def plot_moment_envelope(L1, M_neg_L, M_neg_R, M_pos, c1_cm):
     """
     Plots the Moment Diagram for the span.
     """
-    fig, ax = plt.subplots(figsize=(8, 3))
+    fig, ax = figure_manager.subplots(figsize=(8, 3), key="tab_efm.plot_moment_envelope")
     x = np.linspace(0, L1, 200)
     
     # Simple Parabolic interpolation for visualization
@@ -102,7 +107,7 @@ def draw_section_detail(b_cm, h_cm, db, spacing, title):
     """
     Visualizes the cross-section with rebars based on spacing.
     """
-    fig, ax = plt.subplots(figsize=(5, 2.0))
+    fig, ax = figure_manager.subplots(figsize=(5, 2.0), key="tab_efm.draw_section_detail")
     # Concrete section
     ax.add_patch(patches.Rectangle((0, 0), b_cm, h_cm, facecolor='#E0E0E0', edgecolor='#333333'))
     
@@ -145,128 +150,19 @@ def draw_section_detail(b_cm, h_cm, db, spacing, title):
     return fig
 
 # ==========================================
-# 2. LOGIC: MOMENT DISTRIBUTION (Simplified View Logic)
+# 2. LOGIC (EFM_Logic -> numpy only, shared with headless workers)
 # ==========================================
+calculate_capacity_check = efm_logic.calculate_capacity_check
 
 def run_moment_distribution(FEM, DF_slab, iterations=4):
-    """
-    Simulate Hardy Cross Method (Simplified for single span demo).
-    """
-    history = []
-    
-    # 1. Fixed End Moments
-    M_A = FEM   # CCW (+)
-    M_B = -FEM  # CW (-)
-    
-    history.append({"Step": "1. FEM", "Joint A": M_A, "Joint B": M_B, "Description": "Initial Load"})
-    
-    curr_unbal_A = M_A 
-    curr_unbal_B = M_B
-    
-    total_A = M_A
-    total_B = M_B
-
-    for i in range(iterations):
-        # 2. Balance
-        bal_A = -1 * curr_unbal_A * DF_slab
-        bal_B = -1 * curr_unbal_B * DF_slab
-        
-        history.append({
-            "Step": f"Iter {i+1}: Balance", 
-            "Joint A": bal_A, "Joint B": bal_B,
-            "Description": f"Bal = -M_unbal x {DF_slab:.3f}"
-        })
-        
-        total_A += bal_A
-        total_B += bal_B
-        
-        # 3. Carry Over (CO)
-        co_to_A = bal_B * 0.5
-        co_to_B = bal_A * 0.5
-        
-        history.append({
-            "Step": f"Iter {i+1}: Carry Over", 
-            "Joint A": co_to_A, "Joint B": co_to_B,
-            "Description": "CO = M_bal x 0.5"
-        })
-        
-        total_A += co_to_A
-        total_B += co_to_B
-        
-        # Update Unbalanced for next loop
-        curr_unbal_A = co_to_A
-        curr_unbal_B = co_to_B
-
-    history.append({"Step": "🏁 SUM", "Joint A": total_A, "Joint B": total_B, "Description": "Total Moment"})
+    """Hardy Cross demo from EFM_Logic, history as a DataFrame for display"""
+    history, total_A, total_B = efm_logic.run_moment_distribution(FEM, DF_slab, iterations)
     return pd.DataFrame(history), total_A, total_B
 
 # ==========================================
-# 3. CORE DESIGN FUNCTION
-# ==========================================
-def calculate_capacity_check(Mu_kgm, b_width_m, h_slab, cover, fc, fy, db, spacing):
-    """
-    Calculates As_req vs As_prov and checks capacity.
-    """
-    # Units: cm, kg, ksc
-    b_cm = b_width_m * 100
-    # Effective depth d
-    d_eff = h_slab - cover - (db/20.0) # db in mm -> db/2 in cm = db/20
-    
-    Mu_kgcm = Mu_kgm * 100.0
-    phi = 0.90
-    
-    # 1. Required Steel
-    try:
-        Rn = Mu_kgcm / (phi * b_cm * d_eff**2)
-    except ZeroDivisionError:
-        Rn = 0
-        
-    rho_req = 0.0018 # Min
-    
-    # Check if section can handle moment
-    term = 1 - (2 * Rn) / (0.85 * fc)
-    
-    if term >= 0:
-        rho_calc = (0.85 * fc / fy) * (1 - np.sqrt(term))
-        rho_req = max(rho_calc, 0.0018)
-    else:
-        # Section Fail (Moment too high for concrete section)
-        rho_req = 999 
-        rho_calc = 999
-        
-    As_req = rho_req * b_cm * d_eff
-    
-    # 2. Provided Steel
-    bar_area = 3.1416 * (db/10.0)**2 / 4.0
-    if spacing > 0:
-        As_prov = (b_cm / spacing) * bar_area
-    else:
-        As_prov = 0
-    
-    # 3. Capacity
-    a = (As_prov * fy) / (0.85 * fc * b_cm)
-    Mn = As_prov * fy * (d_eff - a/2.0)
-    PhiMn = 0.90 * Mn / 100.0 # Convert back to kg-m
-    
-    dc_ratio = Mu_kgm / PhiMn if PhiMn > 0 else 999
-    
-    # Return all intermediate values for display
-    return {
-        "d": d_eff,
-        "Rn": Rn,
-        "rho_calc": rho_calc,
-        "rho_req": rho_req,
-        "As_req": As_req,
-        "As_prov": As_prov,
-        "a_depth": a,
-        "PhiMn": PhiMn,
-        "Ratio": dc_ratio,
-        "Pass": dc_ratio <= 1.0 and rho_calc != 999
-    }
-
-# ==========================================
-# 4. MAIN RENDER FUNCTION
+# 3. MAIN RENDER FUNCTION
 # ==========================================
+@perf.timed()
 def render(c1_w, c2_w, L1, L2, lc, h_slab, fc, mat_props, w_u, col_type, **kwargs):
     
     st.markdown("### 🏗️ Full EFM Analysis: Stiffness to Design")
@@ -288,12 +184,17 @@ def render(c1_w, c2_w, L1, L2, lc, h_slab, fc, mat_props, w_u, col_type, **kwarg
     fy = mat_props.get('fy', 4000)
     cover = mat_props.get('cover', 2.5)
     
-    # 1. Stiffness Calculations
+    # 1. Stiffness Calculations (shared analysis -> same Ks / Kec as the engine results)
+    analysis = kwargs.get('analysis')
     try:
-        Ks_val, Sum_Kc, Kt_val, Kec_val = calc.calculate_stiffness(
-            c1_w, c2_w, L1, L2, lc, h_slab, fc, 
-            h_drop=h_drop, drop_w=drop_w, drop_l=drop_l
-        )
+        if analysis is not None:
+            k = analysis.efm['x']['stiffness']
+            Ks_val, Sum_Kc, Kt_val, Kec_val = k['Ks'], k['Sum_Kc'], k['Kt'], k['Kec']
+        else:
+            Ks_val, Sum_Kc, Kt_val, Kec_val = calc.calculate_stiffness(
+                c1_w, c2_w, L1, L2, lc, h_slab, fc, 
+                h_drop=h_drop, drop_w=drop_w, drop_l=drop_l
+            )
     except AttributeError:
         st.error("❌ Error: Function 'calculate_stiffness' not found in calculations.py.")
         return
@@ -335,7 +236,7 @@ def render(c1_w, c2_w, L1, L2, lc, h_slab, fc, mat_props, w_u, col_type, **kwarg
     # --- B. DASHBOARD SUMMARY ---
     col1, col2 = st.columns([1.5, 1])
     with col1:
-        st.pyplot(plot_stick_model(Ks_val, Sum_Kc, Kt_val, Kec_val))
+        figure_cache.st_figure(plot_stick_model, Ks_val, Sum_Kc, Kt_val, Kec_val)
     with col2:
         st.info("📊 **Analysis Result**")
         st.write(f"**$K_{{ec}}$ (Equiv):** {Kec_val/1e5:.2f} E5")
@@ -673,7 +574,7 @@ def render(c1_w, c2_w, L1, L2, lc, h_slab, fc, mat_props, w_u, col_type, **kwarg
                     st.caption(rf"Design Moment: $M_u = M_{{total}} \times {z['coeff']} = {z['Mu']:,.0f}$ kg-m")
                     
                     # Visual
-                    st.pyplot(draw_section_detail(z['Width']*100, h_slab, z['db'], z['spa'], z['Name']))
+                    figure_manager.st_show(draw_section_detail(z['Width']*100, h_slab, z['db'], z['spa'], z['Name']))
                     
                     # Quick Metrics
                     c_a, c_b = st.columns(2)
@@ -1,5 +1,5 @@
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+import figure_manager
 import numpy as np
 
 # --- 1. Isometric Math Core ---
@@ -100,7 +100,7 @@ def draw_prism_projected(ax, origin, size, color, alpha=1.0,
 # --- 3. Main Plotter ---
 def plot_torsion_member(col_type, c1, c2, h_slab, L1, L2):
     """Generate Professional Engineering Diagram"""
-    fig, ax = plt.subplots(figsize=(10, 7))
+    fig, ax = figure_manager.subplots(figsize=(10, 7), key="viz_torsion.plot_torsion_member")
     
     # Scale Factors (Schematic)
     V_C = 2.0        
@@ -221,9 +221,12 @@ def plot_torsion_member(col_type, c1, c2, h_slab, L1, L2):
     # Padding
     ax.set_xlim(ax.get_xlim()[0]-1, ax.get_xlim()[1]+1)
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 if __name__ == "__main__":
-    plot_torsion_member('interior', 40, 40, 20, 6, 6)
-    plt.show()
+    import tempfile
+    fig = plot_torsion_member('interior', 40, 40, 20, 6, 6)
+    with tempfile.NamedTemporaryFile(prefix="torsion_member_", suffix=".png", delete=False) as f:
+        f.write(figure_manager.rasterize(fig))
+    print(f.name)